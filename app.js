@@ -17,6 +17,8 @@ const DEFAULT_ADMIN_TOKEN = 'dev-mode-token';
 let authToken = localStorage.getItem('msl_token') || null;
 let usuarioAtual = JSON.parse(localStorage.getItem('msl_usuario') || 'null');
 let authErrorNotified = false;
+// Marcador da última escrita, reenviado para que as leituras seguintes vejam o que foi gravado
+let ultimaEscrita = sessionStorage.getItem('msl_ultima_escrita');
 let usuarios = [];
 let pecas = [];
 let clientes = [];
@@ -121,6 +123,9 @@ async function apiRequest(path, { method = 'GET', body, headers = {}, params, au
     if (auth && authToken) {
         config.headers.Authorization = `Bearer ${authToken}`;
     }
+    if (ultimaEscrita) {
+        config.headers['X-Ultima-Escrita'] = ultimaEscrita;
+    }
 
     let response;
     try {
@@ -128,6 +133,11 @@ async function apiRequest(path, { method = 'GET', body, headers = {}, params, au
     } catch (error) {
         throw new Error('Não foi possível conectar ao servidor.');
     }
+    const marcadorEscrita = response.headers.get('X-Ultima-Escrita');
+    if (marcadorEscrita) {
+        ultimaEscrita = marcadorEscrita;
+        sessionStorage.setItem('msl_ultima_escrita', marcadorEscrita);
+    }
     if (!response.ok) {
         let detail = response.statusText;
         const isUnauthorized = response.status === 401;
@@ -0,0 +1,263 @@
+"""Cold archive tier for old proof images.
+
+Proofs are decoded from base64 and appended, one compressed record each, to
+append-only segment files under ``settings.archive_dir``. The row in
+``pecas`` keeps only ``ARCHIVED_MARKER`` and ``comprovacoes_arquivadas``
+records where the bytes live. Reads go through a small LRU cache.
+
+Usage::
+
+    python -m app.core.archive arquivar --dias 365 --lote 200
+    python -m app.core.archive estatisticas
+"""
+
+import argparse
+import base64
+import fcntl
+import logging
+import os
+import threading
+import zlib
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import LruCache
+from app.core.config import settings
+from app.core.database import get_shard_router
+from app.models import ComprovacaoArquivada, ComprovacaoOriginal, Peca
+
+try:  # pragma: no cover - optional dependency
+    import zstandard
+except ImportError:  # pragma: no cover - falls back to zlib
+    zstandard = None
+
+logger = logging.getLogger("app.archive")
+
+ARCHIVED_MARKER = "arquivo:"
+
+
+def is_archived(value: Optional[str]) -> bool:
+    return bool(value) and value.startswith(ARCHIVED_MARKER)
+
+
+def _split_data_url(value: str) -> Tuple[bytes, bytes]:
+    header, sep, payload = value.partition(",")
+    if not sep:
+        return b"", base64.b64decode(value)
+    return header.encode("ascii"), base64.b64decode(payload)
+
+
+def _join_data_url(header: bytes, raw: bytes) -> str:
+    encoded = base64.b64encode(raw).decode("ascii")
+    return f"{header.decode('ascii')},{encoded}" if header else encoded
+
+
+class ArchiveStore:
+    """Append-only compressed segment files; safe across worker processes."""
+
+    def __init__(self, root: Path, segment_max_bytes: int) -> None:
+        self.root = root
+        self.segment_max_bytes = segment_max_bytes
+        self.codec = "zstd" if zstandard else "zlib"
+        self._lock = threading.Lock()
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=10).compress(data)
+        return zlib.compress(data, 6)
+
+    @staticmethod
+    def _decompress(data: bytes, codec: str) -> bytes:
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("Pacote 'zstandard' necessário para ler este segmento.")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    def _current_segment(self) -> Path:
+        segments = sorted(self.root.glob("segmento-*.bin"))
+        if segments and segments[-1].stat().st_size < self.segment_max_bytes:
+            return segments[-1]
+        number = int(segments[-1].stem.split("-")[1]) + 1 if segments else 1
+        return self.root / f"segmento-{number:06d}.bin"
+
+    def append(self, data: bytes) -> Tuple[str, int, int, str]:
+        """Store ``data``; return (segment, offset, compressed length, codec) once fsynced."""
+        compressed = self._compress(data)
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.root / ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            segment = self._current_segment()
+            with open(segment, "ab") as handle:
+                offset = handle.tell()
+                handle.write(compressed)
+                handle.flush()
+                os.fsync(handle.fileno())
+        return segment.name, offset, len(compressed), self.codec
+
+    def read(self, segment: str, offset: int, length: int, codec: str) -> bytes:
+        with open(self.root / segment, "rb") as handle:
+            handle.seek(offset)
+            return self._decompress(handle.read(length), codec)
+
+
+store = ArchiveStore(settings.archive_dir, settings.archive_segment_max_mb * 1024 * 1024)
+restored_cache = LruCache(max_size=settings.archive_cache_mb * 1024 * 1024, sizeof=len)
+
+
+def load_comprovacao(peca_id: int, db: Session) -> Optional[str]:
+    """Return the archived proof of ``peca_id`` as the original data URL."""
+    entry = db.get(ComprovacaoArquivada, peca_id)
+    if not entry:
+        logger.warning("Archived proof for peca %s has no index entry", peca_id)
+        return None
+    # Segments are append-only, so a cached record can never be stale even when
+    # another worker replaced and re-archived the proof.
+    key = (peca_id, entry.segmento, entry.posicao)
+    cached = restored_cache.get(key)
+    if cached is not None:
+        return cached
+    record = store.read(entry.segmento, entry.posicao, entry.tamanho, entry.codec)
+    header, _, raw = record.partition(b"\n")
+    value = _join_data_url(header, raw)
+    restored_cache.put(key, value)
+    return value
+
+
+def resolve_comprovacao(peca: Peca, db: Session) -> Optional[str]:
+    value = peca.comprovacao_base64
+    if is_archived(value):
+        return load_comprovacao(peca.id, db)
+    return value
+
+
+def forget(peca_id: int, db: Session) -> None:
+    """Drop the archive index entries after the proof was replaced or the piece deleted."""
+    entry = db.get(ComprovacaoArquivada, peca_id)
+    if entry:
+        restored_cache.discard((peca_id, entry.segmento, entry.posicao))
+        db.delete(entry)
+    db.execute(
+        delete(ComprovacaoOriginal)
+        .where(ComprovacaoOriginal.peca_id == peca_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def forget_many(peca_ids: Iterable[int], db: Session) -> None:
+    # Cached records of these pieces are unreachable from now on and age out of the LRU.
+    ids = list(peca_ids)
+    if ids:
+        db.execute(
+            delete(ComprovacaoArquivada)
+            .where(ComprovacaoArquivada.peca_id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            delete(ComprovacaoOriginal)
+            .where(ComprovacaoOriginal.peca_id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+
+
+def keep_original(peca_id: int, value: str, db: Session) -> None:
+    """Store the upload a normalized proof was derived from, in the same segment files."""
+    header, raw = _split_data_url(value)
+    segment, offset, length, codec = store.append(header + b"\n" + raw)
+    db.merge(
+        ComprovacaoOriginal(
+            peca_id=peca_id,
+            segmento=segment,
+            posicao=offset,
+            tamanho=length,
+            tamanho_original=len(value),
+            codec=codec,
+        )
+    )
+
+
+def archive_old_proofs(db: Session, older_than_days: int, batch_size: int) -> Tuple[int, int]:
+    """Move proofs of pieces created before the cutoff into the archive; return (count, bytes)."""
+    cutoff = date.today() - timedelta(days=older_than_days)
+    total = 0
+    freed = 0
+    while True:
+        rows = db.execute(
+            select(Peca.id, Peca.comprovacao_base64, Peca.updated_at)
+            .where(Peca.data_criacao < cutoff)
+            .where(~Peca.comprovacao_base64.startswith(ARCHIVED_MARKER))
+            .order_by(Peca.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        for peca_id, value, updated_at in rows:
+            header, raw = _split_data_url(value)
+            segment, offset, length, codec = store.append(header + b"\n" + raw)
+            # Not a user-visible change: keep updated_at/versao and skip rows edited meanwhile.
+            result = db.execute(
+                update(Peca)
+                .where(Peca.id == peca_id)
+                .where(Peca.updated_at == updated_at)
+                .values(
+                    comprovacao_base64=ARCHIVED_MARKER + str(peca_id),
+                    updated_at=updated_at,
+                    versao=Peca.versao,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if not result.rowcount:
+                continue
+            db.merge(
+                ComprovacaoArquivada(
+                    peca_id=peca_id,
+                    segmento=segment,
+                    posicao=offset,
+                    tamanho=length,
+                    tamanho_original=len(value),
+                    codec=codec,
+                )
+            )
+            total += 1
+            freed += len(value)
+        db.commit()
+        logger.info("Archived %s proofs so far", total)
+    return total, freed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Arquivo frio de comprovações")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    arquivar = sub.add_parser("arquivar", help="Move comprovações antigas para o arquivo")
+    arquivar.add_argument("--dias", type=int, default=settings.archive_after_days)
+    arquivar.add_argument("--lote", type=int, default=200)
+    sub.add_parser("estatisticas", help="Resumo do arquivo")
+    args = parser.parse_args()
+
+    # Every shard archives its own pieces; the segment files are shared.
+    router = get_shard_router()
+    for nome in router.names():
+        rotulo = f"[{nome}] " if router.enabled else ""
+        with router.session(nome) as db:
+            if args.comando == "arquivar":
+                count, freed = archive_old_proofs(db, args.dias, args.lote)
+                print(f"{rotulo}{count} comprovações arquivadas ({freed / 1024 / 1024:.1f} MB liberados no banco).")
+            else:
+                count, original, compressed = db.execute(
+                    select(
+                        func.count(),
+                        func.coalesce(func.sum(ComprovacaoArquivada.tamanho_original), 0),
+                        func.coalesce(func.sum(ComprovacaoArquivada.tamanho), 0),
+                    )
+                ).one()
+                print(f"{rotulo}Comprovações arquivadas: {count}")
+                print(f"{rotulo}Tamanho original: {original / 1024 / 1024:.1f} MB")
+                print(f"{rotulo}Tamanho em disco: {compressed / 1024 / 1024:.1f} MB ({store.codec})")
+
+
+if __name__ == "__main__":
+    main()
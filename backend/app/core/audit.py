@@ -0,0 +1,168 @@
+"""Audit trail of peça and catalogue changes, written off the request path.
+
+Routes call ``audit_log.record`` after their commit. Entries go to a bounded
+in-process queue that a background thread drains into ``auditoria``
+(``sql/007_auditoria.sql``) with one multi-row INSERT per batch of up to
+``AUDIT_BATCH_SIZE`` entries, at least every ``AUDIT_FLUSH_SECONDS``. When
+the queue is full, new entries are dropped and counted rather than slowing
+the request down. A batch that fails to insert (database restart, failover)
+is kept and retried with exponential backoff up to ``RETRY_MAX_SECONDS``
+while new entries wait in the queue. The queue is flushed on shutdown.
+"""
+
+import logging
+import queue
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.core.database import get_engine
+from app.models import RegistroAuditoria, Usuario
+
+logger = logging.getLogger("app.audit")
+
+# Field names that hold the proof image; only the fact that it changed is recorded.
+_BINARY_FIELDS = {"comprovacao", "comprovacao_base64", "hasComprovacao"}
+RETRY_MAX_SECONDS = 30.0
+
+
+def diff(antes: Mapping[str, Any], depois: Mapping[str, Any]) -> Dict[str, Any]:
+    """Return ``{campo: [antes, depois]}`` for the fields of ``depois`` whose value changed.
+
+    Pass ``{}`` as ``antes`` for a creation and ``dict.fromkeys(antes)`` as
+    ``depois`` for a removal.
+    """
+    alteracoes: Dict[str, Any] = {}
+    for campo, novo in depois.items():
+        anterior = antes.get(campo)
+        if campo in _BINARY_FIELDS:
+            alteracoes[campo] = {"alterada": True}
+        elif novo != anterior:
+            alteracoes[campo] = [anterior, novo]
+    return jsonable_encoder(alteracoes)
+
+
+class AuditLog:
+    def __init__(self, max_size: int, batch_size: int, flush_seconds: float) -> None:
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._retry: List[Dict[str, Any]] = []
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def record(
+        self,
+        user: Usuario,
+        entidade: str,
+        entidade_id: int,
+        acao: str,
+        alteracoes: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        if not settings.audit_enabled:
+            return
+        entry = {
+            "entidade": entidade,
+            "entidade_id": entidade_id,
+            "acao": acao,
+            "usuario_id": user.id,
+            "usuario": user.username,
+            "alteracoes": jsonable_encoder(alteracoes) if alteracoes else None,
+            "registrado_em": datetime.now(timezone.utc),
+        }
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            logger.warning("Audit queue full; dropped %s %s:%s", acao, entidade, entidade_id)
+
+    def _ensure_writer(self) -> None:
+        # Started on first use, so each forked worker runs its own writer.
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="auditoria", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self, timeout: Optional[float]) -> List[Dict[str, Any]]:
+        try:
+            batch = [self._queue.get(timeout=timeout) if timeout is not None else self._queue.get_nowait()]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> bool:
+        try:
+            with get_engine().begin() as conn:
+                conn.execute(insert(RegistroAuditoria.__table__), batch)
+        except SQLAlchemyError:
+            logger.warning("Could not write %s audit entries", len(batch), exc_info=True)
+            return False
+        with self._lock:
+            self.written += len(batch)
+        return True
+
+    def _run(self) -> None:
+        delay = 0.0
+        while not self._stopping.is_set():
+            batch = self._retry or self._next_batch(self.flush_seconds)
+            if not batch:
+                continue
+            if self._write(batch):
+                self._retry, delay = [], 0.0
+                continue
+            # Hold on to the batch; the queue stays bounded, so memory does too.
+            self._retry = batch
+            delay = min(max(2 * delay, self.flush_seconds), RETRY_MAX_SECONDS)
+            self._stopping.wait(delay)
+
+    def flush(self) -> None:
+        """Write everything queued so far (and a batch awaiting retry) from the calling thread."""
+        batch, self._retry = self._retry, []
+        while True:
+            batch = batch or self._next_batch(None)
+            if not batch:
+                return
+            if not self._write(batch):
+                with self._lock:
+                    self.failed += len(batch)
+                logger.error("Gave up on %s audit entries; %s still queued", len(batch), self._queue.qsize())
+                return
+            batch = []
+
+    def close(self) -> None:
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=self.flush_seconds + 5)
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "pendentes": self._queue.qsize() + len(self._retry),
+                "gravados": self.written,
+                "descartados": self.dropped,
+                "falhas": self.failed,
+            }
+
+
+audit_log = AuditLog(settings.audit_queue_size, settings.audit_batch_size, settings.audit_flush_seconds)
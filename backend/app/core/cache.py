@@ -0,0 +1,73 @@
+"""Small thread-safe in-process caches."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LruCache:
+    """Least-recently-used cache bounded by total size (``sizeof`` units) and item count."""
+
+    def __init__(
+        self,
+        max_size: int,
+        max_items: Optional[int] = None,
+        sizeof: Callable[[Any], int] = lambda _: 1,
+    ) -> None:
+        self.max_size = max_size
+        self.max_items = max_items
+        self._sizeof = sizeof
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = self._sizeof(value)
+        if size > self.max_size:
+            return
+        with self._lock:
+            if key in self._items:
+                self._size -= self._sizes.pop(key)
+                del self._items[key]
+            self._items[key] = value
+            self._sizes[key] = size
+            self._size += size
+            while self._size > self.max_size or (self.max_items and len(self._items) > self.max_items):
+                old_key, _ = self._items.popitem(last=False)
+                self._size -= self._sizes.pop(old_key)
+                self.evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._items:
+                del self._items[key]
+                self._size -= self._sizes.pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._sizes.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "itens": len(self._items),
+                "tamanho": self._size,
+                "acertos": self.hits,
+                "faltas": self.misses,
+                "remocoes": self.evictions,
+            }
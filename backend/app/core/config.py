@@ -3,6 +3,7 @@
 import os
 from functools import lru_cache
 from pathlib import Path
+from typing import Dict
 from urllib.parse import quote_plus
 
 from dotenv import load_dotenv
@@ -11,6 +12,23 @@ BASE_DIR = Path(__file__).resolve().parents[2]
 load_dotenv(dotenv_path=BASE_DIR / ".env")
 
 
+def _parse_pairs(raw: str) -> Dict[str, str]:
+    """Parse ``chave=valor,chave=valor`` into a dict (values may contain ``=``)."""
+    pairs = {}
+    for item in raw.split(","):
+        key, sep, value = item.partition("=")
+        if sep and key.strip() and value.strip():
+            pairs[key.strip()] = value.strip()
+    return pairs
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return raw.lower() in {"1", "true", "yes", "on"}
+
+
 class Settings:
     """Simple settings object backed by environment variables."""
 
@@ -26,16 +44,58 @@ class Settings:
         self.database_sslmode = os.getenv("DATABASE_SSLMODE", "disable")
         self.jwt_secret = os.getenv("JWT_SECRET", "change-me")
         self.jwt_algorithm = os.getenv("JWT_ALGORITHM", "HS256")
+        self.stream_ticket_seconds = int(os.getenv("STREAM_TICKET_SECONDS", "60"))
         raw_origins = os.getenv("ALLOWED_ORIGINS", "")
         self.allowed_origins = [origin.strip() for origin in raw_origins.split(",") if origin.strip()] or [
             "http://localhost:2021"
         ]
-        self.auth_disabled = os.getenv("AUTH_DISABLED", "false").lower() in {
-            "1",
-            "true",
-            "yes",
-            "on",
+        raw_replicas = os.getenv("DATABASE_REPLICA_URLS", "")
+        self.database_replica_urls = [url.strip() for url in raw_replicas.split(",") if url.strip()]
+        self.database_shards = _parse_pairs(os.getenv("DATABASE_SHARDS", ""))
+        self.shard_clientes = {
+            int(cliente_id): shard for cliente_id, shard in _parse_pairs(os.getenv("SHARD_CLIENTES", "")).items()
         }
+        self.replica_max_lag_seconds = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "2"))
+        self.read_your_writes_seconds = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+        self.auth_disabled = _env_flag("AUTH_DISABLED", False)
+        self.rate_limit_enabled = _env_flag("RATE_LIMIT_ENABLED", True)
+        self.rate_limit_store = os.getenv("RATE_LIMIT_STORE", "memory").lower()
+        self.rate_limit_default_per_minute = int(os.getenv("RATE_LIMIT_DEFAULT_PER_MINUTE", "240"))
+        self.rate_limit_trust_forwarded = _env_flag("RATE_LIMIT_TRUST_FORWARDED", False)
+        self.rate_limit_proxy_hops = max(1, int(os.getenv("RATE_LIMIT_PROXY_HOPS", "1")))
+        self.profiling_enabled = _env_flag("PROFILING_ENABLED", False)
+        self.profile_dir = Path(os.getenv("PROFILE_DIR", str(BASE_DIR / "profiles")))
+        self.profile_interval_ms = float(os.getenv("PROFILE_INTERVAL_MS", "2"))
+        self.partition_months_ahead = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+        self.archive_dir = Path(os.getenv("ARCHIVE_DIR", str(BASE_DIR / "arquivo")))
+        self.archive_after_days = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+        self.archive_segment_max_mb = int(os.getenv("ARCHIVE_SEGMENT_MAX_MB", "256"))
+        self.archive_cache_mb = int(os.getenv("ARCHIVE_CACHE_MB", "64"))
+        self.report_cache_mb = int(os.getenv("REPORT_CACHE_MB", "32"))
+        raw_report_cache_dir = os.getenv("REPORT_CACHE_DIR", "")
+        self.report_cache_dir = Path(raw_report_cache_dir) if raw_report_cache_dir else None
+        self.report_cache_disk_mb = int(os.getenv("REPORT_CACHE_DISK_MB", "256"))
+        self.upload_dir = Path(os.getenv("UPLOAD_DIR", str(BASE_DIR / "uploads")))
+        self.upload_expiry_hours = int(os.getenv("UPLOAD_EXPIRY_HOURS", "24"))
+        self.upload_chunk_max_kb = int(os.getenv("UPLOAD_CHUNK_MAX_KB", "1024"))
+        self.image_normalize_enabled = _env_flag("IMAGE_NORMALIZE_ENABLED", False)
+        self.image_max_dimension = int(os.getenv("IMAGE_MAX_DIMENSION", "2000"))
+        self.image_format = os.getenv("IMAGE_FORMAT", "webp").lower()
+        self.image_quality = int(os.getenv("IMAGE_QUALITY", "80"))
+        self.image_keep_original = _env_flag("IMAGE_KEEP_ORIGINAL", False)
+        self.image_workers = int(os.getenv("IMAGE_WORKERS", "2"))
+        self.db_query_cache_size = int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))
+        self.db_prepare_threshold = int(os.getenv("DB_PREPARE_THRESHOLD", "5"))
+        self.audit_enabled = _env_flag("AUDIT_ENABLED", True)
+        self.audit_queue_size = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+        self.audit_batch_size = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+        self.audit_flush_seconds = float(os.getenv("AUDIT_FLUSH_SECONDS", "1"))
+        self.query_guard_enabled = _env_flag("QUERY_GUARD_ENABLED", True)
+        self.maintenance_enabled = _env_flag("MAINTENANCE_ENABLED", False)
+        self.maintenance_interval_minutes = float(os.getenv("MAINTENANCE_INTERVAL_MINUTES", "60"))
+        self.maintenance_dead_ratio = float(os.getenv("MAINTENANCE_DEAD_RATIO", "0.2"))
+        self.maintenance_min_dead_rows = int(os.getenv("MAINTENANCE_MIN_DEAD_ROWS", "1000"))
+        self.maintenance_index_bloat = float(os.getenv("MAINTENANCE_INDEX_BLOAT", "0.3"))
 
     @property
     def database_url(self) -> str:
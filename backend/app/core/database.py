@@ -1,9 +1,33 @@
-"""Database session and engine helpers."""
+"""Database session and engine helpers.
 
+Writes always go to the primary (``get_db``). Read-only routes may use
+``get_read_db``, which routes to one of ``DATABASE_REPLICA_URLS`` unless the
+replica lags more than ``REPLICA_MAX_LAG_SECONDS``, the request echoes an
+``X-Ultima-Escrita`` marker (set on every response that committed a write)
+younger than ``READ_YOUR_WRITES_SECONDS``, or it sends ``X-Leitura-Primaria: 1``.
+The marker travels with the client, so it holds whichever worker serves the
+read. Pointing a replica URL at the primary itself is a valid single-instance
+setup for local testing.
+
+Pieces can also be split across databases by ``cliente_id``: ``DATABASE_SHARDS``
+names the extra databases (``nome=url,...``) and ``SHARD_CLIENTES`` assigns
+clientes to them (``cliente_id=nome,...``). Unassigned clientes stay on the
+primary, which also keeps the reference tables (see ``app/core/sharding.py``).
+
+Engines are created on first use so importing the app stays cheap.
+"""
+
+import itertools
 import logging
-from typing import Generator
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Generator, List, Optional, TypeVar
 
-from sqlalchemy import create_engine
+from fastapi import Depends, Request, Response
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, sessionmaker
 
@@ -13,13 +37,279 @@ logger = logging.getLogger("app.database")
 
 SQLALCHEMY_DATABASE_URL = settings.database_url
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True, future=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+_engine: Optional[Engine] = None
+_replica_router: Optional["ReplicaRouter"] = None
+_shard_router: Optional["ShardRouter"] = None
+_engines_lock = threading.Lock()
+
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    """Engine arguments shared by the primary and the replicas.
+
+    ``query_cache_size`` bounds SQLAlchemy's compiled-statement cache. With the
+    psycopg 3 driver (``postgresql+psycopg://``, and plain ``postgresql://`` on
+    SQLAlchemy 2.1+) statements executed ``DB_PREPARE_THRESHOLD`` times on a
+    connection are also prepared on the server, so Postgres skips parse and
+    plan; ``postgresql+psycopg2://`` has no such mode.
+    """
+    options: Dict[str, Any] = {
+        "pool_pre_ping": True,
+        "future": True,
+        "query_cache_size": settings.db_query_cache_size,
+    }
+    if make_url(url).get_dialect().driver == "psycopg":
+        options["connect_args"] = {"prepare_threshold": settings.db_prepare_threshold}
+    return options
+
+
+def get_engine() -> Engine:
+    """Return the primary engine, creating it (and importing the driver) on first use."""
+    global _engine
+    if _engine is None:
+        with _engines_lock:
+            if _engine is None:
+                _engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_options(SQLALCHEMY_DATABASE_URL))
+    return _engine
+
+
+class _PrimarySession(Session):
+    """Session bound to the primary engine unless another bind is passed."""
+
+    def __init__(self, bind: Optional[Engine] = None, **kwargs: Any) -> None:
+        super().__init__(bind=bind if bind is not None else get_engine(), **kwargs)
+
+
+SessionLocal = sessionmaker(class_=_PrimarySession, autoflush=False, autocommit=False, future=True)
+
+LAG_CHECK_INTERVAL = 2.0
+_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaRouter:
+    """Round-robin over replicas whose last measured lag is acceptable."""
+
+    def __init__(self, engines: List[Engine], max_lag: float) -> None:
+        self.engines = engines
+        self.max_lag = max_lag
+        self._cycle = itertools.cycle(range(len(engines))) if engines else None
+        self._lag: Dict[int, float] = {}
+        self._checked_at: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def lag(self, index: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at.get(index, -math.inf) < LAG_CHECK_INTERVAL:
+                return self._lag[index]
+            # Claim the check so concurrent requests reuse the previous value meanwhile.
+            self._checked_at[index] = now
+            self._lag.setdefault(index, 0.0)
+        try:
+            with self.engines[index].connect() as conn:
+                lag = float(conn.execute(_LAG_QUERY).scalar_one())
+        except SQLAlchemyError:
+            logger.warning("Replica %s unavailable; using the primary", index, exc_info=True)
+            lag = math.inf
+        with self._lock:
+            self._lag[index] = lag
+        return lag
+
+    def pick(self) -> Optional[Engine]:
+        if self._cycle is None:
+            return None
+        for _ in range(len(self.engines)):
+            with self._lock:
+                index = next(self._cycle)
+            if self.lag(index) <= self.max_lag:
+                return self.engines[index]
+        return None
+
+    def status(self) -> List[Dict[str, object]]:
+        status = []
+        for index in range(len(self.engines)):
+            lag = self.lag(index)
+            status.append(
+                {
+                    "replica": index,
+                    "atrasoSegundos": None if math.isinf(lag) else round(lag, 3),
+                    "emUso": lag <= self.max_lag,
+                }
+            )
+        return status
+
+
+def get_replica_router() -> ReplicaRouter:
+    global _replica_router
+    if _replica_router is None:
+        with _engines_lock:
+            if _replica_router is None:
+                # Replica connections are read-only even when a "replica" is the primary itself.
+                engines = [
+                    create_engine(url, **_engine_options(url)).execution_options(
+                        postgresql_readonly=True
+                    )
+                    for url in settings.database_replica_urls
+                ]
+                _replica_router = ReplicaRouter(engines, settings.replica_max_lag_seconds)
+    return _replica_router
+
+
+PRINCIPAL = "principal"
+T = TypeVar("T")
+
+
+class ShardRouter:
+    """Database holding the pieces of each cliente; unassigned clientes use the primary."""
+
+    def __init__(self, engines: Dict[str, Engine], clientes: Dict[int, str]) -> None:
+        unknown = set(clientes.values()) - set(engines)
+        if unknown:
+            raise ValueError(f"SHARD_CLIENTES references unknown shards: {', '.join(sorted(unknown))}")
+        self.engines = engines
+        self.clientes = clientes
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def names(self) -> List[str]:
+        return [PRINCIPAL, *self.engines]
+
+    def all_engines(self) -> Dict[str, Engine]:
+        """The primary and every shard, all of which hold ``pecas``."""
+        return {PRINCIPAL: get_engine(), **self.engines}
+
+    def shard_for(self, cliente_id: int) -> str:
+        return self.clientes.get(cliente_id, PRINCIPAL)
+
+    def session(self, nome: str) -> Session:
+        return SessionLocal(bind=self.engines[nome]) if nome != PRINCIPAL else SessionLocal()
+
+    def scatter(self, db: Session, fn: Callable[[Session], T]) -> List[T]:
+        """Run ``fn`` against ``db`` (the primary) and, in parallel, against every shard."""
+        if not self.engines:
+            return [fn(db)]
 
+        def run(nome: str) -> T:
+            with self.session(nome) as shard_db:
+                return fn(shard_db)
 
-def get_db() -> Generator[Session, None, None]:
+        with ThreadPoolExecutor(max_workers=len(self.engines), thread_name_prefix="shards") as pool:
+            futures = [pool.submit(run, nome) for nome in self.engines]
+            results = [fn(db)]
+            results.extend(future.result() for future in futures)
+        return results
+
+
+class ShardSessions:
+    """Per-request sessions on the shards, opened on first use; the primary one is ``db``."""
+
+    def __init__(self, router: ShardRouter, db: Session) -> None:
+        self.router = router
+        self.db = db
+        self._open: Dict[str, Session] = {}
+
+    def get(self, nome: str) -> Session:
+        if nome == PRINCIPAL:
+            return self.db
+        if nome not in self._open:
+            self._open[nome] = self.router.session(nome)
+        return self._open[nome]
+
+    def for_cliente(self, cliente_id: int) -> Session:
+        return self.get(self.router.shard_for(cliente_id))
+
+    def commit(self) -> None:
+        """Commit the shards first, then the primary (which carries the NOTIFYs)."""
+        for session in self._open.values():
+            session.commit()
+        self.db.commit()
+
+    def close(self) -> None:
+        for session in self._open.values():
+            session.close()
+
+
+def get_shard_router() -> ShardRouter:
+    global _shard_router
+    if _shard_router is None:
+        with _engines_lock:
+            if _shard_router is None:
+                engines = {
+                    nome: create_engine(url, **_engine_options(url)) for nome, url in settings.database_shards.items()
+                }
+                _shard_router = ShardRouter(engines, settings.shard_clientes)
+    return _shard_router
+
+
+def dispose_engines() -> None:
+    """Drop pooled connections inherited across fork; engines not created yet are skipped."""
+    if _engine is not None:
+        _engine.dispose(close=False)
+    if _replica_router is not None:
+        for replica in _replica_router.engines:
+            replica.dispose(close=False)
+    if _shard_router is not None:
+        for shard in _shard_router.engines.values():
+            shard.dispose(close=False)
+
+
+WRITE_MARKER_HEADER = "X-Ultima-Escrita"
+
+
+def _wrote_recently(request: Request) -> bool:
+    """Whether the caller echoed a write marker younger than ``READ_YOUR_WRITES_SECONDS``."""
+    try:
+        written_at = float(request.headers.get(WRITE_MARKER_HEADER, ""))
+    except ValueError:
+        return False
+    return time.time() - written_at < settings.read_your_writes_seconds
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _mark_write(session: Session) -> None:
+    # Wall-clock time so a read landing on another worker or host can compare it.
+    response = session.info.get("resposta")
+    if response is not None:
+        response.headers[WRITE_MARKER_HEADER] = f"{time.time():.3f}"
+
+
+def get_db(response: Response) -> Generator[Session, None, None]:
     """Provide a transactional scope around a series of operations."""
     db = SessionLocal()
+    db.info["resposta"] = response
+    try:
+        yield db
+    except SQLAlchemyError:
+        logger.exception("Database session failed")
+        raise
+    finally:
+        db.close()
+
+
+def get_shard_sessions(db: Session = Depends(get_db)) -> Generator[ShardSessions, None, None]:
+    """Shard sessions for write routes; ``db`` is the same session the route receives."""
+    shards = ShardSessions(get_shard_router(), db)
+    try:
+        yield shards
+    finally:
+        shards.close()
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """Like ``get_db`` but for read-only routes; may be served by a replica."""
+    target = None
+    if request.headers.get("x-leitura-primaria") != "1" and not _wrote_recently(request):
+        target = get_replica_router().pick()
+    db = SessionLocal(bind=target) if target is not None else SessionLocal()
     try:
         yield db
     except SQLAlchemyError:
@@ -0,0 +1,179 @@
+"""Change feed for peças: Postgres LISTEN/NOTIFY fanned out to SSE subscribers."""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.database import get_engine
+
+logger = logging.getLogger("app.events")
+
+CHANNEL = "pecas_alteracoes"
+MAX_PAYLOAD_BYTES = 7900  # NOTIFY payloads must stay under 8000 bytes
+QUEUE_SIZE = 256
+
+
+def notify_peca_change(
+    db: Session,
+    acao: str,
+    peca_id: int,
+    cliente_id: int,
+    campos: Optional[Dict[str, Any]] = None,
+    cliente_anterior_id: Optional[int] = None,
+) -> None:
+    """Queue a NOTIFY in the current transaction; it is delivered only if the commit succeeds.
+
+    ``campos`` holds only the changed fields in ``PecaOut`` naming and must never
+    contain the proof image.
+    """
+    message: Dict[str, Any] = {"acao": acao, "id": peca_id, "clienteId": cliente_id}
+    if cliente_anterior_id is not None and cliente_anterior_id != cliente_id:
+        message["clienteAnteriorId"] = cliente_anterior_id
+    if campos:
+        message["campos"] = jsonable_encoder(campos)
+    payload = json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+    if len(payload.encode("utf-8")) > MAX_PAYLOAD_BYTES:
+        # Too large (e.g. a long observação): send the id only and let clients refetch.
+        message.pop("campos", None)
+        message["parcial"] = True
+        payload = json.dumps(message, separators=(",", ":"))
+    db.execute(text("SELECT pg_notify(:canal, :payload)"), {"canal": CHANNEL, "payload": payload})
+
+
+def notify_reload(db: Session, cliente_ids: Iterable[int]) -> None:
+    """Ask subscribers of these clientes to refetch, for changes too large to send as deltas."""
+    for cliente_id in set(cliente_ids):
+        payload = json.dumps({"acao": "recarregar", "clienteId": cliente_id}, separators=(",", ":"))
+        db.execute(text("SELECT pg_notify(:canal, :payload)"), {"canal": CHANNEL, "payload": payload})
+
+
+def _notifications(connection: Any, timeout: float) -> Iterator[str]:
+    """Payloads received on a LISTEN connection, as they arrive, for at most ``timeout`` seconds.
+
+    psycopg 3 exposes them as a generator; psycopg2 needs ``poll()`` once the
+    socket is readable.
+    """
+    if callable(connection.notifies):
+        for notify in connection.notifies(timeout=timeout):
+            yield notify.payload
+        return
+    if select.select([connection], [], [], timeout) == ([], [], []):
+        return
+    connection.poll()
+    while connection.notifies:
+        yield connection.notifies.pop(0).payload
+
+
+class Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, cliente_id: Optional[int]) -> None:
+        self.loop = loop
+        self.cliente_id = cliente_id
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def wants(self, message: Dict[str, Any]) -> bool:
+        if self.cliente_id is None:
+            return True
+        return self.cliente_id in (message.get("clienteId"), message.get("clienteAnteriorId"))
+
+    def offer(self, message: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # The client fell behind: drop the backlog and ask it to reload once.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"acao": "recarregar"})
+
+
+class ChangeBroker:
+    """One LISTEN connection per worker process, shared by every SSE stream."""
+
+    def __init__(self) -> None:
+        self._subscribers: List[Subscriber] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._sequence = 0
+
+    def subscribe(self, cliente_id: Optional[int]) -> Subscriber:
+        subscriber = Subscriber(asyncio.get_running_loop(), cliente_id)
+        with self._lock:
+            self._subscribers.append(subscriber)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._listen_forever, name="pecas-listen", daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def _dispatch(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed notification: %r", payload[:200])
+            return
+        self._sequence += 1
+        message["seq"] = self._sequence
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            if subscriber.wants(message):
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, message)
+
+    def _broadcast_reload(self) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.loop.call_soon_threadsafe(subscriber.offer, {"acao": "recarregar"})
+
+    def _listen_forever(self) -> None:
+        backoff = 1.0
+        recovering = False
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            raw = None
+            try:
+                raw = get_engine().raw_connection()
+                raw.detach()
+                connection = getattr(raw, "driver_connection", None) or raw.connection
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                if recovering:
+                    # Notifications sent while disconnected are lost.
+                    self._broadcast_reload()
+                recovering = False
+                backoff = 1.0
+                while True:
+                    with self._lock:
+                        if not self._subscribers:
+                            break
+                    for payload in _notifications(connection, 5.0):
+                        self._dispatch(payload)
+            except Exception:
+                logger.exception("Change feed listener failed; reconnecting in %.0fs", backoff)
+                recovering = True
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:  # pragma: no cover - connection already gone
+                        pass
+
+
+broker = ChangeBroker()
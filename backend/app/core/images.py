@@ -0,0 +1,92 @@
+"""Proof image helpers.
+
+Proofs travel and are stored as base64 (optionally as a ``data:`` URL). They
+are validated chunk by chunk so no full decoded copy of the image is built
+next to the request body.
+"""
+
+import base64
+import binascii
+from typing import NamedTuple, Optional
+
+CHUNK_CHARS = 64 * 1024  # multiple of 4, so every chunk decodes on its own
+
+ALLOWED_MIME_TYPES = ("image/png", "image/jpeg", "image/gif", "image/webp")
+_MIME_ALIASES = {"image/jpg": "image/jpeg", "image/pjpeg": "image/jpeg"}
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+class ProofInfo(NamedTuple):
+    mime_type: str
+    size: int
+    header: str  # e.g. "data:image/png;base64", empty for bare base64
+    offset: int  # index where the base64 payload starts
+
+
+def sniff_mime(head: bytes) -> Optional[str]:
+    """Detect the image type from its first bytes."""
+    for signature, mime in _SIGNATURES:
+        if head.startswith(signature):
+            return mime
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def inspect_proof(value: str, max_bytes: int) -> ProofInfo:
+    """Validate a base64 proof without decoding it in one piece.
+
+    Rejects oversized payloads before decoding anything, decodes
+    ``CHUNK_CHARS`` at a time and checks the magic bytes of the first chunk.
+    Raises ``ValueError`` with the message shown to the user.
+    """
+    if not value:
+        raise ValueError("Comprovação é obrigatória.")
+
+    header, offset = "", 0
+    if value.startswith("data:"):
+        comma = value.find(",")
+        if comma < 0:
+            raise ValueError("Comprovação deve ser um base64 válido.")
+        header, offset = value[:comma], comma + 1
+        if not header.lower().startswith("data:image/"):
+            raise ValueError("A comprovação deve ser uma imagem (data URL).")
+
+    limit_mb = max_bytes // (1024 * 1024)
+    length = len(value) - offset
+    if length // 4 * 3 - 2 > max_bytes:
+        raise ValueError(f"Comprovação deve ter no máximo {limit_mb}MB.")
+    if length % 4:
+        raise ValueError("Comprovação deve ser um base64 válido.")
+    padding = value.find("=", offset)
+    if padding != -1 and padding < len(value) - 2:
+        # Chunks are decoded separately, so padding in the middle would go unnoticed.
+        raise ValueError("Comprovação deve ser um base64 válido.")
+
+    mime: Optional[str] = None
+    size = 0
+    for start in range(offset, len(value), CHUNK_CHARS):
+        try:
+            decoded = base64.b64decode(value[start : start + CHUNK_CHARS], validate=True)
+        except (ValueError, binascii.Error) as exc:  # pragma: no cover - depends on user input
+            raise ValueError("Comprovação deve ser um base64 válido.") from exc
+        if mime is None:
+            mime = sniff_mime(decoded[:16])
+            if mime is None:
+                raise ValueError("A comprovação deve ser uma imagem PNG, JPEG, GIF ou WebP.")
+        size += len(decoded)
+        if size > max_bytes:
+            raise ValueError(f"Comprovação deve ter no máximo {limit_mb}MB.")
+
+    if mime is None:
+        raise ValueError("Comprovação é obrigatória.")
+    if header:
+        declared = header[5:].split(";")[0].lower()
+        if _MIME_ALIASES.get(declared, declared) != mime:
+            raise ValueError("O tipo declarado na comprovação não corresponde ao conteúdo da imagem.")
+    return ProofInfo(mime, size, header, offset)
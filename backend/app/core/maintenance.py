@@ -0,0 +1,417 @@
+"""Bloat monitor and targeted maintenance for ``pecas`` and its TOAST data.
+
+Every update that replaces ``comprovacao_base64`` rewrites its TOAST chunks and
+every delete leaves dead ones behind, so the leaf tables of ``pecas`` (each
+monthly partition, or the table itself while unpartitioned) are checked for:
+
+* dead heap and TOAST tuples (``pg_stat_*_tables``), cleaned with
+  ``VACUUM (ANALYZE)``, which also processes the TOAST relation;
+* rows modified since the last analyze, refreshed with ``ANALYZE`` so plans
+  follow the data;
+* index bloat (btree leaf density from ``pgstatindex``), rebuilt with
+  ``REINDEX INDEX CONCURRENTLY``.
+
+Free space and index density need the ``pgstattuple`` extension
+(``sql/008_pgstattuple.sql``); without it those columns are empty and no
+reindex is planned. Plain ``VACUUM`` makes the space reusable instead of
+returning it to the OS, which keeps disk use stable without the exclusive
+lock of ``VACUUM FULL``.
+
+With ``MAINTENANCE_ENABLED`` each database is checked once every
+``MAINTENANCE_INTERVAL_MINUTES``: every worker polls, but a run is first
+claimed in ``manutencao_execucoes`` on the primary
+(``sql/009_manutencao_execucoes.sql``), so only one worker makes it, and an
+advisory lock keeps manual runs from overlapping it. The primary and every
+shard are covered. Each run also creates the monthly partitions of ``pecas``
+due within ``PARTITION_MONTHS_AHEAD``, so a long-lived process does not
+depend on the ones made at startup. The report of the last run is stored in
+the same table and served by the admin API to every worker, since the
+``pgstattuple`` scans read every page of the tables and indexes they measure.
+
+Usage::
+
+    python -m app.core.maintenance relatorio
+    python -m app.core.maintenance executar --forcar
+"""
+
+import argparse
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.core.database import get_engine, get_shard_router
+from app.core.partitions import ensure_partitions
+from app.models import ExecucaoManutencao
+
+logger = logging.getLogger("app.maintenance")
+
+# Arbitrary constant, next to the one used by app/core/partitions.py.
+_ADVISORY_LOCK_ID = 734_002
+# Btree indexes are built with fillfactor 90; density below it is bloat.
+_BTREE_FILLFACTOR = 90.0
+# Rebuilding small indexes gains nothing measurable.
+_MIN_INDEX_BYTES = 8 * 1024 * 1024
+# How often each worker checks whether a scheduled run is due.
+_POLL_SECONDS = 60.0
+
+_LEAVES = "SELECT relid FROM pg_partition_tree('pecas'::regclass) WHERE isleaf"
+
+_PGSTATTUPLE_QUERY = text(
+    """
+    SELECT CASE WHEN to_regprocedure('pgstatindex(regclass)') IS NULL
+                  OR to_regprocedure('pgstattuple_approx(regclass)') IS NULL THEN false
+                ELSE has_function_privilege('pgstatindex(regclass)', 'EXECUTE')
+                 AND has_function_privilege('pgstattuple_approx(regclass)', 'EXECUTE')
+           END
+    """
+)
+
+_TABLES_QUERY = text(
+    f"""
+    SELECT c.oid::regclass::text AS tabela,
+           NULLIF(c.reltoastrelid, 0)::regclass::text AS toast,
+           pg_relation_size(c.oid) AS bytes_tabela,
+           COALESCE(pg_relation_size(NULLIF(c.reltoastrelid, 0)), 0) AS bytes_toast,
+           pg_indexes_size(c.oid) AS bytes_indices,
+           s.n_live_tup AS vivas,
+           s.n_dead_tup AS mortas,
+           s.n_mod_since_analyze AS modificadas,
+           COALESCE(t.n_live_tup, 0) AS toast_vivas,
+           COALESCE(t.n_dead_tup, 0) AS toast_mortas,
+           GREATEST(s.last_vacuum, s.last_autovacuum) AS ultimo_vacuum,
+           GREATEST(s.last_analyze, s.last_autoanalyze) AS ultimo_analyze
+    FROM pg_class c
+    JOIN pg_stat_user_tables s ON s.relid = c.oid
+    LEFT JOIN pg_stat_all_tables t ON t.relid = c.reltoastrelid
+    WHERE c.oid IN ({_LEAVES})
+    ORDER BY c.relname
+    """
+)
+
+_INDEXES_QUERY = text(
+    f"""
+    SELECT i.indexrelid::regclass::text AS indice,
+           i.indrelid::regclass::text AS tabela,
+           am.amname = 'btree' AS btree,
+           pg_relation_size(i.indexrelid) AS bytes,
+           s.idx_scan AS leituras
+    FROM pg_index i
+    JOIN pg_class ic ON ic.oid = i.indexrelid
+    JOIN pg_am am ON am.oid = ic.relam
+    JOIN pg_stat_user_indexes s ON s.indexrelid = i.indexrelid
+    WHERE i.indrelid IN ({_LEAVES}) AND i.indisvalid
+    ORDER BY 2, 1
+    """
+)
+
+
+def _ratio(part: int, whole: int) -> float:
+    return round(part / whole, 4) if whole else 0.0
+
+
+def has_pgstattuple(conn: Connection) -> bool:
+    return bool(conn.execute(_PGSTATTUPLE_QUERY).scalar_one())
+
+
+def _free_percent(conn: Connection, relation: Optional[str]) -> Optional[float]:
+    if relation is None:
+        return None
+    row = conn.execute(
+        text("SELECT approx_free_percent FROM pgstattuple_approx(CAST(:rel AS regclass))"), {"rel": relation}
+    ).one()
+    return round(float(row[0]), 2)
+
+
+def table_health(conn: Connection, detailed: bool) -> List[Dict[str, Any]]:
+    """Size, dead tuples and last maintenance of each leaf table of ``pecas``."""
+    tabelas = []
+    for row in conn.execute(_TABLES_QUERY).mappings():
+        tabelas.append(
+            {
+                "tabela": row["tabela"],
+                "bytesTabela": row["bytes_tabela"],
+                "bytesToast": row["bytes_toast"],
+                "bytesIndices": row["bytes_indices"],
+                "linhasVivas": row["vivas"],
+                "linhasMortas": row["mortas"],
+                "proporcaoMortas": _ratio(row["mortas"], row["vivas"] + row["mortas"]),
+                "toastMortas": row["toast_mortas"],
+                "proporcaoToastMortas": _ratio(row["toast_mortas"], row["toast_vivas"] + row["toast_mortas"]),
+                "proporcaoModificadas": _ratio(row["modificadas"], row["vivas"]),
+                "espacoLivrePct": _free_percent(conn, row["tabela"]) if detailed else None,
+                "espacoLivreToastPct": _free_percent(conn, row["toast"]) if detailed else None,
+                "ultimoVacuum": row["ultimo_vacuum"],
+                "ultimoAnalyze": row["ultimo_analyze"],
+            }
+        )
+    return tabelas
+
+
+def index_health(conn: Connection, detailed: bool) -> List[Dict[str, Any]]:
+    """Size, usage and (with ``pgstattuple``, btree only) estimated bloat of each leaf index."""
+    indices = []
+    for row in conn.execute(_INDEXES_QUERY).mappings():
+        inchaco = None
+        if detailed and row["btree"] and row["bytes"] > 0:
+            densidade = conn.execute(
+                text("SELECT avg_leaf_density FROM pgstatindex(CAST(:rel AS regclass))"), {"rel": row["indice"]}
+            ).scalar_one()
+            # An index without leaf pages reports NaN.
+            if densidade == densidade:
+                inchaco = round(max(0.0, 1 - float(densidade) / _BTREE_FILLFACTOR), 4)
+        indices.append(
+            {
+                "indice": row["indice"],
+                "tabela": row["tabela"],
+                "bytes": row["bytes"],
+                "leituras": row["leituras"],
+                "inchaco": inchaco,
+            }
+        )
+    return indices
+
+
+def bloat_report(conn: Connection, detailed: bool = True) -> Dict[str, Any]:
+    """Table and index health; ``detailed`` adds the ``pgstattuple`` scans when the extension exists."""
+    disponivel = has_pgstattuple(conn)
+    detailed = detailed and disponivel
+    return {
+        "pgstattuple": disponivel,
+        "detalhado": detailed,
+        "tabelas": table_health(conn, detailed),
+        "indices": index_health(conn, detailed),
+    }
+
+
+def plan_actions(report: Dict[str, Any], forcar: bool = False) -> List[Dict[str, str]]:
+    """Actions due by the configured thresholds; ``forcar`` vacuums every table regardless."""
+    acoes = []
+    limite = settings.maintenance_dead_ratio
+    for tabela in report["tabelas"]:
+        mortas = tabela["linhasMortas"] + tabela["toastMortas"]
+        if forcar:
+            motivo = "execução forçada"
+        elif mortas < settings.maintenance_min_dead_rows:
+            motivo = ""
+        elif tabela["proporcaoToastMortas"] >= limite:
+            motivo = f"{tabela['proporcaoToastMortas']:.0%} de tuplas mortas no TOAST"
+        elif tabela["proporcaoMortas"] >= limite:
+            motivo = f"{tabela['proporcaoMortas']:.0%} de tuplas mortas"
+        else:
+            motivo = ""
+        if motivo:
+            acoes.append({"acao": "vacuum", "alvo": tabela["tabela"], "motivo": motivo})
+        elif tabela["proporcaoModificadas"] >= limite:
+            motivo = f"{tabela['proporcaoModificadas']:.0%} das linhas alteradas desde a última análise"
+            acoes.append({"acao": "analyze", "alvo": tabela["tabela"], "motivo": motivo})
+    for indice in report["indices"]:
+        inchaco = indice["inchaco"]
+        if inchaco is not None and inchaco >= settings.maintenance_index_bloat and indice["bytes"] >= _MIN_INDEX_BYTES:
+            acoes.append({"acao": "reindex", "alvo": indice["indice"], "motivo": f"{inchaco:.0%} de inchaço"})
+    return acoes
+
+
+_STATEMENTS = {
+    "vacuum": "VACUUM (ANALYZE) {}",
+    "analyze": "ANALYZE {}",
+    "reindex": "REINDEX INDEX CONCURRENTLY {}",
+}
+
+
+def run_actions(conn: Connection, acoes: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """Run the actions on an autocommit connection; a failure is recorded and the rest still run."""
+    executadas = []
+    for acao in acoes:
+        started = time.perf_counter()
+        erro = None
+        try:
+            # Targets come from regclass output, which is already quoted.
+            conn.execute(text(_STATEMENTS[acao["acao"]].format(acao["alvo"])))
+        except SQLAlchemyError as exc:
+            logger.exception("Maintenance action failed: %s %s", acao["acao"], acao["alvo"])
+            erro = str(exc.orig if getattr(exc, "orig", None) is not None else exc)
+        executadas.append({**acao, "segundos": round(time.perf_counter() - started, 3), "erro": erro})
+    return executadas
+
+
+def engines() -> Dict[str, Engine]:
+    """The primary and every shard, all of which hold ``pecas``."""
+    return get_shard_router().all_engines()
+
+
+def maintain(engine: Engine, forcar: bool = False) -> Dict[str, Any]:
+    """Create the partitions due, measure one database and run the actions due.
+
+    Skipped while another process holds the lock. The report the actions were
+    planned from is returned under ``relatorio``.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if not conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": _ADVISORY_LOCK_ID}).scalar_one():
+            return {"ignorado": "Manutenção em andamento em outro processo."}
+        try:
+            criadas: List[str] = []
+            if settings.partition_months_ahead > 0:
+                # Its own transaction: ensure_partitions serializes on a transaction-level lock.
+                with engine.begin() as partitions_conn:
+                    criadas = ensure_partitions(partitions_conn, settings.partition_months_ahead)
+            relatorio = bloat_report(conn)
+            return {
+                "particoesCriadas": criadas,
+                "relatorio": relatorio,
+                "acoes": run_actions(conn, plan_actions(relatorio, forcar)),
+            }
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": _ADVISORY_LOCK_ID})
+
+
+def _claim(banco: str, interval_seconds: float) -> bool:
+    """Reserve the scheduled run of ``banco``; False if any run started less than an interval ago."""
+    stmt = insert(ExecucaoManutencao).values(banco=banco, iniciada_em=func.now())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ExecucaoManutencao.banco],
+        set_={"iniciada_em": stmt.excluded.iniciada_em},
+        where=ExecucaoManutencao.iniciada_em <= func.now() - timedelta(seconds=interval_seconds),
+    ).returning(ExecucaoManutencao.banco)
+    with get_engine().begin() as conn:
+        return conn.execute(stmt).first() is not None
+
+
+def _record(banco: str, iniciada: datetime, relatorio: Optional[Dict[str, Any]], resultado: Dict[str, Any]) -> None:
+    """Store a run on the primary; the report is kept from the previous run when this one has none."""
+    values: Dict[str, Any] = {"iniciada_em": iniciada, "resultado": jsonable_encoder(resultado)}
+    if relatorio is not None:
+        values.update(medido_em=iniciada, relatorio=jsonable_encoder(relatorio))
+    stmt = insert(ExecucaoManutencao).values(banco=banco, **values)
+    with get_engine().begin() as conn:
+        conn.execute(stmt.on_conflict_do_update(index_elements=[ExecucaoManutencao.banco], set_=values))
+
+
+class MaintenanceScheduler:
+    """Background thread running ``maintain`` on every database at a fixed interval."""
+
+    def __init__(self, interval_seconds: float, history: int = 20) -> None:
+        self.interval_seconds = interval_seconds
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def run_now(self, forcar: bool = False, agendada: bool = False) -> List[Dict[str, Any]]:
+        """Maintain every database; ``agendada`` skips those another worker ran within the interval."""
+        iniciado = datetime.now(timezone.utc)
+        resultados = []
+        for banco, engine in engines().items():
+            try:
+                if agendada and not _claim(banco, self.interval_seconds):
+                    continue
+                resultado = maintain(engine, forcar)
+            except SQLAlchemyError as exc:
+                logger.exception("Maintenance of %s failed", banco)
+                resultado = {"erro": str(exc.orig if getattr(exc, "orig", None) is not None else exc)}
+            relatorio = resultado.pop("relatorio", None)
+            try:
+                _record(banco, iniciado, relatorio, resultado)
+            except SQLAlchemyError:
+                logger.exception("Could not record the maintenance of %s", banco)
+            resultados.append({"banco": banco, **resultado})
+        if resultados:
+            with self._lock:
+                self.history.appendleft({"iniciadoEm": iniciado, "forcada": forcar, "bancos": resultados})
+        return resultados
+
+    def _run(self) -> None:
+        while not self._stopping.wait(min(self.interval_seconds, _POLL_SECONDS)):
+            self.run_now(agendada=True)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="manutencao", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        # A VACUUM in progress is not waited for; the server cancels it when the connection closes.
+        self._stopping.set()
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """Runs made by this worker."""
+        with self._lock:
+            return list(self.history)
+
+    def last_reports(self) -> List[Dict[str, Any]]:
+        """The report measured by the last run on each database, whichever worker made it."""
+        try:
+            with get_engine().connect() as conn:
+                rows = conn.execute(
+                    select(ExecucaoManutencao.banco, ExecucaoManutencao.medido_em, ExecucaoManutencao.relatorio)
+                    .where(ExecucaoManutencao.relatorio.is_not(None))
+                ).all()
+        except SQLAlchemyError:
+            logger.exception("Could not read the last maintenance reports")
+            return []
+        reports = {row.banco: {"banco": row.banco, "medidoEm": row.medido_em, **row.relatorio} for row in rows}
+        return [reports[banco] for banco in engines() if banco in reports]
+
+
+maintenance_scheduler = MaintenanceScheduler(settings.maintenance_interval_minutes * 60)
+
+
+def bloat_status(detailed: bool = True) -> List[Dict[str, Any]]:
+    """Live bloat report and pending actions of every database."""
+    bancos = []
+    for banco, engine in engines().items():
+        medido_em = datetime.now(timezone.utc)
+        with engine.connect() as conn:
+            report = bloat_report(conn, detailed)
+        bancos.append({"banco": banco, "medidoEm": medido_em, **report, "acoesPendentes": plan_actions(report)})
+    return bancos
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Monitor de inchaço e manutenção de peças")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("relatorio", help="Mostra inchaço de tabelas, TOAST e índices")
+    executar = sub.add_parser("executar", help="Executa VACUUM/ANALYZE/REINDEX conforme os limites")
+    executar.add_argument("--forcar", action="store_true", help="Executa VACUUM (ANALYZE) em todas as tabelas")
+    args = parser.parse_args()
+
+    if args.comando == "relatorio":
+        for banco in bloat_status():
+            print(f"[{banco['banco']}]" + ("" if banco["pgstattuple"] else " (sem pgstattuple)"))
+            for tabela in banco["tabelas"]:
+                print(
+                    f"  {tabela['tabela']:<28} heap {tabela['bytesTabela'] / 1024 / 1024:>9.1f} MB "
+                    f"({tabela['proporcaoMortas']:.0%} mortas)  "
+                    f"toast {tabela['bytesToast'] / 1024 / 1024:>9.1f} MB ({tabela['proporcaoToastMortas']:.0%} mortas)"
+                )
+            for indice in banco["indices"]:
+                inchaco = "?" if indice["inchaco"] is None else f"{indice['inchaco']:.0%}"
+                print(f"  {indice['indice']:<40} {indice['bytes'] / 1024 / 1024:>9.1f} MB  inchaço {inchaco}")
+            for acao in banco["acoesPendentes"]:
+                print(f"  -> {acao['acao']} {acao['alvo']}: {acao['motivo']}")
+    else:
+        for banco in maintenance_scheduler.run_now(args.forcar):
+            if "acoes" not in banco:
+                print(f"[{banco['banco']}] {banco.get('ignorado') or banco.get('erro')}")
+                continue
+            print(f"[{banco['banco']}] {len(banco['acoes'])} ação(ões)")
+            if banco["particoesCriadas"]:
+                print(f"  partições criadas: {', '.join(banco['particoesCriadas'])}")
+            for acao in banco["acoes"]:
+                resultado = f"erro: {acao['erro']}" if acao["erro"] else f"{acao['segundos']:.1f}s"
+                print(f"  {acao['acao']} {acao['alvo']}: {resultado}")
+
+
+if __name__ == "__main__":
+    main()
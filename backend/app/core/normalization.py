@@ -0,0 +1,207 @@
+"""Server-side normalization of proof images: downscale and re-encode on ingest.
+
+Enabled with ``IMAGE_NORMALIZE_ENABLED``. Work runs in a small thread pool
+(Pillow releases the GIL while decoding and encoding) so at most
+``IMAGE_WORKERS`` images are held decoded at once per process.
+
+Usage::
+
+    python -m app.core.normalization relatorio --limite 2000
+    python -m app.core.normalization relatorio --formato jpeg --qualidade 75
+"""
+
+import argparse
+import base64
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.core.archive import ARCHIVED_MARKER
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Peca
+
+# Pillow is optional and imported on first use (see ``_load_pillow``).
+Image: Any = None
+ImageOps: Any = None
+
+logger = logging.getLogger("app.normalization")
+
+FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+}
+MIN_SAVINGS = 0.1  # keep the upload when re-encoding saves less than 10%
+# Largest source decoded, as a multiple of the target side: a 5MB PNG can hold far
+# more pixels than it is worth decoding (four bytes each) in every worker thread.
+MAX_SOURCE_SCALE = 2
+
+
+class Policy(NamedTuple):
+    max_dimension: int
+    image_format: str
+    quality: int
+    keep_original: bool
+
+
+class Normalized(NamedTuple):
+    value: str
+    original: Optional[str]  # the upload, when the policy keeps it
+    bytes_before: int
+    bytes_after: int
+
+
+def policy_from_settings() -> Policy:
+    if settings.image_format not in FORMATS:
+        raise ValueError(f"IMAGE_FORMAT inválido: {settings.image_format}")
+    return Policy(
+        max_dimension=settings.image_max_dimension,
+        image_format=settings.image_format,
+        quality=settings.image_quality,
+        keep_original=settings.image_keep_original,
+    )
+
+
+def _load_pillow() -> bool:
+    global Image, ImageOps
+    if Image is None:
+        try:
+            from PIL import Image as _Image, ImageOps as _ImageOps
+        except ImportError:  # pragma: no cover - normalization is skipped
+            return False
+        Image, ImageOps = _Image, _ImageOps
+    return True
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=settings.image_workers, thread_name_prefix="imagens")
+        return _pool
+
+
+def _flatten(image: Any) -> Any:
+    """Paste a transparent image onto white; JPEG has no alpha channel."""
+    image = image.convert("RGBA")
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def reencode(raw: bytes, policy: Policy) -> Optional[Tuple[bytes, str]]:
+    """Downscale and re-encode ``raw``; None when the result is not meaningfully smaller."""
+    pil_format, mime = FORMATS[policy.image_format]
+    with Image.open(io.BytesIO(raw)) as source:
+        if getattr(source, "is_animated", False):
+            return None
+        if source.format == "JPEG":
+            # libjpeg decodes at 1/2, 1/4 or 1/8 scale while staying at least this large.
+            source.draft(None, (policy.max_dimension, policy.max_dimension))
+        width, height = source.size
+        if width * height > (policy.max_dimension * MAX_SOURCE_SCALE) ** 2:
+            logger.info("Not normalizing a %sx%s proof image: too many pixels to decode", width, height)
+            return None
+        image = ImageOps.exif_transpose(source)
+        image.thumbnail((policy.max_dimension, policy.max_dimension), Image.LANCZOS)
+        if pil_format == "JPEG" and image.mode != "RGB":
+            has_alpha = "A" in image.getbands() or "transparency" in image.info
+            image = _flatten(image) if has_alpha else image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        out = io.BytesIO()
+        image.save(out, format=pil_format, quality=policy.quality, optimize=True)
+    data = out.getvalue()
+    if len(data) > len(raw) * (1 - MIN_SAVINGS):
+        return None
+    return data, mime
+
+
+def _normalize(value: str, policy: Policy) -> Normalized:
+    _, sep, payload = value.partition(",")
+    raw = base64.b64decode(payload if sep else value)
+    try:
+        result = reencode(raw, policy)
+    except Exception:  # Pillow raises many types for unusual files; keep the upload
+        logger.warning("Could not normalize proof image", exc_info=True)
+        result = None
+    if result is None:
+        return Normalized(value, None, len(raw), len(raw))
+    data, mime = result
+    normalized = f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+    return Normalized(normalized, value if policy.keep_original else None, len(raw), len(data))
+
+
+def normalize_proof(value: str) -> Normalized:
+    """Apply the ingest policy to an already validated proof."""
+    if not settings.image_normalize_enabled or not _load_pillow():
+        return Normalized(value, None, 0, 0)
+    return _executor().submit(_normalize, value, policy_from_settings()).result()
+
+
+def savings_report(policy: Policy, limit: int, batch_size: int) -> Dict[str, int]:
+    """Dry-run the policy over stored proofs (archived ones are skipped)."""
+    report = {"analisadas": 0, "reduzidas": 0, "bytes_antes": 0, "bytes_depois": 0}
+    last_id = 0
+    db = SessionLocal()
+    try:
+        while not limit or report["analisadas"] < limit:
+            size = min(batch_size, limit - report["analisadas"]) if limit else batch_size
+            rows = db.execute(
+                select(Peca.id, Peca.comprovacao_base64)
+                .where(Peca.id > last_id)
+                .where(~Peca.comprovacao_base64.startswith(ARCHIVED_MARKER))
+                .order_by(Peca.id)
+                .limit(size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            values = [row.comprovacao_base64 for row in rows]
+            for result in _executor().map(lambda value: _normalize(value, policy), values):
+                report["analisadas"] += 1
+                report["reduzidas"] += result.bytes_after < result.bytes_before
+                report["bytes_antes"] += result.bytes_before
+                report["bytes_depois"] += result.bytes_after
+    finally:
+        db.close()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Normalização de comprovações")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    relatorio = sub.add_parser("relatorio", help="Estima a economia sobre as comprovações gravadas")
+    relatorio.add_argument("--limite", type=int, default=0, help="Máximo de peças analisadas (0 = todas)")
+    relatorio.add_argument("--lote", type=int, default=50)
+    relatorio.add_argument("--formato", choices=sorted(FORMATS), default=settings.image_format)
+    relatorio.add_argument("--qualidade", type=int, default=settings.image_quality)
+    relatorio.add_argument("--dimensao", type=int, default=settings.image_max_dimension)
+    args = parser.parse_args()
+
+    if not _load_pillow():
+        parser.error("Pacote 'Pillow' necessário para normalizar imagens.")
+    policy = Policy(args.dimensao, args.formato, args.qualidade, keep_original=False)
+    report = savings_report(policy, args.limite, args.lote)
+    before, after = report["bytes_antes"], report["bytes_depois"]
+    saved = before - after
+    print(f"Comprovações analisadas: {report['analisadas']} ({report['reduzidas']} reduzidas)")
+    print(f"Tamanho atual: {before / 1024 / 1024:.1f} MB")
+    print(
+        f"Após normalização ({args.formato}, q={args.qualidade}, {args.dimensao}px): "
+        f"{after / 1024 / 1024:.1f} MB"
+    )
+    print(f"Economia: {saved / 1024 / 1024:.1f} MB ({saved / before * 100 if before else 0:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Maintenance helpers for the monthly range partitions of ``pecas``.
+
+The table is converted by ``sql/001_pecas_particionamento.sql``; these helpers
+are no-ops while ``pecas`` is still a plain table. The commands run on the
+primary and on every shard (``DATABASE_SHARDS``) unless ``--banco`` names one.
+
+Usage::
+
+    python -m app.core.partitions garantir --meses 3
+    python -m app.core.partitions --banco principal listar
+    python -m app.core.partitions verificar --inicio 2025-01-01 --fim 2025-01-31
+    python -m app.core.partitions desanexar pecas_p2019_01 --schema arquivo
+"""
+
+import argparse
+import logging
+import re
+from datetime import date
+from typing import Any, Dict, List, Set
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.core.database import get_engine, get_shard_router
+
+logger = logging.getLogger("app.partitions")
+
+PARENT_TABLE = "pecas"
+PARTITION_NAME = re.compile(r"^pecas_p\d{4}_\d{2}$")
+
+# Arbitrary constant so concurrent workers do not race creating partitions.
+_ADVISORY_LOCK_ID = 734_001
+
+
+def _month_start(value: date, offset: int = 0) -> date:
+    month_index = value.year * 12 + value.month - 1 + offset
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month.year:04d}_{month.month:02d}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    return bool(
+        conn.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.relname = :parent AND c.relnamespace = 'public'::regnamespace"
+            ),
+            {"parent": PARENT_TABLE},
+        ).first()
+    )
+
+
+def list_partitions(conn: Connection) -> List[Dict[str, Any]]:
+    rows = conn.execute(
+        text(
+            """
+            SELECT child.relname AS nome,
+                   pg_get_expr(child.relpartbound, child.oid) AS limites,
+                   pg_total_relation_size(child.oid) AS bytes,
+                   child.reltuples::bigint AS linhas_estimadas
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :parent
+            ORDER BY child.relname
+            """
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    return [dict(row._mapping) for row in rows]
+
+
+def default_partition(conn: Connection) -> str | None:
+    return conn.execute(
+        text(
+            "SELECT c.relname FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partdefid "
+            "WHERE pt.partrelid = CAST(:parent AS regclass)"
+        ),
+        {"parent": PARENT_TABLE},
+    ).scalar()
+
+
+def _create_partition(conn: Connection, name: str, start: date, end: date, default: str | None) -> None:
+    bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    in_range = "data_criacao >= :inicio AND data_criacao < :fim"
+    params = {"inicio": start, "fim": end}
+    if default is None or not conn.execute(text(f'SELECT 1 FROM "{default}" WHERE {in_range} LIMIT 1'), params).first():
+        conn.execute(text(f'CREATE TABLE "{name}" PARTITION OF {PARENT_TABLE} {bounds}'))
+        return
+    # The default partition holds rows of this month, so the new partition's bounds would conflict with it.
+    # Move them with the default detached: the rows only change table, so no trigger on pecas fires.
+    columns = conn.execute(
+        text(
+            "SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) FROM pg_attribute "
+            "WHERE attrelid = CAST(:parent AS regclass) AND attnum > 0 AND NOT attisdropped"
+        ),
+        {"parent": PARENT_TABLE},
+    ).scalar_one()
+    conn.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{default}"'))
+    conn.execute(text(f'CREATE TABLE "{name}" (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    moved = conn.execute(
+        text(f'INSERT INTO "{name}" ({columns}) SELECT {columns} FROM "{default}" WHERE {in_range}'), params
+    ).rowcount
+    conn.execute(text(f'DELETE FROM "{default}" WHERE {in_range}'), params)
+    conn.execute(text(f'ALTER TABLE {PARENT_TABLE} ATTACH PARTITION "{name}" {bounds}'))
+    conn.execute(text(f'ALTER TABLE {PARENT_TABLE} ATTACH PARTITION "{default}" DEFAULT'))
+    logger.info("Moved %s rows from %s to the new partition %s", moved, default, name)
+
+
+def ensure_partitions(conn: Connection, months_ahead: int, today: date | None = None) -> List[str]:
+    """Create monthly partitions from the current month up to ``months_ahead`` months later."""
+    if not is_partitioned(conn):
+        return []
+    conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": _ADVISORY_LOCK_ID})
+    existing = {row["nome"] for row in list_partitions(conn)}
+    default = default_partition(conn)
+    created = []
+    current = _month_start(today or date.today())
+    for offset in range(months_ahead + 1):
+        start = _month_start(current, offset)
+        name = partition_name(start)
+        if name in existing:
+            continue
+        _create_partition(conn, name, start, _month_start(start, 1), default)
+        created.append(name)
+    if created:
+        logger.info("Created pecas partitions: %s", ", ".join(created))
+    return created
+
+
+def detach_partition(conn: Connection, name: str, archive_schema: str | None = None) -> None:
+    """Detach a monthly partition; optionally move it to ``archive_schema`` for dump/drop."""
+    if not PARTITION_NAME.match(name):
+        raise ValueError(f"Nome de partição inválido: {name}")
+    conn.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"'))
+    if archive_schema:
+        if not re.match(r"^[a-z_][a-z0-9_]*$", archive_schema):
+            raise ValueError(f"Schema inválido: {archive_schema}")
+        conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+        conn.execute(text(f'ALTER TABLE "{name}" SET SCHEMA "{archive_schema}"'))
+
+
+def _scanned_relations(plan: Dict[str, Any], found: Set[str]) -> Set[str]:
+    if "Relation Name" in plan:
+        found.add(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        _scanned_relations(child, found)
+    return found
+
+
+def check_pruning(conn: Connection, data_inicio: date, data_fim: date) -> Dict[str, Any]:
+    """EXPLAIN the list/report date filter and report which partitions it touches."""
+    plan = conn.execute(
+        text(
+            "EXPLAIN (FORMAT JSON) SELECT id FROM pecas "
+            "WHERE data_criacao >= :inicio AND data_criacao <= :fim"
+        ),
+        {"inicio": data_inicio, "fim": data_fim},
+    ).scalar_one()
+    scanned = sorted(_scanned_relations(plan[0]["Plan"], set()))
+    total = len(list_partitions(conn))
+    return {
+        "particoesTotais": total,
+        "particoesLidas": scanned,
+        "podaAtiva": total > 0 and len(scanned) < total,
+    }
+
+
+def maintain_on_startup() -> None:
+    if settings.partition_months_ahead <= 0:
+        return
+    # Shards hold pecas too and need the same future partitions.
+    for engine in (get_engine(), *get_shard_router().engines.values()):
+        try:
+            with engine.begin() as conn:
+                ensure_partitions(conn, settings.partition_months_ahead)
+        except Exception:  # pragma: no cover - must not prevent the API from starting
+            logger.exception("Could not ensure pecas partitions on %s", engine.url.database)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manutenção das partições de peças")
+    parser.add_argument("--banco", help="Só este banco (principal ou um shard); por padrão, todos")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    garantir = sub.add_parser("garantir", help="Cria partições futuras")
+    garantir.add_argument("--meses", type=int, default=settings.partition_months_ahead)
+    sub.add_parser("listar", help="Lista partições com tamanho")
+    verificar = sub.add_parser("verificar", help="Confere a poda de partições para um período")
+    verificar.add_argument("--inicio", type=date.fromisoformat, required=True)
+    verificar.add_argument("--fim", type=date.fromisoformat, required=True)
+    desanexar = sub.add_parser("desanexar", help="Desanexa uma partição antiga")
+    desanexar.add_argument("nome")
+    desanexar.add_argument("--schema", help="Move a partição para este schema (ex.: arquivo)")
+    args = parser.parse_args()
+
+    engines = get_shard_router().all_engines()
+    if args.banco is not None:
+        if args.banco not in engines:
+            parser.error(f"Banco desconhecido: {args.banco} (disponíveis: {', '.join(engines)})")
+        engines = {args.banco: engines[args.banco]}
+
+    for nome, engine in engines.items():
+        if len(engines) > 1:
+            print(f"[{nome}]")
+        with engine.begin() as conn:
+            if args.comando == "garantir":
+                created = ensure_partitions(conn, args.meses)
+                print("Criadas: " + (", ".join(created) if created else "nenhuma"))
+            elif args.comando == "listar":
+                for row in list_partitions(conn):
+                    print(f"{row['nome']:<20} {row['bytes'] / 1024 / 1024:>10.1f} MB  {row['limites']}")
+            elif args.comando == "verificar":
+                result = check_pruning(conn, args.inicio, args.fim)
+                print(f"Partições lidas: {len(result['particoesLidas'])}/{result['particoesTotais']}")
+                for name in result["particoesLidas"]:
+                    print(f"  - {name}")
+                print("Poda ativa" if result["podaAtiva"] else "ATENÇÃO: sem poda de partições")
+            elif args.comando == "desanexar":
+                detach_partition(conn, args.nome, args.schema)
+                print(f"Partição {args.nome} desanexada.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""On-demand request profiling: sampled flame graphs and Server-Timing breakdowns."""
+
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import fastapi.routing
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.security import user_from_token
+
+logger = logging.getLogger("app.profiling")
+
+APP_DIR = str(Path(__file__).resolve().parents[1])
+
+_timings: ContextVar[Optional["RequestTimings"]] = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """Accumulated milliseconds per phase for the current request."""
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        self.queries = 0
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + elapsed_ms
+
+    def server_timing(self, total_ms: float) -> str:
+        """Render phases as a Server-Timing value; ``handler`` is whatever is left over."""
+        phases = {"db": 0.0, "serialize": 0.0, **self.phases}
+        handler_ms = max(0.0, total_ms - sum(phases.values()))
+        entries = [f'db;dur={phases.pop("db"):.1f};desc="{self.queries} queries"']
+        entries.extend(f"{phase};dur={elapsed:.1f}" for phase, elapsed in phases.items())
+        entries.append(f"handler;dur={handler_ms:.1f}")
+        entries.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(entries)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Attribute the enclosed block to ``phase`` when the request is being profiled."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, (time.perf_counter() - started) * 1000)
+
+
+# Instrumentation ------------------------------------------------------------
+
+_installed = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _timings.get() is not None:
+        conn.info.setdefault("profiling_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    timings = _timings.get()
+    stack = conn.info.get("profiling_started")
+    if timings is None or not stack:
+        return
+    timings.queries += 1
+    timings.add("db", (time.perf_counter() - stack.pop()) * 1000)
+
+
+def install_instrumentation() -> None:
+    """Hook SQL execution and FastAPI response serialization into the phase timers."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    original = fastapi.routing.serialize_response
+
+    async def serialize_response(*args, **kwargs):
+        with timed("serialize"):
+            return await original(*args, **kwargs)
+
+    fastapi.routing.serialize_response = serialize_response
+
+
+# Sampler --------------------------------------------------------------------
+
+class StackSampler(threading.Thread):
+    """Statistical profiler sampling every thread currently running app code.
+
+    Concurrent requests executing in other threads may show up in the samples;
+    profile on a quiet worker for clean flame graphs.
+    """
+
+    def __init__(self, interval: float) -> None:
+        super().__init__(daemon=True, name="request-profiler")
+        self.interval = interval
+        self.frames: List[Tuple[str, str, int]] = []
+        self.frame_index: Dict[Tuple[str, str, int], int] = {}
+        self.samples: List[List[int]] = []
+        self.weights: List[float] = []
+        self._halt = threading.Event()
+
+    def _frame_id(self, key: Tuple[str, str, int]) -> int:
+        index = self.frame_index.get(key)
+        if index is None:
+            index = len(self.frames)
+            self.frame_index[key] = index
+            self.frames.append(key)
+        return index
+
+    def run(self) -> None:
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._halt.wait(self.interval):
+            now = time.perf_counter()
+            weight = (now - last) * 1000
+            last = now
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                in_app = False
+                while frame is not None:
+                    code = frame.f_code
+                    in_app = in_app or code.co_filename.startswith(APP_DIR)
+                    stack.append(self._frame_id((code.co_name, code.co_filename, code.co_firstlineno)))
+                    frame = frame.f_back
+                if in_app:
+                    stack.reverse()
+                    self.samples.append(stack)
+                    self.weights.append(weight)
+
+    def stop(self) -> None:
+        self._halt.set()
+        self.join()
+
+    def to_speedscope(self, name: str, total_ms: float) -> Dict[str, object]:
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "msl-backend",
+            "name": name,
+            "shared": {
+                "frames": [{"name": fn, "file": filename, "line": line} for fn, filename, line in self.frames]
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": total_ms,
+                    "samples": self.samples,
+                    "weights": self.weights,
+                }
+            ],
+        }
+
+
+# Middleware -----------------------------------------------------------------
+
+def _profile_flagged(scope: Scope) -> bool:
+    headers = dict(scope.get("headers", []))
+    return headers.get(b"x-profile", b"").lower() in {b"1", b"true"} or bool(
+        re.search(rb"(^|&)profile=(1|true)(&|$)", scope.get("query_string", b""))
+    )
+
+
+def _wants_profile(scope: Scope) -> bool:
+    """Whether the caller is a master user, read from the database like ``get_current_user``.
+
+    The token's ``role`` claim is not enough: it outlives a demotion or a
+    deactivated account until the token expires.
+    """
+    if settings.auth_disabled:
+        return True
+    authorization = dict(scope.get("headers", [])).get(b"authorization", b"").decode("latin-1")
+    if not authorization.lower().startswith("bearer "):
+        return False
+    user = user_from_token(authorization[7:].strip())
+    return user is not None and user.role == "master"
+
+
+def _profile_name(scope: Scope) -> str:
+    slug = re.sub(r"[^a-zA-Z0-9]+", "-", scope["path"]).strip("-") or "root"
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{scope['method'].lower()}-{slug}.speedscope.json"
+
+
+class ProfilingMiddleware:
+    """Profile requests flagged with ``X-Profile: 1`` or ``?profile=1`` by master users.
+
+    The response carries a ``Server-Timing`` header (db, serialize, handler,
+    total) and ``X-Profile-File`` naming the speedscope file stored under
+    ``settings.profile_dir``; download it from ``/api/admin/perfis/{nome}``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        install_instrumentation()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Only flagged requests pay for the user lookup, which runs off the event loop.
+        if scope["type"] != "http" or not _profile_flagged(scope) or not await run_in_threadpool(_wants_profile, scope):
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        sampler = StackSampler(settings.profile_interval_ms / 1000)
+        name = _profile_name(scope)
+        started = time.perf_counter()
+        sampler.start()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - started) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing(total_ms).encode("latin-1")))
+                headers.append((b"x-profile-file", name.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            _timings.reset(token)
+            total_ms = (time.perf_counter() - started) * 1000
+            try:
+                settings.profile_dir.mkdir(parents=True, exist_ok=True)
+                with open(settings.profile_dir / name, "w", encoding="utf-8") as handle:
+                    json.dump(sampler.to_speedscope(f"{scope['method']} {scope['path']}", total_ms), handle)
+            except OSError:
+                logger.exception("Could not store profile %s", name)
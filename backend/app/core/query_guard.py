@@ -0,0 +1,61 @@
+"""Row budgets for requests that load their whole result into the worker.
+
+An unpaginated ``GET /api/pecas`` or a report over a long period can pull a
+large part of ``pecas`` into memory. The list is read with ``LIMIT`` set to
+the caller's budget plus one and, when that extra row comes back, cut to the
+budget and flagged with ``X-Resultado-Truncado: true`` (clients that never
+paginate still get an array). Reports cannot be cut without giving wrong
+totals: their matching rows are counted up to the budget plus one (``LIMIT``
+stops the scan there, so the check costs at most ``limit`` index entries) and
+requests over budget are rejected with a hint on how to narrow them. They
+first use the period row count they already read for the cache key as an
+upper bound.
+
+Limits are per role (``maxLinhasLista`` and ``maxLinhasRelatorio`` in
+``ROLE_PERMISSIONS``; a missing entry means no limit) and the guard is
+disabled with ``QUERY_GUARD_ENABLED=false``.
+"""
+
+from typing import Any, List, Optional, TypeVar
+
+from fastapi import HTTPException, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import role_limit
+from app.models import Usuario
+
+TRUNCATED_HEADER = "X-Resultado-Truncado"
+T = TypeVar("T")
+
+
+def row_budget(user: Usuario, chave: str) -> Optional[int]:
+    """The caller's row limit for ``chave``, or None when unlimited or the guard is off."""
+    if not settings.query_guard_enabled:
+        return None
+    return role_limit(user, chave)
+
+
+def capped_count(db: Session, query: Any, cap: int) -> int:
+    """Rows of ``query`` (a ``Select`` or ORM ``Query``), counted up to ``cap + 1``."""
+    subquery = query.order_by(None).limit(cap + 1).subquery()
+    return int(db.execute(select(func.count()).select_from(subquery)).scalar_one())
+
+
+def truncate_to_budget(response: Response, itens: List[T], limite: int) -> List[T]:
+    """First ``limite`` of ``itens`` (read with ``LIMIT limite + 1``), flagging the response when cut."""
+    if len(itens) <= limite:
+        return itens
+    response.headers[TRUNCATED_HEADER] = "true"
+    response.headers["X-Limite-Linhas"] = str(limite)
+    return itens[:limite]
+
+
+def reject_over_budget(total: int, limite: int, dica: str) -> None:
+    if total > limite:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A consulta retornaria mais de {limite} peças, o limite do seu perfil. {dica}",
+            headers={"X-Limite-Linhas": str(limite)},
+        )
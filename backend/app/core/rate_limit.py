@@ -0,0 +1,292 @@
+"""Per-client rate limiting and concurrency caps for the HTTP API."""
+
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.database import get_engine
+from app.core.security import InvalidTokenError, decode_token
+
+logger = logging.getLogger("app.rate_limit")
+
+
+class RouteLimit:
+    """Token-bucket budget (and optional concurrency cap) for a group of routes."""
+
+    def __init__(
+        self,
+        name: str,
+        methods: Tuple[str, ...],
+        path_prefix: str,
+        per_minute: int,
+        burst: Optional[int] = None,
+        max_concurrent: Optional[int] = None,
+        by_ip: bool = False,
+    ) -> None:
+        self.name = name
+        self.methods = methods
+        self.path_prefix = path_prefix
+        self.capacity = burst or per_minute
+        self.refill_per_second = per_minute / 60.0
+        self.max_concurrent = max_concurrent
+        self.by_ip = by_ip
+
+    def matches(self, method: str, path: str) -> bool:
+        return (not self.methods or method in self.methods) and path.startswith(self.path_prefix)
+
+
+# Ordered from most to least specific; the first match wins.
+ROUTE_LIMITS: List[RouteLimit] = [
+    RouteLimit("login", ("POST",), "/auth/login", per_minute=10, burst=5, by_ip=True),
+    RouteLimit("relatorios", ("GET",), "/api/relatorios", per_minute=20, burst=5, max_concurrent=2),
+    RouteLimit("pecas-lote", ("GET", "POST"), "/api/pecas:batch", per_minute=120, burst=20),
+    RouteLimit("pecas-escrita", ("POST", "PUT"), "/api/pecas", per_minute=60, burst=10, max_concurrent=3),
+]
+
+DEFAULT_LIMIT = RouteLimit("default", (), "/", per_minute=settings.rate_limit_default_per_minute)
+
+
+# Stores -------------------------------------------------------------------
+
+class MemoryBucketStore:
+    """In-process token buckets; each worker keeps its own budget."""
+
+    def __init__(self, idle_ttl: float = 600.0) -> None:
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._idle_ttl = idle_ttl
+        self._last_prune = time.monotonic()
+
+    def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        """Consume one token; return 0 when allowed or the seconds to wait otherwise."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(capacity), now))
+            tokens = min(float(capacity), tokens + (now - updated) * refill_per_second)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / refill_per_second
+            if now - self._last_prune > self._idle_ttl:
+                self._prune(now)
+        return wait
+
+    def _prune(self, now: float) -> None:
+        stale = [key for key, (_, updated) in self._buckets.items() if now - updated > self._idle_ttl]
+        for key in stale:
+            del self._buckets[key]
+        self._last_prune = now
+
+
+class PostgresBucketStore:
+    """Token buckets shared by every worker through a small Postgres table."""
+
+    DDL = text(
+        """
+        CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+            chave TEXT PRIMARY KEY,
+            tokens DOUBLE PRECISION NOT NULL,
+            permitido BOOLEAN NOT NULL,
+            atualizado_em TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """
+    )
+
+    # Refill and consume in a single UPSERT so the check happens under the row lock.
+    TAKE = text(
+        """
+        INSERT INTO rate_limit_buckets AS b (chave, tokens, permitido, atualizado_em)
+        VALUES (:chave, :capacity - 1, true, now())
+        ON CONFLICT (chave) DO UPDATE SET
+            tokens = CASE
+                WHEN LEAST(:capacity, b.tokens + EXTRACT(EPOCH FROM now() - b.atualizado_em) * :rate) >= 1
+                THEN LEAST(:capacity, b.tokens + EXTRACT(EPOCH FROM now() - b.atualizado_em) * :rate) - 1
+                ELSE LEAST(:capacity, b.tokens + EXTRACT(EPOCH FROM now() - b.atualizado_em) * :rate)
+            END,
+            permitido = LEAST(:capacity, b.tokens + EXTRACT(EPOCH FROM now() - b.atualizado_em) * :rate) >= 1,
+            atualizado_em = now()
+        RETURNING tokens, permitido
+        """
+    )
+
+    def __init__(self) -> None:
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _ensure_table(self, connection) -> None:
+        if self._ready:
+            return
+        with self._lock:
+            if not self._ready:
+                connection.execute(self.DDL)
+                self._ready = True
+
+    def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        with get_engine().begin() as connection:
+            self._ensure_table(connection)
+            tokens, allowed = connection.execute(
+                self.TAKE, {"chave": key, "capacity": capacity, "rate": refill_per_second}
+            ).one()
+        if allowed:
+            return 0.0
+        return (1 - tokens) / refill_per_second
+
+
+class ConcurrencyTracker:
+    """Counts in-flight requests per key inside this worker."""
+
+    def __init__(self) -> None:
+        self._active: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, limit: int) -> bool:
+        with self._lock:
+            current = self._active.get(key, 0)
+            if current >= limit:
+                return False
+            self._active[key] = current + 1
+            return True
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            current = self._active.get(key, 0) - 1
+            if current > 0:
+                self._active[key] = current
+            else:
+                self._active.pop(key, None)
+
+
+def build_store():
+    if settings.rate_limit_store == "postgres":
+        return PostgresBucketStore()
+    return MemoryBucketStore()
+
+
+# Middleware ---------------------------------------------------------------
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def client_ip(scope: Scope) -> str:
+    """The socket peer or, behind trusted proxies, the address the outermost one received the request from.
+
+    Each proxy appends the address it saw to ``X-Forwarded-For``; only the last
+    ``RATE_LIMIT_PROXY_HOPS`` entries were written by our proxies, anything to
+    their left comes from the client and can be forged.
+    """
+    if settings.rate_limit_trust_forwarded:
+        entries = [
+            entry.strip()
+            for key, value in scope.get("headers", [])
+            if key == b"x-forwarded-for"
+            for entry in value.decode("latin-1").split(",")
+            if entry.strip()
+        ]
+        if len(entries) >= settings.rate_limit_proxy_hops:
+            return entries[-settings.rate_limit_proxy_hops]
+    client = scope.get("client")
+    return client[0] if client else "desconhecido"
+
+
+def client_key(scope: Scope) -> str:
+    """Identify the caller by JWT subject, falling back to the client IP."""
+    authorization = _header(scope, b"authorization")
+    if authorization and authorization.lower().startswith("bearer "):
+        try:
+            subject = decode_token(authorization[7:].strip()).get("sub")
+        except InvalidTokenError:
+            subject = None
+        if subject:
+            return f"user:{subject}"
+    return f"ip:{client_ip(scope)}"
+
+
+def _too_many_requests(retry_after: float, detail: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail": detail},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class RateLimitMiddleware:
+    """ASGI middleware enforcing ``ROUTE_LIMITS`` per client key."""
+
+    def __init__(self, app: ASGIApp, store=None, limits: Optional[List[RouteLimit]] = None) -> None:
+        self.app = app
+        self.store = store or build_store()
+        self.limits = limits if limits is not None else ROUTE_LIMITS
+        self.concurrency = ConcurrencyTracker()
+        self._store_is_blocking = isinstance(self.store, PostgresBucketStore)
+
+    def _match(self, method: str, path: str) -> RouteLimit:
+        for limit in self.limits:
+            if limit.matches(method, path):
+                return limit
+        return DEFAULT_LIMIT
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self._match(scope["method"], scope["path"])
+        key = f"ip:{client_ip(scope)}" if limit.by_ip else client_key(scope)
+        bucket_key = f"{limit.name}:{key}"
+
+        try:
+            if self._store_is_blocking:
+                wait = await run_in_threadpool(
+                    self.store.take, bucket_key, limit.capacity, limit.refill_per_second
+                )
+            else:
+                wait = self.store.take(bucket_key, limit.capacity, limit.refill_per_second)
+        except Exception:  # pragma: no cover - store outage must not take the API down
+            logger.exception("Rate limit store failed; allowing request")
+            wait = 0.0
+
+        if wait > 0:
+            response = _too_many_requests(wait, "Muitas requisições. Tente novamente em instantes.")
+            await response(scope, receive, send)
+            return
+
+        if not limit.max_concurrent:
+            await self.app(scope, receive, send)
+            return
+
+        if not self.concurrency.acquire(bucket_key, limit.max_concurrent):
+            response = _too_many_requests(1, "Já existem requisições em andamento para esta operação.")
+            await response(scope, receive, send)
+            return
+
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.concurrency.release(bucket_key)
+
+        async def send_wrapper(message: Message) -> None:
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                release()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            release()
@@ -0,0 +1,124 @@
+"""Result cache for ``GET /api/relatorios/pecas``.
+
+Entries are keyed by the normalized filters plus a data version of the
+covered ``data_criacao`` range (row count and highest ``versao``), so any
+insert, update or delete in the range yields a new key and stale entries
+simply age out. Memory is an LRU bounded by ``REPORT_CACHE_MB``; with
+``REPORT_CACHE_DIR`` set, entries are also written to disk and survive
+restarts (bounded by ``REPORT_CACHE_DISK_MB``, oldest files pruned first).
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.cache import LruCache
+from app.core.config import settings
+
+logger = logging.getLogger("app.report_cache")
+
+_VERSION_QUERY = text(
+    "SELECT count(*), COALESCE(max(versao), 0) FROM pecas "
+    "WHERE data_criacao >= :inicio AND data_criacao <= :fim"
+)
+
+
+def data_version(db: Session, data_inicio: date, data_fim: date) -> Tuple[int, int]:
+    """Row count and highest ``versao`` of the range; index-only with ``ix_pecas_data_versao``."""
+    count, versao = db.execute(_VERSION_QUERY, {"inicio": data_inicio, "fim": data_fim}).one()
+    return int(count), int(versao)
+
+
+def report_key(
+    cliente: Optional[str],
+    secretaria: Optional[str],
+    data_inicio: date,
+    data_fim: date,
+    version: Tuple[int, ...],
+) -> str:
+    normalized = (
+        (cliente or "").strip().lower(),
+        (secretaria or "").strip().lower(),
+        data_inicio.isoformat(),
+        data_fim.isoformat(),
+        *version,
+    )
+    return hashlib.sha256(repr(normalized).encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """In-memory LRU of serialized reports with an optional on-disk second tier."""
+
+    def __init__(self, max_bytes: int, directory: Optional[Path], disk_max_bytes: int) -> None:
+        self.memory = LruCache(max_size=max_bytes, sizeof=len)
+        self.directory = directory
+        self.disk_max_bytes = disk_max_bytes
+        self.disk_hits = 0
+        self._disk_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        payload = self.memory.get(key)
+        if payload is not None or self.directory is None:
+            return payload
+        try:
+            payload = (self.directory / f"{key}.json").read_bytes()
+        except OSError:
+            return None
+        with self._disk_lock:
+            self.disk_hits += 1
+        self.memory.put(key, payload)
+        return payload
+
+    def put(self, key: str, payload: bytes) -> None:
+        self.memory.put(key, payload)
+        if self.directory is None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temporary = self.directory / f".{key}.{os.getpid()}.tmp"
+            temporary.write_bytes(payload)
+            os.replace(temporary, self.directory / f"{key}.json")
+            self._prune_disk()
+        except OSError:
+            logger.warning("Could not write report cache entry to %s", self.directory, exc_info=True)
+
+    def _prune_disk(self) -> None:
+        with self._disk_lock:
+            entries = []
+            for path in self.directory.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:  # pruned by another worker
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.disk_max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.directory is not None:
+            for path in self.directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, int]:
+        stats = self.memory.stats()
+        stats["acertosDisco"] = self.disk_hits
+        return stats
+
+
+report_cache = ReportCache(
+    settings.report_cache_mb * 1024 * 1024,
+    settings.report_cache_dir,
+    settings.report_cache_disk_mb * 1024 * 1024,
+)
@@ -1,22 +1,30 @@
 """Password hashing, JWT helpers, and permission dependencies."""
 
 from datetime import datetime, timedelta
-from typing import Any, Callable, Dict, Iterable, Optional
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Union
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import SessionLocal, get_db
 from app.models import Usuario
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=not settings.auth_disabled)
+# Streams may authenticate with a ticket in the query string instead, so a missing header is not an error there.
+_stream_bearer = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
-ROLE_PERMISSIONS: Dict[str, Dict[str, bool]] = {
+# Scope of the short-lived tickets for EventSource clients, which cannot send headers.
+STREAM_TICKET_SCOPE = "eventos"
+
+# Runs on every authenticated request; built once and found in the compiled cache.
+_USER_BY_USERNAME = select(Usuario).where(Usuario.username == bindparam("username")).limit(1)
+
+# Flags gate routes; the maxLinhas* entries cap how many pieces one unpaginated
+# list or one report may load (see app/core/query_guard.py), absent = no limit.
+ROLE_PERMISSIONS: Dict[str, Dict[str, Union[bool, int]]] = {
     "master": {
         "podeInserir": True,
         "podeEditar": True,
@@ -24,6 +32,8 @@ ROLE_PERMISSIONS: Dict[str, Dict[str, bool]] = {
         "podeRelatorio": True,
         "podeAdmin": True,
         "podeConfig": True,
+        "maxLinhasLista": 50_000,
+        "maxLinhasRelatorio": 500_000,
     },
     "social_media": {
         "podeInserir": True,
@@ -32,6 +42,8 @@ ROLE_PERMISSIONS: Dict[str, Dict[str, bool]] = {
         "podeRelatorio": False,
         "podeAdmin": False,
         "podeConfig": False,
+        "maxLinhasLista": 20_000,
+        "maxLinhasRelatorio": 200_000,
     },
     "financeiro": {
         "podeInserir": False,
@@ -40,6 +52,8 @@ ROLE_PERMISSIONS: Dict[str, Dict[str, bool]] = {
         "podeRelatorio": True,
         "podeAdmin": False,
         "podeConfig": False,
+        "maxLinhasLista": 20_000,
+        "maxLinhasRelatorio": 200_000,
     },
 }
 
@@ -58,17 +72,37 @@ def _default_admin_user() -> Usuario:
 
 # Password helpers -----------------------------------------------------------
 
+# passlib/bcrypt and python-jose/cryptography are imported on first use: they
+# dominate import time and most workers never hash a password.
+_pwd_context: Any = None
+
+
+class InvalidTokenError(ValueError):
+    """Raised by ``decode_token`` for malformed, forged or expired tokens."""
+
+
+def _password_context() -> Any:
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
+
 def hash_password(plain_password: str) -> str:
-    return pwd_context.hash(plain_password)
+    return _password_context().hash(plain_password)
 
 
 def verify_password(plain_password: str, password_hash: str) -> bool:
-    return pwd_context.verify(plain_password, password_hash)
+    return _password_context().verify(plain_password, password_hash)
 
 
 # JWT helpers ----------------------------------------------------------------
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+    from jose import jwt
+
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(hours=2))
     to_encode.update({"exp": expire})
@@ -76,16 +110,30 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     return encoded_jwt
 
 
+def create_stream_ticket(username: str) -> Tuple[str, datetime]:
+    """A token valid only to open the change stream, for ``STREAM_TICKET_SECONDS``.
+
+    It travels in the URL and so ends up in access logs; its scope and short
+    life keep that harmless, and ``get_current_user`` refuses it.
+    """
+    expires_delta = timedelta(seconds=settings.stream_ticket_seconds)
+    ticket = create_access_token({"sub": username, "escopo": STREAM_TICKET_SCOPE}, expires_delta)
+    return ticket, datetime.utcnow() + expires_delta
+
+
 def decode_token(token: str) -> Dict[str, Any]:
-    return jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+    from jose import JWTError, jwt
+
+    try:
+        return jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+    except JWTError as exc:
+        raise InvalidTokenError(str(exc)) from exc
 
 
 # Dependencies ---------------------------------------------------------------
 
-def get_current_user(
-    token: str | None = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> Usuario:
+def _authenticate(token: str | None, db: Session, escopo: str | None = None) -> Usuario:
+    """Resolve the active user of ``token``, which must carry exactly the given scope."""
     if settings.auth_disabled:
         return _default_admin_user()
 
@@ -98,14 +146,14 @@ def get_current_user(
         raise credentials_exception
     try:
         payload = decode_token(token)
-    except JWTError as exc:  # pragma: no cover - depends on runtime token
+    except InvalidTokenError as exc:  # pragma: no cover - depends on runtime token
         raise credentials_exception from exc
 
     username: str | None = payload.get("sub")
-    if not username:
+    if not username or payload.get("escopo") != escopo:
         raise credentials_exception
 
-    user = db.query(Usuario).filter(Usuario.username == username).first()
+    user = db.execute(_USER_BY_USERNAME, {"username": username}).scalars().first()
     if not user:
         raise credentials_exception
     if not user.is_active:
@@ -113,6 +161,42 @@ def get_current_user(
     return user
 
 
+def get_current_user(
+    token: str | None = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> Usuario:
+    return _authenticate(token, db)
+
+
+def user_from_token(token: str) -> Optional[Usuario]:
+    """The active user of ``token``, resolved like ``get_current_user``; None when it is not accepted."""
+    db = SessionLocal()
+    try:
+        user = _authenticate(token, db)
+        db.expunge_all()
+        return user
+    except HTTPException:
+        return None
+    finally:
+        db.close()
+
+
+def get_stream_user(
+    ticket: str | None = Query(
+        None, description="Ticket de POST /api/pecas/eventos/ticket, para clientes sem cabeçalho (EventSource)"
+    ),
+    bearer: str | None = Depends(_stream_bearer),
+) -> Usuario:
+    """Authenticate long-lived streams without holding a DB session for their lifetime."""
+    db = SessionLocal()
+    try:
+        user = _authenticate(ticket, db, STREAM_TICKET_SCOPE) if ticket else _authenticate(bearer, db)
+        db.expunge_all()
+        return user
+    finally:
+        db.close()
+
+
 def require_role(roles: Iterable[str]) -> Callable[[Usuario], Usuario]:
     def dependency(user: Usuario = Depends(get_current_user)) -> Usuario:
         if user.role not in roles:
@@ -130,3 +214,17 @@ def require_permission(permission: str) -> Callable[[Usuario], Usuario]:
         return user
 
     return dependency
+
+
+def role_flags(role: str) -> Dict[str, bool]:
+    """The boolean permissions of ``role``, without its numeric limits."""
+    return {key: value for key, value in ROLE_PERMISSIONS.get(role, {}).items() if isinstance(value, bool)}
+
+
+def role_limits(role: str) -> Dict[str, int]:
+    """The numeric limits of ``role`` (``maxLinhas*``)."""
+    return {key: value for key, value in ROLE_PERMISSIONS.get(role, {}).items() if not isinstance(value, bool)}
+
+
+def role_limit(user: Usuario, chave: str) -> Optional[int]:
+    return role_limits(user.role).get(chave)
@@ -0,0 +1,246 @@
+"""Time-bucketed piece counts for the dashboard.
+
+Counts come from ``pecas_resumo_diario`` (``sql/005_pecas_resumo_diario.sql``),
+a per-day summary kept current by a trigger on ``pecas``. While that table
+does not exist the same aggregation runs directly over ``pecas``.
+
+Usage::
+
+    python -m app.core.stats reconstruir
+    python -m app.core.stats verificar
+"""
+
+import argparse
+from datetime import date
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import Date, DateTime, cast, func, or_, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.database import get_shard_router
+from app.models import Cliente, Peca, PecaResumoDiario, Secretaria, TipoPeca
+
+GRANULARIDADES = {"dia": "day", "semana": "week", "mes": "month"}
+DIMENSOES = ("cliente", "secretaria", "tipoPeca")
+
+_summary_ready = False
+
+
+def summary_available(db: Session) -> bool:
+    """Whether the summary table exists; a positive answer is cached per process."""
+    global _summary_ready
+    if not _summary_ready:
+        _summary_ready = bool(
+            db.execute(text("SELECT to_regclass('pecas_resumo_diario') IS NOT NULL")).scalar_one()
+        )
+    return _summary_ready
+
+
+def _by_name(column: Any, model: Any, nome: str) -> Any:
+    return column.in_(select(model.id).where(func.lower(model.nome) == func.lower(nome.strip())))
+
+
+class _Fonte(NamedTuple):
+    nome: str
+    tabela: Any
+    dia: Any
+    ids: Tuple[Any, Any, Any]
+    contar: Callable[[], Any]
+
+
+def _fonte(db: Session) -> _Fonte:
+    """The summary table when it exists, otherwise ``pecas`` itself."""
+    if summary_available(db):
+        return _Fonte(
+            "resumo",
+            PecaResumoDiario.__table__,
+            PecaResumoDiario.dia,
+            (PecaResumoDiario.cliente_id, PecaResumoDiario.secretaria_id, PecaResumoDiario.tipo_peca_id),
+            lambda: func.sum(PecaResumoDiario.quantidade),
+        )
+    return _Fonte(
+        "pecas",
+        Peca.__table__,
+        Peca.data_criacao,
+        (Peca.cliente_id, Peca.secretaria_id, Peca.tipo_peca_id),
+        func.count,
+    )
+
+
+def _dimensions(fonte: _Fonte, dimensoes: Sequence[str]) -> Tuple[Any, List[Any], List[Any]]:
+    """Join the name tables for ``dimensoes``; return the source, label columns and group-by terms."""
+    source = fonte.tabela
+    columns: List[Any] = []
+    group_by: List[Any] = []
+    for dimensao, model, coluna_id in zip(DIMENSOES, (Cliente, Secretaria, TipoPeca), fonte.ids):
+        if dimensao in dimensoes:
+            source = source.join(model.__table__, model.id == coluna_id)
+            columns.append(model.nome.label(dimensao))
+            group_by.append(model.nome)
+    return source, columns, group_by
+
+
+def _filtered(stmt: Any, fonte: _Fonte, cliente: Optional[str], secretaria: Optional[str], tipo_peca: Optional[str]) -> Any:
+    cliente_id, secretaria_id, tipo_id = fonte.ids
+    if cliente:
+        stmt = stmt.where(_by_name(cliente_id, Cliente, cliente))
+    if secretaria:
+        stmt = stmt.where(_by_name(secretaria_id, Secretaria, secretaria))
+    if tipo_peca:
+        stmt = stmt.where(_by_name(tipo_id, TipoPeca, tipo_peca))
+    return stmt
+
+
+def count_by_period(
+    db: Session,
+    granularidade: str,
+    dimensoes: Sequence[str],
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    cliente: Optional[str] = None,
+    secretaria: Optional[str] = None,
+    tipo_peca: Optional[str] = None,
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """Return the source used ("resumo" or "pecas") and one row per period and dimension values."""
+    fonte = _fonte(db)
+    quantidade = fonte.contar()
+    periodo = cast(func.date_trunc(GRANULARIDADES[granularidade], cast(fonte.dia, DateTime)), Date).label("periodo")
+    source, columns, group_by = _dimensions(fonte, dimensoes)
+    group_by = [periodo, *group_by]
+
+    stmt = select(periodo, *columns, quantidade.label("quantidade")).select_from(source)
+    if data_inicio:
+        stmt = stmt.where(fonte.dia >= data_inicio)
+    if data_fim:
+        stmt = stmt.where(fonte.dia <= data_fim)
+    stmt = _filtered(stmt, fonte, cliente, secretaria, tipo_peca)
+    stmt = stmt.group_by(*group_by).having(quantidade > 0).order_by(*group_by)
+    return fonte.nome, [dict(row._mapping) for row in db.execute(stmt)]
+
+
+def count_by_windows(
+    db: Session,
+    janelas: Sequence[Tuple[date, date]],
+    dimensoes: Sequence[str],
+    cliente: Optional[str] = None,
+    secretaria: Optional[str] = None,
+    tipo_peca: Optional[str] = None,
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """Count each group in every (start, end) window with one scan.
+
+    Rows only need to fall in some window, so the scan is the union of the
+    windows (partitions outside all of them are pruned) and each window is a
+    ``FILTER`` aggregate over it. Rows carry ``quantidades`` in window order.
+    """
+    fonte = _fonte(db)
+    source, columns, group_by = _dimensions(fonte, dimensoes)
+    contagens = [
+        func.coalesce(fonte.contar().filter(fonte.dia.between(inicio, fim)), 0).label(f"janela_{indice}")
+        for indice, (inicio, fim) in enumerate(janelas)
+    ]
+    stmt = (
+        select(*columns, *contagens)
+        .select_from(source)
+        .where(or_(*(fonte.dia.between(inicio, fim) for inicio, fim in janelas)))
+    )
+    stmt = _filtered(stmt, fonte, cliente, secretaria, tipo_peca)
+    if group_by:
+        stmt = stmt.group_by(*group_by).order_by(*group_by)
+    linhas = []
+    for row in db.execute(stmt):
+        valores = row._mapping
+        linha: Dict[str, Any] = {dimensao: valores[dimensao] for dimensao in DIMENSOES if dimensao in dimensoes}
+        linha["quantidades"] = [int(valores[f"janela_{indice}"]) for indice in range(len(janelas))]
+        linhas.append(linha)
+    return fonte.nome, linhas
+
+
+def merge_results(resultados: Sequence[Tuple[str, List[Dict[str, Any]]]]) -> Tuple[str, List[Dict[str, Any]]]:
+    """Combine ``count_by_period``/``count_by_windows`` results from several shards.
+
+    Rows with the same period and dimension values are summed (``quantidade``
+    or, element-wise, ``quantidades``) and returned in the usual order.
+    """
+    if len(resultados) == 1:
+        return resultados[0]
+    fonte = "resumo" if all(nome == "resumo" for nome, _ in resultados) else "pecas"
+    combinadas: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    for _, linhas in resultados:
+        for linha in linhas:
+            chave = tuple(value for campo, value in linha.items() if campo not in ("quantidade", "quantidades"))
+            atual = combinadas.get(chave)
+            if atual is None:
+                combinadas[chave] = dict(linha)
+            elif "quantidades" in linha:
+                atual["quantidades"] = [a + b for a, b in zip(atual["quantidades"], linha["quantidades"])]
+            else:
+                atual["quantidade"] += linha["quantidade"]
+    return fonte, [combinadas[chave] for chave in sorted(combinadas)]
+
+
+def rebuild_summary(conn: Connection) -> int:
+    """Recompute the whole summary from ``pecas``; return the number of summary rows."""
+    conn.execute(text("LOCK TABLE pecas IN SHARE MODE"))
+    conn.execute(text("TRUNCATE pecas_resumo_diario"))
+    conn.execute(
+        text(
+            """
+            INSERT INTO pecas_resumo_diario (dia, cliente_id, secretaria_id, tipo_peca_id, quantidade)
+            SELECT data_criacao, cliente_id, secretaria_id, tipo_peca_id, count(*)
+            FROM pecas
+            GROUP BY data_criacao, cliente_id, secretaria_id, tipo_peca_id
+            """
+        )
+    )
+    return conn.execute(text("SELECT count(*) FROM pecas_resumo_diario")).scalar_one()
+
+
+def check_summary(conn: Connection) -> List[Dict[str, Any]]:
+    """List the (day, cliente, secretaria, tipo) keys whose summary count differs from ``pecas``."""
+    rows = conn.execute(
+        text(
+            """
+            WITH contagem AS (
+                SELECT data_criacao AS dia, cliente_id, secretaria_id, tipo_peca_id, count(*) AS quantidade
+                FROM pecas
+                GROUP BY 1, 2, 3, 4
+            )
+            SELECT dia, cliente_id, secretaria_id, tipo_peca_id,
+                   COALESCE(r.quantidade, 0) AS esperado, COALESCE(s.quantidade, 0) AS resumo
+            FROM contagem r
+            FULL JOIN pecas_resumo_diario s USING (dia, cliente_id, secretaria_id, tipo_peca_id)
+            WHERE COALESCE(r.quantidade, 0) <> COALESCE(s.quantidade, 0)
+            ORDER BY dia
+            """
+        )
+    )
+    return [dict(row._mapping) for row in rows]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resumo diário de peças (estatísticas)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("reconstruir", help="Recalcula o resumo a partir de pecas")
+    sub.add_parser("verificar", help="Compara o resumo com a contagem real")
+    args = parser.parse_args()
+
+    # Every shard keeps its own summary of its own pieces.
+    router = get_shard_router()
+    for nome, engine in router.all_engines().items():
+        rotulo = f"[{nome}] " if router.enabled else ""
+        with engine.begin() as conn:
+            if args.comando == "reconstruir":
+                print(f"{rotulo}Resumo reconstruído: {rebuild_summary(conn)} linhas.")
+            else:
+                divergencias = check_summary(conn)
+                for row in divergencias[:50]:
+                    print(
+                        f"{rotulo}{row['dia']} cliente={row['cliente_id']} secretaria={row['secretaria_id']} "
+                        f"tipo={row['tipo_peca_id']}: esperado {row['esperado']}, resumo {row['resumo']}"
+                    )
+                print(f"{rotulo}{len(divergencias)} divergência(s).")
+
+
+if __name__ == "__main__":
+    main()
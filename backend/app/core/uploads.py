@@ -0,0 +1,161 @@
+"""Resumable uploads of proof images, spooled to disk chunk by chunk.
+
+A session is two files under ``settings.upload_dir``: ``<id>.part`` with the
+bytes received so far and ``<id>.json`` with its metadata. The offset is the
+size of the part file, so a client that lost a response asks for it and
+resends only what is missing. Workers of one host share the directory; with
+several hosts, mount it on shared storage.
+"""
+
+import base64
+import fcntl
+import hashlib
+import json
+import os
+import re
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.images import ALLOWED_MIME_TYPES, sniff_mime
+
+UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+_HASH_BLOCK = 1024 * 1024
+
+
+class UploadStore:
+    def __init__(self, root: Path, expiry: timedelta) -> None:
+        self.root = root
+        self.expiry = expiry
+
+    def _paths(self, upload_id: str) -> Tuple[Path, Path]:
+        if not UPLOAD_ID.match(upload_id):
+            raise HTTPException(status_code=404, detail="Upload não encontrado.")
+        return self.root / f"{upload_id}.part", self.root / f"{upload_id}.json"
+
+    def _write_meta(self, path: Path, meta: Dict[str, Any]) -> None:
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(temporary, path)
+
+    def _load(self, upload_id: str, usuario: str) -> Tuple[Path, Path, Dict[str, Any]]:
+        part, meta_path = self._paths(upload_id)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            raise HTTPException(status_code=404, detail="Upload não encontrado.")
+        if meta["usuario"] != usuario or datetime.fromisoformat(meta["expiraEm"]) < datetime.now(timezone.utc):
+            raise HTTPException(status_code=404, detail="Upload não encontrado.")
+        return part, meta_path, meta
+
+    @staticmethod
+    def _describe(meta: Dict[str, Any], part: Path) -> Dict[str, Any]:
+        offset = part.stat().st_size if part.exists() else 0
+        return {**{key: value for key, value in meta.items() if key != "usuario"}, "offset": offset}
+
+    def create(self, tamanho: int, usuario: str) -> Dict[str, Any]:
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.prune_expired()
+        upload_id = secrets.token_hex(16)
+        part, meta_path = self._paths(upload_id)
+        part.touch()
+        meta = {
+            "id": upload_id,
+            "tamanho": tamanho,
+            "usuario": usuario,
+            "expiraEm": (datetime.now(timezone.utc) + self.expiry).isoformat(),
+            "concluido": False,
+            "mimeType": None,
+            "sha256": None,
+        }
+        self._write_meta(meta_path, meta)
+        return self._describe(meta, part)
+
+    def status(self, upload_id: str, usuario: str) -> Dict[str, Any]:
+        part, _, meta = self._load(upload_id, usuario)
+        return self._describe(meta, part)
+
+    def append(self, upload_id: str, usuario: str, start: int, data: bytes) -> Dict[str, Any]:
+        """Append ``data`` at ``start``; 409 (with the real offset) when it is not the current end."""
+        part, _, meta = self._load(upload_id, usuario)
+        if meta["concluido"]:
+            raise HTTPException(status_code=409, detail="Upload já concluído.")
+        if start + len(data) > meta["tamanho"]:
+            raise HTTPException(status_code=400, detail="O trecho ultrapassa o tamanho declarado.")
+        with open(part, "ab") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            offset = handle.seek(0, os.SEEK_END)
+            if offset != start:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Posição inesperada; continue a partir do byte {offset}.",
+                    headers={"Upload-Offset": str(offset)},
+                )
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        return self._describe(meta, part)
+
+    def complete(self, upload_id: str, usuario: str, sha256: str) -> Dict[str, Any]:
+        part, meta_path, meta = self._load(upload_id, usuario)
+        if meta["concluido"]:
+            return self._describe(meta, part)
+        if part.stat().st_size != meta["tamanho"]:
+            raise HTTPException(status_code=409, detail="Upload incompleto.")
+        digest = hashlib.sha256()
+        with open(part, "rb") as handle:
+            head = handle.read(16)
+            handle.seek(0)
+            for block in iter(lambda: handle.read(_HASH_BLOCK), b""):
+                digest.update(block)
+        if digest.hexdigest() != sha256.lower():
+            raise HTTPException(status_code=422, detail="Checksum SHA-256 não confere; reenvie o arquivo.")
+        mime = sniff_mime(head)
+        if mime not in ALLOWED_MIME_TYPES:
+            raise HTTPException(status_code=422, detail="A comprovação deve ser uma imagem PNG, JPEG, GIF ou WebP.")
+        meta.update(concluido=True, mimeType=mime, sha256=digest.hexdigest())
+        self._write_meta(meta_path, meta)
+        return self._describe(meta, part)
+
+    def read_data_url(self, upload_id: str, usuario: str) -> str:
+        """Return a completed upload as the data URL stored in ``pecas.comprovacao_base64``."""
+        part, _, meta = self._load(upload_id, usuario)
+        if not meta["concluido"]:
+            raise HTTPException(status_code=409, detail="Upload ainda não concluído.")
+        encoded = base64.b64encode(part.read_bytes()).decode("ascii")
+        return f"data:{meta['mimeType']};base64,{encoded}"
+
+    def discard(self, upload_id: str) -> None:
+        for path in self._paths(upload_id):
+            path.unlink(missing_ok=True)
+
+    def prune_expired(self) -> None:
+        cutoff = time.time() - self.expiry.total_seconds()
+        for meta_path in self.root.glob("*.json"):
+            if not UPLOAD_ID.match(meta_path.stem):
+                continue
+            try:
+                expired = meta_path.stat().st_mtime < cutoff
+            except FileNotFoundError:  # removed by another worker
+                continue
+            if expired:
+                self.discard(meta_path.stem)
+
+
+upload_store = UploadStore(settings.upload_dir, timedelta(hours=settings.upload_expiry_hours))
+
+
+def parse_content_range(value: Optional[str], tamanho: int) -> Tuple[int, int]:
+    """Parse ``bytes start-end/total`` into (start, length)."""
+    match = re.fullmatch(r"bytes (\d+)-(\d+)/(\d+)", (value or "").strip())
+    if not match:
+        raise HTTPException(status_code=400, detail="Cabeçalho Content-Range inválido (use 'bytes início-fim/total').")
+    start, end, total = (int(group) for group in match.groups())
+    if end < start or total != tamanho:
+        raise HTTPException(status_code=400, detail="Content-Range não corresponde ao upload.")
+    return start, end - start + 1
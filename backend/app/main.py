@@ -1,5 +1,8 @@
 import logging
+import threading
+from contextlib import asynccontextmanager
 from datetime import date, datetime
+from typing import AsyncIterator
 
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -7,15 +10,23 @@ from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from app.core.audit import audit_log
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.maintenance import maintenance_scheduler
+from app.core.partitions import maintain_on_startup
+from app.core.profiling import ProfilingMiddleware
+from app.core.rate_limit import RateLimitMiddleware
 from app.routers import (
+    admin_router,
     auth_router,
+    catalogo_router,
     clientes_router,
     pecas_router,
     relatorios_router,
     secretarias_router,
     tipos_peca_router,
+    uploads_router,
     usuarios_router,
 )
 from app.schemas.pecas import PecaOut
@@ -23,15 +34,57 @@ from app.schemas.pecas import PecaOut
 logger = logging.getLogger("app.main")
 
 
+def _warm_up() -> None:
+    """Load the JWT library and open the first DB connection (partition check)."""
+    import jose.jwt  # noqa: F401 - imported here so the first request does not pay for it
+
+    maintain_on_startup()
+
+
+def _start_warm_up() -> None:
+    # In the background so the worker reports ready without waiting for the database.
+    threading.Thread(target=_warm_up, name="aquecimento", daemon=True).start()
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    _start_warm_up()
+    if settings.maintenance_enabled:
+        maintenance_scheduler.start()
+    try:
+        yield
+    finally:
+        if settings.maintenance_enabled:
+            maintenance_scheduler.stop()
+        # Write queued audit entries before the worker exits.
+        audit_log.close()
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="MSL Backend", version="0.1.0", debug=settings.app_env == "dev")
+    app = FastAPI(title="MSL Backend", version="0.1.0", debug=settings.app_env == "dev", lifespan=_lifespan)
 
+    if settings.profiling_enabled:
+        app.add_middleware(ProfilingMiddleware)
+    # Added before CORS so throttled responses still carry CORS headers.
+    if settings.rate_limit_enabled:
+        app.add_middleware(RateLimitMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.allowed_origins,
         allow_credentials=False,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[
+            "Retry-After",
+            "Server-Timing",
+            "X-Profile-File",
+            "X-Cache",
+            "Upload-Offset",
+            "ETag",
+            "X-Limite-Linhas",
+            "X-Resultado-Truncado",
+            "X-Ultima-Escrita",
+        ],
     )
 
     @app.get("/health")
@@ -63,12 +116,15 @@ def create_app() -> FastAPI:
             dataCadastro=datetime.utcnow(),
         )
 
+    app.include_router(admin_router)
     app.include_router(auth_router)
+    app.include_router(catalogo_router)
     app.include_router(clientes_router)
     app.include_router(pecas_router)
     app.include_router(relatorios_router)
     app.include_router(secretarias_router)
     app.include_router(tipos_peca_router)
+    app.include_router(uploads_router)
     app.include_router(usuarios_router)
 
     return app
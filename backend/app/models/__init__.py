@@ -9,7 +9,12 @@ from .clientes import Cliente  # noqa: E402,F401
 from .secretarias import Secretaria  # noqa: E402,F401
 from .tipos_peca import TipoPeca  # noqa: E402,F401
 from .pecas import Peca  # noqa: E402,F401
+from .pecas_removidas import PecaRemovida  # noqa: E402,F401
+from .pecas_resumo import PecaResumoDiario  # noqa: E402,F401
 from .usuarios import Usuario  # noqa: E402,F401
+from .comprovacoes import ComprovacaoArquivada, ComprovacaoOriginal  # noqa: E402,F401
+from .auditoria import RegistroAuditoria  # noqa: E402,F401
+from .manutencao import ExecucaoManutencao  # noqa: E402,F401
 
 __all__ = [
     "Base",
@@ -17,5 +22,11 @@ __all__ = [
     "Secretaria",
     "TipoPeca",
     "Peca",
+    "PecaRemovida",
+    "PecaResumoDiario",
     "Usuario",
+    "ComprovacaoArquivada",
+    "ComprovacaoOriginal",
+    "RegistroAuditoria",
+    "ExecucaoManutencao",
 ]
@@ -0,0 +1,30 @@
+"""Model for the auditoria table (who changed which peça or catalogue entry)."""
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.models import Base
+
+
+class RegistroAuditoria(Base):
+    """One create/update/delete, with the changed fields as ``{campo: [antes, depois]}``."""
+
+    __tablename__ = "auditoria"
+    __table_args__ = (
+        Index("ix_auditoria_entidade", "entidade", "entidade_id", "registrado_em"),
+        Index("ix_auditoria_registrado_em", "registrado_em"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    entidade = Column(String(32), nullable=False)
+    entidade_id = Column(Integer, nullable=False)
+    acao = Column(String(16), nullable=False)
+    usuario_id = Column(Integer, nullable=True)
+    usuario = Column(String(150), nullable=False)
+    alteracoes = Column(JSONB, nullable=True)
+    # Set when the change is queued, not when the batch reaches the database.
+    registrado_em = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    def __repr__(self) -> str:  # pragma: no cover - helper for debugging
+        return f"<RegistroAuditoria {self.entidade}:{self.entidade_id} acao={self.acao} usuario={self.usuario!r}>"
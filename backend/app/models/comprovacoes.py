@@ -0,0 +1,41 @@
+"""Models for the comprovacoes_arquivadas and comprovacoes_originais tables."""
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from app.models import Base
+
+
+class ComprovacaoArquivada(Base):
+    """Location of a proof moved out of ``pecas`` into the archive segment files."""
+
+    __tablename__ = "comprovacoes_arquivadas"
+
+    # No FK: the partitioned ``pecas`` key is (id, data_criacao).
+    peca_id = Column(Integer, primary_key=True)
+    segmento = Column(String(64), nullable=False)
+    posicao = Column(BigInteger, nullable=False)
+    tamanho = Column(Integer, nullable=False)
+    tamanho_original = Column(Integer, nullable=False)
+    codec = Column(String(16), nullable=False)
+    arquivada_em = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    def __repr__(self) -> str:  # pragma: no cover - helper for debugging
+        return f"<ComprovacaoArquivada peca_id={self.peca_id} segmento={self.segmento!r}>"
+
+
+class ComprovacaoOriginal(Base):
+    """Upload kept in the archive segment files after its proof was normalized on ingest."""
+
+    __tablename__ = "comprovacoes_originais"
+
+    peca_id = Column(Integer, primary_key=True)
+    segmento = Column(String(64), nullable=False)
+    posicao = Column(BigInteger, nullable=False)
+    tamanho = Column(Integer, nullable=False)
+    tamanho_original = Column(Integer, nullable=False)
+    codec = Column(String(16), nullable=False)
+    guardada_em = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    def __repr__(self) -> str:  # pragma: no cover - helper for debugging
+        return f"<ComprovacaoOriginal peca_id={self.peca_id} segmento={self.segmento!r}>"
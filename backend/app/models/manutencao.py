@@ -0,0 +1,22 @@
+"""Model for the manutencao_execucoes table (last maintenance run per database)."""
+
+from sqlalchemy import Column, DateTime, String
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.models import Base
+
+
+class ExecucaoManutencao(Base):
+    """Kept on the primary for every database, so all workers share one schedule and one report."""
+
+    __tablename__ = "manutencao_execucoes"
+
+    banco = Column(String(64), primary_key=True)
+    # Claimed before the run starts; a scheduled run waits a full interval after it.
+    iniciada_em = Column(DateTime(timezone=True), nullable=False)
+    medido_em = Column(DateTime(timezone=True), nullable=True)
+    relatorio = Column(JSONB, nullable=True)
+    resultado = Column(JSONB, nullable=True)
+
+    def __repr__(self) -> str:  # pragma: no cover - helper for debugging
+        return f"<ExecucaoManutencao banco={self.banco!r} iniciada_em={self.iniciada_em}>"
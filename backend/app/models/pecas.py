@@ -1,13 +1,19 @@
 """Model for pecas table."""
 
-from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import BigInteger, Column, Date, DateTime, ForeignKey, Integer, String, Text
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, literal_column
 
 from app.models import Base
 
+# Id of the writing transaction; together with the snapshot xmin it gives a
+# change cursor that never skips rows committed out of order.
+CURRENT_XACT_ID = literal_column("pg_current_xact_id()::text::bigint")
+
 
 class Peca(Base):
+    # In the database the table may be range-partitioned by data_criacao with a
+    # composite (id, data_criacao) key; ids stay unique so the ORM keys on id.
     __tablename__ = "pecas"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -21,6 +27,7 @@ class Peca(Base):
     comprovacao_base64 = Column(Text, nullable=False)
     data_cadastro = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+    versao = Column(BigInteger, nullable=False, server_default=CURRENT_XACT_ID, onupdate=CURRENT_XACT_ID)
 
     cliente = relationship("Cliente", back_populates="pecas")
     secretaria = relationship("Secretaria", back_populates="pecas")
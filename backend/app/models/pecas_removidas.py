@@ -0,0 +1,23 @@
+"""Model for pecas_removidas table (tombstones for delta sync)."""
+
+from sqlalchemy import BigInteger, Column, Date, DateTime, Integer
+from sqlalchemy.sql import func
+
+from app.models import Base
+from app.models.pecas import CURRENT_XACT_ID
+
+
+class PecaRemovida(Base):
+    """A piece deleted (or moved to another cliente) after ``versao``."""
+
+    __tablename__ = "pecas_removidas"
+
+    id = Column(Integer, primary_key=True)
+    peca_id = Column(Integer, nullable=False, index=True)
+    cliente_id = Column(Integer, nullable=False)
+    data_criacao = Column(Date, nullable=False)
+    versao = Column(BigInteger, nullable=False, server_default=CURRENT_XACT_ID)
+    removida_em = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    def __repr__(self) -> str:  # pragma: no cover - helper for debugging
+        return f"<PecaRemovida peca_id={self.peca_id} versao={self.versao}>"
@@ -0,0 +1,20 @@
+"""Model for pecas_resumo_diario table (pre-aggregated daily counts)."""
+
+from sqlalchemy import Column, Date, Integer
+
+from app.models import Base
+
+
+class PecaResumoDiario(Base):
+    """Pieces per ``data_criacao`` day, cliente, secretaria and tipo; kept by a trigger on ``pecas``."""
+
+    __tablename__ = "pecas_resumo_diario"
+
+    dia = Column(Date, primary_key=True)
+    cliente_id = Column(Integer, primary_key=True)
+    secretaria_id = Column(Integer, primary_key=True)
+    tipo_peca_id = Column(Integer, primary_key=True)
+    quantidade = Column(Integer, nullable=False)
+
+    def __repr__(self) -> str:  # pragma: no cover - helper for debugging
+        return f"<PecaResumoDiario dia={self.dia} cliente_id={self.cliente_id} quantidade={self.quantidade}>"
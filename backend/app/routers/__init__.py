@@ -1,19 +1,25 @@
 """API routers for domain resources."""
 
+from .admin import router as admin_router
 from .auth import router as auth_router
+from .catalogo import router as catalogo_router
 from .clientes import router as clientes_router
 from .pecas import router as pecas_router
 from .relatorios import router as relatorios_router
 from .secretarias import router as secretarias_router
 from .tipos_peca import router as tipos_peca_router
+from .uploads import router as uploads_router
 from .usuarios import router as usuarios_router
 
 __all__ = [
+    "admin_router",
     "auth_router",
+    "catalogo_router",
     "clientes_router",
     "pecas_router",
     "relatorios_router",
     "secretarias_router",
     "tipos_peca_router",
+    "uploads_router",
     "usuarios_router",
 ]
@@ -0,0 +1,143 @@
+"""Rotas administrativas (diagnóstico e operação)."""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.core.archive import restored_cache
+from app.core.audit import audit_log
+from app.core.config import settings
+from app.core.database import get_read_db, get_replica_router
+from app.core.maintenance import bloat_status, maintenance_scheduler
+from app.core.report_cache import report_cache
+from app.core.security import require_role
+from app.core.sharding import shard_counts
+from app.models import RegistroAuditoria
+from app.schemas import AuditoriaOut
+from app.schemas.auditoria import EntidadeAuditada
+
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["Administração"],
+    dependencies=[Depends(require_role(["master"]))],
+)
+
+
+@router.get("/perfis", response_model=List[str])
+def list_perfis() -> List[str]:
+    if not settings.profile_dir.is_dir():
+        return []
+    arquivos = sorted(settings.profile_dir.glob("*.speedscope.json"), reverse=True)
+    return [arquivo.name for arquivo in arquivos]
+
+
+@router.get("/perfis/{nome}")
+def download_perfil(nome: str) -> FileResponse:
+    caminho = (settings.profile_dir / nome).resolve()
+    if caminho.parent != settings.profile_dir.resolve() or not caminho.is_file():
+        raise HTTPException(status_code=404, detail="Perfil não encontrado.")
+    return FileResponse(caminho, media_type="application/json", filename=nome)
+
+
+@router.get("/replicas", response_model=List[Dict[str, Any]])
+def status_replicas() -> List[Dict[str, Any]]:
+    return get_replica_router().status()
+
+
+@router.get("/shards", response_model=List[Dict[str, Any]])
+def status_shards() -> List[Dict[str, Any]]:
+    return shard_counts()
+
+
+@router.get("/caches", response_model=Dict[str, Dict[str, int]])
+def status_caches() -> Dict[str, Dict[str, int]]:
+    return {"relatorios": report_cache.stats(), "comprovacoesArquivadas": restored_cache.stats()}
+
+
+@router.delete("/caches/relatorios", status_code=204)
+def limpar_cache_relatorios() -> Response:
+    report_cache.clear()
+    return Response(status_code=204)
+
+
+@router.get("/auditoria", response_model=List[AuditoriaOut])
+def list_auditoria(
+    entidade: Optional[EntidadeAuditada] = Query(None),
+    entidadeId: Optional[int] = Query(None),
+    usuario: Optional[str] = Query(None),
+    desde: Optional[datetime] = Query(None),
+    ate: Optional[datetime] = Query(None, description="Para paginar, repita com o registradoEm do último item"),
+    limite: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+) -> List[AuditoriaOut]:
+    """Most recent entries first; served by ``ix_auditoria_entidade`` or ``ix_auditoria_registrado_em``."""
+    if entidadeId is not None and entidade is None:
+        raise HTTPException(status_code=400, detail="Informe a entidade junto com o entidadeId.")
+    query = db.query(RegistroAuditoria)
+    if entidade:
+        query = query.filter(RegistroAuditoria.entidade == entidade)
+    if entidadeId is not None:
+        query = query.filter(RegistroAuditoria.entidade_id == entidadeId)
+    if usuario:
+        query = query.filter(RegistroAuditoria.usuario == usuario)
+    if desde:
+        query = query.filter(RegistroAuditoria.registrado_em >= desde)
+    if ate:
+        query = query.filter(RegistroAuditoria.registrado_em < ate)
+    registros = (
+        query.order_by(RegistroAuditoria.registrado_em.desc(), RegistroAuditoria.id.desc()).limit(limite).all()
+    )
+    return [
+        AuditoriaOut(
+            id=registro.id,
+            entidade=registro.entidade,
+            entidadeId=registro.entidade_id,
+            acao=registro.acao,
+            usuarioId=registro.usuario_id,
+            usuario=registro.usuario,
+            alteracoes=registro.alteracoes,
+            registradoEm=registro.registrado_em,
+        )
+        for registro in registros
+    ]
+
+
+@router.get("/auditoria/fila", response_model=Dict[str, int])
+def status_auditoria() -> Dict[str, int]:
+    return audit_log.stats()
+
+
+@router.get("/manutencao", response_model=Dict[str, Any])
+def status_manutencao(
+    detalhado: bool = Query(
+        False, description="Mede agora com pgstattuple (lê tabelas e índices inteiros) em vez do último relatório"
+    ),
+) -> Dict[str, Any]:
+    """Bloat report per database plus the runs made by this worker.
+
+    Serves the report stored by the last run, whichever worker made it;
+    without one only the statistics views are read.
+    """
+    if detalhado:
+        bancos = bloat_status(detailed=True)
+    else:
+        bancos = maintenance_scheduler.last_reports() or bloat_status(detailed=False)
+    return {
+        "agendada": settings.maintenance_enabled,
+        "intervaloMinutos": settings.maintenance_interval_minutes,
+        "bancos": bancos,
+        "execucoes": maintenance_scheduler.recent(),
+    }
+
+
+@router.post("/manutencao/executar", status_code=202)
+def executar_manutencao(
+    background_tasks: BackgroundTasks,
+    forcar: bool = Query(False, description="Executa VACUUM (ANALYZE) em todas as tabelas, ignorando os limites"),
+) -> Dict[str, str]:
+    # VACUUM and REINDEX may take minutes; results show up in GET /manutencao.
+    background_tasks.add_task(maintenance_scheduler.run_now, forcar)
+    return {"detail": "Manutenção iniciada; acompanhe em /api/admin/manutencao."}
@@ -0,0 +1,91 @@
+"""Reference catalogue in a single request.
+
+Clientes with their secretarias, tipos de peça and the caller's permissions,
+read with two queries. ``versao`` doubles as the ``ETag``: a client that
+sends it back in ``If-None-Match`` gets ``304`` while nothing changed. It is
+derived from the row count and latest ``updated_at`` of each table (one
+query), so a ``304`` skips reading and encoding the catalogue.
+"""
+
+import hashlib
+from typing import Dict, List
+
+from fastapi import APIRouter, Depends, Header, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.database import get_read_db
+from app.core.security import get_current_user, role_flags, role_limits
+from app.models import Cliente, Secretaria, TipoPeca, Usuario
+from app.schemas import CatalogoCliente, CatalogoResponse, CatalogoSecretaria, CatalogoTipoPeca, UsuarioAuthOut
+
+router = APIRouter(prefix="/api/catalogo", tags=["Catálogo"])
+
+
+def _clientes(db: Session) -> List[CatalogoCliente]:
+    rows = db.execute(
+        select(
+            Cliente.id.label("cliente_id"),
+            Cliente.nome.label("cliente"),
+            Secretaria.id.label("secretaria_id"),
+            Secretaria.nome.label("secretaria"),
+        )
+        .outerjoin(Secretaria, Secretaria.cliente_id == Cliente.id)
+        .order_by(Cliente.nome, Cliente.id, Secretaria.nome)
+    )
+    clientes: Dict[int, CatalogoCliente] = {}
+    for row in rows:
+        cliente = clientes.get(row.cliente_id)
+        if cliente is None:
+            cliente = clientes[row.cliente_id] = CatalogoCliente(id=row.cliente_id, nome=row.cliente, secretarias=[])
+        if row.secretaria_id is not None:
+            cliente.secretarias.append(CatalogoSecretaria(id=row.secretaria_id, nome=row.secretaria))
+    return list(clientes.values())
+
+
+def _tipos(db: Session) -> List[CatalogoTipoPeca]:
+    rows = db.execute(select(TipoPeca.id, TipoPeca.nome).order_by(TipoPeca.nome))
+    return [CatalogoTipoPeca(id=row.id, nome=row.nome) for row in rows]
+
+
+# Any insert or delete changes a count; any update through the ORM bumps updated_at.
+_VERSAO = select(
+    *(
+        coluna
+        for model in (Cliente, Secretaria, TipoPeca)
+        for coluna in (
+            select(func.count()).select_from(model).scalar_subquery(),
+            select(func.max(model.updated_at)).scalar_subquery(),
+        )
+    )
+)
+
+
+def _versao(db: Session, usuario: UsuarioAuthOut) -> str:
+    # usuario carries the role, which decides the permissions and limits in the body.
+    tabelas = tuple(db.execute(_VERSAO).one())
+    return hashlib.sha256(repr((tabelas, usuario.model_dump_json())).encode("utf-8")).hexdigest()[:20]
+
+
+@router.get("", response_model=CatalogoResponse)
+def get_catalogo(
+    if_none_match: str | None = Header(None),
+    user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+) -> Response:
+    usuario = UsuarioAuthOut.model_validate(user)
+    versao = _versao(db, usuario)
+    etag = f'"{versao}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    catalogo = CatalogoResponse(
+        versao=versao,
+        usuario=usuario,
+        permissoes=role_flags(user.role),
+        limites=role_limits(user.role),
+        clientes=_clientes(db),
+        tiposPeca=_tipos(db),
+    )
+    return Response(content=catalogo.model_dump_json(), media_type="application/json", headers=headers)
@@ -2,13 +2,15 @@
 
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.audit import audit_log, diff
+from app.core.database import get_db, get_read_db
 from app.core.security import get_current_user, require_permission
-from app.models import Cliente
+from app.core.sharding import has_pecas, replicate_catalogue
+from app.models import Cliente, Peca, Usuario
 from app.schemas import ClienteCreate, ClienteOut
 
 router = APIRouter(prefix="/api/clientes", tags=["Clientes"])
@@ -24,7 +26,7 @@ def serialize_cliente(cliente: Cliente) -> ClienteOut:
 
 
 @router.get("", response_model=List[ClienteOut], dependencies=[Depends(get_current_user)])
-def list_clientes(db: Session = Depends(get_db)) -> List[ClienteOut]:
+def list_clientes(db: Session = Depends(get_read_db)) -> List[ClienteOut]:
     clientes = db.query(Cliente).order_by(Cliente.nome).all()
     return [serialize_cliente(cliente) for cliente in clientes]
 
@@ -33,9 +35,12 @@ def list_clientes(db: Session = Depends(get_db)) -> List[ClienteOut]:
     "",
     response_model=ClienteOut,
     status_code=status.HTTP_201_CREATED,
-    dependencies=[Depends(require_permission("podeConfig"))],
 )
-def create_cliente(payload: ClienteCreate, db: Session = Depends(get_db)) -> ClienteOut:
+def create_cliente(
+    payload: ClienteCreate,
+    db: Session = Depends(get_db),
+    user: Usuario = Depends(require_permission("podeConfig")),
+) -> ClienteOut:
     cliente = Cliente(nome=payload.nome)
     db.add(cliente)
     try:
@@ -44,25 +49,35 @@ def create_cliente(payload: ClienteCreate, db: Session = Depends(get_db)) -> Cli
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=400, detail="Cliente já existe.")
+    audit_log.record(user, "cliente", cliente.id, "criacao", diff({}, {"nome": cliente.nome}))
+    replicate_catalogue()
     return serialize_cliente(cliente)
 
 
 @router.delete(
     "/{cliente_id}",
     status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(require_permission("podeConfig"))],
 )
-def delete_cliente(cliente_id: int, db: Session = Depends(get_db)) -> Response:
+def delete_cliente(
+    cliente_id: int,
+    db: Session = Depends(get_db),
+    user: Usuario = Depends(require_permission("podeConfig")),
+) -> None:
     cliente = db.get(Cliente, cliente_id)
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente não encontrado.")
+    antes = {"nome": cliente.nome}
+    conflito = HTTPException(
+        status_code=409,
+        detail="Não é possível excluir o cliente pois existem peças vinculadas.",
+    )
+    if has_pecas(db, Peca.cliente_id, cliente_id):
+        raise conflito
     db.delete(cliente)
     try:
         db.commit()
     except IntegrityError:
         db.rollback()
-        raise HTTPException(
-            status_code=409,
-            detail="Não é possível excluir o cliente pois existem peças vinculadas.",
-        )
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
+        raise conflito
+    audit_log.record(user, "cliente", cliente_id, "remocao", diff(antes, dict.fromkeys(antes)))
+    replicate_catalogue()
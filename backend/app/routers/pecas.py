@@ -1,19 +1,68 @@
 """Rotas para CRUD de peças."""
 
+import asyncio
+import base64
+import heapq
+import itertools
+import json
 from datetime import date
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
-from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import bindparam, case, delete, func, insert, inspect, lambda_stmt, select, text, tuple_, update
+from sqlalchemy.orm import Query as OrmQuery
+from sqlalchemy.orm import Session, defer, joinedload
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 
-from app.core.database import get_db
-from app.core.security import get_current_user, require_permission
-from app.models import Cliente, Peca, Secretaria, TipoPeca
-from app.schemas import PecaCreate, PecaOut, PecaUpdate
+from app.core.audit import audit_log, diff
+from app.core.archive import (
+    forget,
+    forget_many,
+    is_archived,
+    keep_original,
+    load_comprovacao,
+    resolve_comprovacao,
+)
+from app.core.database import (
+    PRINCIPAL,
+    SessionLocal,
+    ShardSessions,
+    get_db,
+    get_read_db,
+    get_shard_router,
+    get_shard_sessions,
+)
+from app.core.events import broker, notify_peca_change, notify_reload
+from app.core.normalization import normalize_proof
+from app.core.query_guard import row_budget, truncate_to_budget
+from app.core.security import create_stream_ticket, get_current_user, get_stream_user, require_permission
+from app.core.uploads import upload_store
+from app.models import Cliente, ComprovacaoArquivada, Peca, PecaRemovida, Secretaria, TipoPeca, Usuario
+from app.schemas import (
+    ComprovacaoMeta,
+    EventosTicket,
+    PecaBatchRequest,
+    PecaBatchResponse,
+    PecaBulkDelete,
+    PecaBulkResponse,
+    PecaBulkResultado,
+    PecaBulkUpdate,
+    PecaCreate,
+    PecaOut,
+    PecaRemovidaOut,
+    PecaSyncResponse,
+    PecaUpdate,
+)
+from app.schemas.pecas import MAX_BATCH_IDS, MAX_BATCH_IDS_COMPLETA, ComprovacaoModo, PecaBulkSelecao
 
 router = APIRouter(prefix="/api/pecas", tags=["Peças"])
 
+SSE_KEEPALIVE_SECONDS = 15
+BULK_FILTER_LIMIT = 5000
+BULK_NOTIFY_LIMIT = 100
+
 
 # Helpers --------------------------------------------------------------------
 
@@ -21,23 +70,27 @@ def _normalize_name(value: str) -> str:
     return value.strip()
 
 
+# Built once: SQLAlchemy finds their compiled form in its cache by structure, so
+# each call only binds the name instead of rebuilding and re-hashing a Query.
+_CLIENTE_POR_NOME = select(Cliente).where(func.lower(Cliente.nome) == func.lower(bindparam("nome"))).limit(1)
+_TIPO_POR_NOME = select(TipoPeca).where(func.lower(TipoPeca.nome) == func.lower(bindparam("nome"))).limit(1)
+_SECRETARIA_POR_NOME = (
+    select(Secretaria)
+    .where(Secretaria.cliente_id == bindparam("cliente_id"))
+    .where(func.lower(Secretaria.nome) == func.lower(bindparam("nome")))
+    .limit(1)
+)
+
+
 def _get_cliente_by_nome(nome: str, db: Session) -> Cliente:
-    cliente = (
-        db.query(Cliente)
-        .filter(func.lower(Cliente.nome) == func.lower(_normalize_name(nome)))
-        .first()
-    )
+    cliente = db.execute(_CLIENTE_POR_NOME, {"nome": _normalize_name(nome)}).scalars().first()
     if not cliente:
         raise HTTPException(status_code=400, detail=f"Cliente '{nome}' não encontrado.")
     return cliente
 
 
 def _get_tipo_by_nome(nome: str, db: Session) -> TipoPeca:
-    tipo = (
-        db.query(TipoPeca)
-        .filter(func.lower(TipoPeca.nome) == func.lower(_normalize_name(nome)))
-        .first()
-    )
+    tipo = db.execute(_TIPO_POR_NOME, {"nome": _normalize_name(nome)}).scalars().first()
     if not tipo:
         raise HTTPException(status_code=400, detail=f"Tipo de peça '{nome}' não encontrado.")
     return tipo
@@ -45,9 +98,8 @@ def _get_tipo_by_nome(nome: str, db: Session) -> TipoPeca:
 
 def _get_secretaria(nome: str, cliente_id: int, db: Session) -> Secretaria:
     secretaria = (
-        db.query(Secretaria)
-        .filter(Secretaria.cliente_id == cliente_id)
-        .filter(func.lower(Secretaria.nome) == func.lower(_normalize_name(nome)))
+        db.execute(_SECRETARIA_POR_NOME, {"cliente_id": cliente_id, "nome": _normalize_name(nome)})
+        .scalars()
         .first()
     )
     if not secretaria:
@@ -58,7 +110,9 @@ def _get_secretaria(nome: str, cliente_id: int, db: Session) -> Secretaria:
     return secretaria
 
 
-def _serialize_peca(peca: Peca, include_comprovacao: bool = False) -> PecaOut:
+def _serialize_peca(
+    peca: Peca, include_comprovacao: bool = False, db: Optional[Session] = None
+) -> PecaOut:
     return PecaOut(
         id=peca.id,
         cliente=peca.cliente.nome,
@@ -68,44 +122,363 @@ def _serialize_peca(peca: Peca, include_comprovacao: bool = False) -> PecaOut:
         dataCriacao=peca.data_criacao,
         dataVeiculacao=peca.data_veiculacao,
         observacao=peca.observacao or "",
-        comprovacao=peca.comprovacao_base64 if include_comprovacao else None,
+        comprovacao=resolve_comprovacao(peca, db) if include_comprovacao else None,
         dataCadastro=peca.data_cadastro,
-        hasComprovacao=bool(peca.comprovacao_base64),
+        # A deferred (unloaded) proof column is NOT NULL, so it is present.
+        hasComprovacao="comprovacao_base64" in inspect(peca).unloaded or bool(peca.comprovacao_base64),
+    )
+
+
+def _apply_filters(
+    query: OrmQuery,
+    cliente: Optional[str],
+    secretaria: Optional[str],
+    tipoPeca: Optional[str],
+    dataInicio: Optional[date],
+    dataFim: Optional[date],
+) -> OrmQuery:
+    """Apply the list filters to a query already joined with cliente, secretaria and tipo."""
+    if cliente:
+        query = query.filter(func.lower(Cliente.nome) == func.lower(_normalize_name(cliente)))
+    if secretaria:
+        query = query.filter(
+            func.lower(Secretaria.nome) == func.lower(_normalize_name(secretaria))
+        )
+    if tipoPeca:
+        query = query.filter(func.lower(TipoPeca.nome) == func.lower(_normalize_name(tipoPeca)))
+    if dataInicio:
+        query = query.filter(Peca.data_criacao >= dataInicio)
+    if dataFim:
+        query = query.filter(Peca.data_criacao <= dataFim)
+    return query
+
+
+def _list_statement(
+    cliente: Optional[str],
+    secretaria: Optional[str],
+    tipoPeca: Optional[str],
+    dataInicio: Optional[date],
+    dataFim: Optional[date],
+    limite: Optional[int] = None,
+    deslocamento: int = 0,
+) -> StatementLambdaElement:
+    """The ``list_pecas`` SELECT as a cached lambda statement.
+
+    Each lambda is analysed once; later calls with the same combination of
+    filters reuse the built and compiled statement and only extract the
+    closure values as bound parameters.
+    """
+    stmt = lambda_stmt(
+        lambda: select(Peca)
+        .join(Peca.cliente)
+        .join(Peca.secretaria)
+        .join(Peca.tipo_peca)
+        .options(
+            defer(Peca.comprovacao_base64),
+            joinedload(Peca.cliente),
+            joinedload(Peca.secretaria),
+            joinedload(Peca.tipo_peca),
+        )
+    )
+    if cliente:
+        nome_cliente = _normalize_name(cliente)
+        stmt += lambda s: s.where(func.lower(Cliente.nome) == func.lower(nome_cliente))
+    if secretaria:
+        nome_secretaria = _normalize_name(secretaria)
+        stmt += lambda s: s.where(func.lower(Secretaria.nome) == func.lower(nome_secretaria))
+    if tipoPeca:
+        nome_tipo = _normalize_name(tipoPeca)
+        stmt += lambda s: s.where(func.lower(TipoPeca.nome) == func.lower(nome_tipo))
+    if dataInicio:
+        stmt += lambda s: s.where(Peca.data_criacao >= dataInicio)
+    if dataFim:
+        stmt += lambda s: s.where(Peca.data_criacao <= dataFim)
+    stmt += lambda s: s.order_by(Peca.data_criacao.desc(), Peca.id.desc())
+    if limite is not None:
+        stmt += lambda s: s.limit(limite).offset(deslocamento)
+    return stmt
+
+
+def _comprovacao_meta(
+    tamanho: int, prefixo: str, tamanho_arquivada: Optional[int] = None
+) -> ComprovacaoMeta:
+    """Describe a proof from its stored length and first characters, without loading it."""
+    if is_archived(prefixo):
+        return ComprovacaoMeta(tamanhoBytes=(tamanho_arquivada or 0) * 3 // 4, arquivada=True)
+    header, sep, _ = prefixo.partition(",")
+    if sep and header.startswith("data:"):
+        return ComprovacaoMeta(
+            mimeType=header[5:].split(";")[0],
+            tamanhoBytes=(tamanho - len(header) - 1) * 3 // 4,
+        )
+    return ComprovacaoMeta(tamanhoBytes=tamanho * 3 // 4)
+
+
+def _load_batch(ids: List[int], modo: ComprovacaoModo, db: Session) -> PecaBatchResponse:
+    """Load many pieces with one IN query per database, returned in the requested order."""
+    unique_ids = list(dict.fromkeys(ids))
+    if modo == "completa" and len(unique_ids) > MAX_BATCH_IDS_COMPLETA:
+        raise HTTPException(
+            status_code=400,
+            detail=f"No máximo {MAX_BATCH_IDS_COMPLETA} ids por chamada com comprovacao=completa.",
+        )
+    itens: Dict[int, PecaOut] = {}
+    for encontrados in get_shard_router().scatter(db, lambda session: _batch_items(unique_ids, modo, session)):
+        itens.update(encontrados)
+    return PecaBatchResponse(
+        itens=[itens[peca_id] for peca_id in unique_ids if peca_id in itens],
+        naoEncontradas=[peca_id for peca_id in unique_ids if peca_id not in itens],
+    )
+
+
+def _batch_items(ids: List[int], modo: ComprovacaoModo, db: Session) -> Dict[int, PecaOut]:
+    relations = (joinedload(Peca.cliente), joinedload(Peca.secretaria), joinedload(Peca.tipo_peca))
+    itens: Dict[int, PecaOut] = {}
+
+    if modo == "completa":
+        for peca in db.query(Peca).options(*relations).filter(Peca.id.in_(ids)):
+            itens[peca.id] = _serialize_peca(peca, include_comprovacao=True, db=db)
+    elif modo == "meta":
+        rows = (
+            db.query(
+                Peca,
+                func.octet_length(Peca.comprovacao_base64),
+                func.substr(Peca.comprovacao_base64, 1, 64),
+                ComprovacaoArquivada.tamanho_original,
+            )
+            .outerjoin(ComprovacaoArquivada, ComprovacaoArquivada.peca_id == Peca.id)
+            .options(defer(Peca.comprovacao_base64), *relations)
+            .filter(Peca.id.in_(ids))
+        )
+        for peca, tamanho, prefixo, tamanho_arquivada in rows:
+            item = _serialize_peca(peca)
+            item.comprovacaoMeta = _comprovacao_meta(tamanho, prefixo, tamanho_arquivada)
+            itens[peca.id] = item
+    else:
+        for peca in db.query(Peca).options(defer(Peca.comprovacao_base64), *relations).filter(
+            Peca.id.in_(ids)
+        ):
+            itens[peca.id] = _serialize_peca(peca)
+    return itens
+
+
+# Columns a write returns: everything the response needs except the proof itself.
+_WRITE_RETURNING = (
+    Peca.id,
+    Peca.nome_peca,
+    Peca.data_criacao,
+    Peca.data_veiculacao,
+    Peca.observacao,
+    Peca.data_cadastro,
+    func.octet_length(Peca.comprovacao_base64).label("tamanho"),
+    func.substr(Peca.comprovacao_base64, 1, 64).label("prefixo"),
+)
+
+
+def _written_peca_out(
+    row: Any,
+    cliente: str,
+    secretaria: str,
+    tipo_peca: str,
+    modo: ComprovacaoModo,
+    db: Session,
+    comprovacao: Optional[str] = None,
+) -> PecaOut:
+    """Build a write response from its RETURNING row; the proof is read only for ``completa``."""
+    item = PecaOut(
+        id=row.id,
+        cliente=cliente,
+        secretaria=secretaria,
+        tipoPeca=tipo_peca,
+        nomePeca=row.nome_peca,
+        dataCriacao=row.data_criacao,
+        dataVeiculacao=row.data_veiculacao,
+        observacao=row.observacao or "",
+        dataCadastro=row.data_cadastro,
+        hasComprovacao=bool(row.tamanho),
     )
+    if modo == "meta":
+        tamanho_arquivada = None
+        if is_archived(row.prefixo):
+            entry = db.get(ComprovacaoArquivada, row.id)
+            tamanho_arquivada = entry.tamanho_original if entry else None
+        item.comprovacaoMeta = _comprovacao_meta(row.tamanho, row.prefixo, tamanho_arquivada)
+    elif modo == "completa":
+        if comprovacao is None:
+            comprovacao = db.execute(select(Peca.comprovacao_base64).where(Peca.id == row.id)).scalar_one()
+        item.comprovacao = load_comprovacao(row.id, db) if is_archived(comprovacao) else comprovacao
+    return item
+
+
+def _select_bulk_targets(
+    selecao: PecaBulkSelecao, shards: ShardSessions
+) -> Tuple[List[int], Dict[str, Dict[int, Tuple[int, date]]], List[int]]:
+    """Lock the selected rows (never their proofs) on every database holding pieces.
+
+    Returns the ids in response order, ``{banco: {id: (cliente_id, data_criacao)}}``
+    of the rows found and the requested ids that do not exist. The locks are
+    held by the ``shards`` sessions until ``shards.commit()``.
+    """
+    ordem = list(dict.fromkeys(selecao.ids)) if selecao.ids is not None else []
+    por_banco: Dict[str, Dict[int, Tuple[int, date]]] = {}
+    for nome in shards.router.names():
+        db = shards.get(nome)
+        query = db.query(Peca.id, Peca.cliente_id, Peca.data_criacao).with_for_update(of=Peca)
+        if selecao.ids is not None:
+            rows = query.filter(Peca.id.in_(ordem)).all() if ordem else []
+        else:
+            query = _apply_filters(
+                query.join(Peca.cliente).join(Peca.secretaria).join(Peca.tipo_peca), **selecao.filtro.model_dump()
+            )
+            rows = query.order_by(Peca.id).limit(BULK_FILTER_LIMIT + 1).all()
+        por_banco[nome] = {row.id: (row.cliente_id, row.data_criacao) for row in rows}
+
+    encontradas = {peca_id for alvos in por_banco.values() for peca_id in alvos}
+    if selecao.ids is None:
+        if len(encontradas) > BULK_FILTER_LIMIT:
+            raise HTTPException(
+                status_code=400,
+                detail=f"O filtro seleciona mais de {BULK_FILTER_LIMIT} peças; restrinja os critérios.",
+            )
+        ordem = sorted(encontradas)
+    return ordem, por_banco, [peca_id for peca_id in ordem if peca_id not in encontradas]
+
+
+def _bulk_response(ordem: List[int], status_por_id: Dict[int, str]) -> PecaBulkResponse:
+    resultados = [PecaBulkResultado(id=peca_id, status=status_por_id[peca_id]) for peca_id in ordem]
+    totais: Dict[str, int] = {}
+    for resultado in resultados:
+        totais[resultado.status] = totais.get(resultado.status, 0) + 1
+    return PecaBulkResponse(resultados=resultados, totais=totais)
+
+
+# Sync order within one (versao, id): a piece moved to another cliente has a row
+# and a tombstone with the same key, and a page may end between them.
+_SYNC_PECA, _SYNC_REMOVIDA = 0, 1
+
+
+def _parse_cursor(cursor: str) -> Tuple[int, int, int]:
+    """``versao.id.tipo``; cursors from before the third part resume after both kinds."""
+    try:
+        partes = [int(parte) for parte in cursor.split(".")]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Cursor de sincronização inválido.") from exc
+    if not 1 <= len(partes) <= 3:
+        raise HTTPException(status_code=400, detail="Cursor de sincronização inválido.")
+    if len(partes) == 1:
+        partes.append(0)
+    if len(partes) == 2:
+        partes.append(_SYNC_REMOVIDA)
+    versao, peca_id, tipo = partes
+    return versao, peca_id, tipo
+
+
+def _parse_sync_cursor(cursor: str) -> Dict[str, Tuple[int, int, int]]:
+    """Position per database: ``principal=v.i.t;shard=v.i.t`` with shards, else a bare ``v.i.t``.
+
+    A bare cursor (also one issued before sharding was enabled) is the
+    primary's position; databases missing from the cursor start over.
+    """
+    if "=" not in cursor:
+        return {PRINCIPAL: _parse_cursor(cursor)}
+    posicoes = {}
+    for parte in cursor.split(";"):
+        nome, _, posicao = parte.partition("=")
+        posicoes[nome] = _parse_cursor(posicao)
+    return posicoes
+
+
+def _format_cursor(posicao: Tuple[int, int, int]) -> str:
+    return ".".join(str(parte) for parte in posicao)
+
+
+def _after_cursor(versao: Any, peca_id: Any, tipo: int, posicao: Tuple[int, int, int]) -> Any:
+    """Condition for ``(versao, peca_id, tipo)`` to sort after ``posicao``."""
+    chave = tuple_(versao, peca_id)
+    return chave >= posicao[:2] if tipo > posicao[2] else chave > posicao[:2]
 
 
 # Routes ---------------------------------------------------------------------
 
 
+def _peca_db(peca_id: int, shards: ShardSessions) -> Session:
+    """Session on the database holding ``peca_id``; ids are unique across shards."""
+    if not shards.router.enabled:
+        return shards.db
+    encontrada = shards.router.scatter(
+        shards.db, lambda session: session.execute(select(Peca.id).where(Peca.id == peca_id)).first() is not None
+    )
+    for nome, achou in zip(shards.router.names(), encontrada):
+        if achou:
+            return shards.get(nome)
+    raise HTTPException(status_code=404, detail="Peça não encontrada.")
+
+
+def _proof_from_payload(payload: PecaCreate | PecaUpdate, user: Usuario) -> Optional[str]:
+    """The inline proof, or the completed upload named by ``uploadId`` as a data URL."""
+    if payload.uploadId:
+        return upload_store.read_data_url(payload.uploadId, user.username)
+    return payload.comprovacao
+
+
 @router.post(
     "",
     response_model=PecaOut,
     status_code=status.HTTP_201_CREATED,
-    dependencies=[Depends(require_permission("podeInserir"))],
 )
-def create_peca(payload: PecaCreate, db: Session = Depends(get_db)) -> PecaOut:
+def create_peca(
+    payload: PecaCreate,
+    comprovacao: ComprovacaoModo = Query("meta"),
+    db: Session = Depends(get_db),
+    shards: ShardSessions = Depends(get_shard_sessions),
+    user: Usuario = Depends(require_permission("podeInserir")),
+) -> PecaOut:
     cliente = _get_cliente_by_nome(payload.cliente, db)
     secretaria = _get_secretaria(payload.secretaria, cliente.id, db)
     tipo = _get_tipo_by_nome(payload.tipoPeca, db)
+    normalized = normalize_proof(_proof_from_payload(payload, user))
 
-    peca = Peca(
-        cliente_id=cliente.id,
-        secretaria_id=secretaria.id,
-        tipo_peca_id=tipo.id,
-        nome_peca=payload.nomePeca,
-        data_criacao=payload.dataCriacao,
-        data_veiculacao=payload.dataVeiculacao,
-        observacao=payload.observacao,
-        comprovacao_base64=payload.comprovacao,
+    pecas_db = shards.for_cliente(cliente.id)
+    row = pecas_db.execute(
+        insert(Peca)
+        .values(
+            cliente_id=cliente.id,
+            secretaria_id=secretaria.id,
+            tipo_peca_id=tipo.id,
+            nome_peca=payload.nomePeca,
+            data_criacao=payload.dataCriacao,
+            data_veiculacao=payload.dataVeiculacao,
+            observacao=payload.observacao,
+            comprovacao_base64=normalized.value,
+        )
+        .returning(*_WRITE_RETURNING)
+    ).one()
+    if normalized.original:
+        keep_original(row.id, normalized.original, pecas_db)
+    campos = {
+        "cliente": cliente.nome,
+        "secretaria": secretaria.nome,
+        "tipoPeca": tipo.nome,
+        "nomePeca": row.nome_peca,
+        "dataCriacao": row.data_criacao,
+        "dataVeiculacao": row.data_veiculacao,
+        "observacao": row.observacao or "",
+        "hasComprovacao": True,
+    }
+    notify_peca_change(db, "criada", row.id, cliente.id, campos)
+    item = _written_peca_out(
+        row, cliente.nome, secretaria.nome, tipo.nome, comprovacao, pecas_db, comprovacao=normalized.value
     )
-    db.add(peca)
-    db.commit()
-    db.refresh(peca)
-    return _serialize_peca(peca, include_comprovacao=True)
+    shards.commit()
+    if payload.uploadId:
+        upload_store.discard(payload.uploadId)
+    audit_log.record(user, "peca", row.id, "criacao", diff({}, campos))
+    return item
 
 
-@router.get("", response_model=List[PecaOut], dependencies=[Depends(get_current_user)])
+@router.get("", response_model=List[PecaOut])
 def list_pecas(
+    response: Response,
     cliente: Optional[str] = Query(None),
     secretaria: Optional[str] = Query(None),
     tipoPeca: Optional[str] = Query(None),
@@ -115,38 +488,368 @@ def list_pecas(
     pageSize: Optional[int] = Query(
         None, ge=1, le=200, description="Quantidade de itens por página (opcional)"
     ),
-    db: Session = Depends(get_db),
+    user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
 ) -> List[PecaOut]:
+    limite = pageSize if page and pageSize else None
+    deslocamento = (page - 1) * pageSize if limite else 0
+    router = get_shard_router()
+    orcamento = row_budget(user, "maxLinhasLista") if limite is None else None
+    if orcamento is not None:
+        # One row past the budget tells whether the list was cut.
+        limite = orcamento + 1
+
+    if not router.enabled:
+        stmt = _list_statement(cliente, secretaria, tipoPeca, dataInicio, dataFim, limite, deslocamento)
+        pecas = db.execute(stmt).scalars().all()
+        itens = [_serialize_peca(peca, include_comprovacao=False) for peca in pecas]
+    else:
+        # Every database returns its first deslocamento + limite rows; merging keeps the global order.
+        por_banco = limite + deslocamento if limite else None
+
+        def listar(session: Session) -> List[PecaOut]:
+            stmt = _list_statement(cliente, secretaria, tipoPeca, dataInicio, dataFim, por_banco)
+            return [_serialize_peca(peca, include_comprovacao=False) for peca in session.execute(stmt).scalars()]
+
+        merged = heapq.merge(*router.scatter(db, listar), key=lambda item: (item.dataCriacao, item.id), reverse=True)
+        itens = list(itertools.islice(merged, deslocamento, por_banco))
+    return truncate_to_budget(response, itens, orcamento) if orcamento is not None else itens
+
+
+@router.get(":batch", response_model=PecaBatchResponse, dependencies=[Depends(get_current_user)])
+def batch_pecas(
+    ids: str = Query(..., description=f"Ids separados por vírgula (máximo {MAX_BATCH_IDS})"),
+    comprovacao: ComprovacaoModo = Query("meta"),
+    db: Session = Depends(get_db),
+) -> PecaBatchResponse:
+    try:
+        parsed = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Lista de ids inválida.") from exc
+    if not parsed:
+        raise HTTPException(status_code=400, detail="Informe ao menos um id.")
+    if len(parsed) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"No máximo {MAX_BATCH_IDS} ids por chamada.")
+    return _load_batch(parsed, comprovacao, db)
+
+
+@router.post(":batch", response_model=PecaBatchResponse, dependencies=[Depends(get_current_user)])
+def batch_pecas_post(payload: PecaBatchRequest, db: Session = Depends(get_db)) -> PecaBatchResponse:
+    return _load_batch(payload.ids, payload.comprovacao, db)
+
+
+@router.post(":bulk-update", response_model=PecaBulkResponse)
+def bulk_update_pecas(
+    payload: PecaBulkUpdate,
+    shards: ShardSessions = Depends(get_shard_sessions),
+    user: Usuario = Depends(require_permission("podeEditar")),
+) -> PecaBulkResponse:
+    """Apply one patch to many pieces with a single set-based UPDATE per database."""
+    db = shards.db
+    patch = payload.alteracoes
+    if patch.cliente and patch.secretaria is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Ao alterar o cliente é necessário informar a nova secretaria correspondente.",
+        )
+
+    ordem, por_banco, nao_encontradas = _select_bulk_targets(payload, shards)
+    alvos = {peca_id: alvo for alvos_banco in por_banco.values() for peca_id, alvo in alvos_banco.items()}
+    status_por_id = {peca_id: "nao_encontrada" for peca_id in nao_encontradas}
+
+    values: Dict[str, Any] = {}
+    campos: Dict[str, Any] = {}
+    novo_cliente_id: Optional[int] = None
+    secretaria_por_cliente: Optional[Dict[int, int]] = None
+
+    if patch.cliente:
+        cliente_obj = _get_cliente_by_nome(patch.cliente, db)
+        secretaria_obj = _get_secretaria(patch.secretaria, cliente_obj.id, db)
+        novo_cliente_id = cliente_obj.id
+        values.update(cliente_id=cliente_obj.id, secretaria_id=secretaria_obj.id)
+        campos.update(cliente=cliente_obj.nome, secretaria=secretaria_obj.nome)
+    elif patch.secretaria:
+        # Same secretaria name, resolved once for every cliente in the selection.
+        secretarias = (
+            db.query(Secretaria)
+            .filter(Secretaria.cliente_id.in_({cliente_id for cliente_id, _ in alvos.values()}))
+            .filter(func.lower(Secretaria.nome) == func.lower(_normalize_name(patch.secretaria)))
+            .all()
+        )
+        secretaria_por_cliente = {secretaria.cliente_id: secretaria.id for secretaria in secretarias}
+        campos["secretaria"] = secretarias[0].nome if secretarias else patch.secretaria
+        if secretaria_por_cliente:
+            values["secretaria_id"] = case(secretaria_por_cliente, value=Peca.cliente_id)
+
+    if patch.tipoPeca:
+        tipo_obj = _get_tipo_by_nome(patch.tipoPeca, db)
+        values["tipo_peca_id"] = tipo_obj.id
+        campos["tipoPeca"] = tipo_obj.nome
+
+    for campo, coluna in (
+        ("nomePeca", "nome_peca"),
+        ("dataCriacao", "data_criacao"),
+        ("dataVeiculacao", "data_veiculacao"),
+        ("observacao", "observacao"),
+    ):
+        valor = getattr(patch, campo)
+        if valor is not None:
+            values[coluna] = valor
+            campos[campo] = valor
+
+    if not campos:
+        raise HTTPException(status_code=400, detail="Nenhuma alteração informada.")
+
+    atualizadas: List[Tuple[int, int]] = []
+    for nome, alvos_banco in por_banco.items():
+        validos = []
+        for peca_id, (cliente_id, _) in alvos_banco.items():
+            if secretaria_por_cliente is not None and cliente_id not in secretaria_por_cliente:
+                status_por_id[peca_id] = "secretaria_inexistente"
+            elif novo_cliente_id is not None and shards.router.shard_for(novo_cliente_id) != nome:
+                status_por_id[peca_id] = "cliente_em_outro_shard"
+            else:
+                validos.append(peca_id)
+        if not (validos and values):
+            continue
+
+        pecas_db = shards.get(nome)
+        if novo_cliente_id is not None:
+            pecas_db.execute(
+                insert(PecaRemovida).from_select(
+                    ["peca_id", "cliente_id", "data_criacao"],
+                    select(Peca.id, Peca.cliente_id, Peca.data_criacao)
+                    .where(Peca.id.in_(validos))
+                    .where(Peca.cliente_id != novo_cliente_id),
+                )
+            )
+        atualizadas.extend(
+            pecas_db.execute(
+                update(Peca)
+                .where(Peca.id.in_(validos))
+                .values(**values)
+                .returning(Peca.id, Peca.cliente_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+        )
+
+    # Events go through the primary, whatever database the pieces live in.
+    if len(atualizadas) <= BULK_NOTIFY_LIMIT:
+        for peca_id, cliente_id in atualizadas:
+            notify_peca_change(db, "atualizada", peca_id, cliente_id, campos, alvos[peca_id][0])
+    elif atualizadas:
+        notify_reload(
+            db,
+            [cliente_id for cliente_id, _ in atualizadas] + [alvos[peca_id][0] for peca_id, _ in atualizadas],
+        )
+    for peca_id, _ in atualizadas:
+        status_por_id[peca_id] = "atualizada"
+
+    shards.commit()
+    # Set-based update: previous values are not read, so "antes" is null.
+    alteracoes = diff({}, campos)
+    for peca_id, status_peca in status_por_id.items():
+        if status_peca == "atualizada":
+            audit_log.record(user, "peca", peca_id, "atualizacao", alteracoes)
+    return _bulk_response(ordem, status_por_id)
+
+
+@router.post(":bulk-delete", response_model=PecaBulkResponse)
+def bulk_delete_pecas(
+    payload: PecaBulkDelete,
+    shards: ShardSessions = Depends(get_shard_sessions),
+    user: Usuario = Depends(require_permission("podeDeletar")),
+) -> PecaBulkResponse:
+    """Delete many pieces with one DELETE ... RETURNING per database, leaving tombstones for sync."""
+    ordem, por_banco, nao_encontradas = _select_bulk_targets(payload, shards)
+    status_por_id = {peca_id: "nao_encontrada" for peca_id in nao_encontradas}
+
+    removidas: List[Tuple[int, int]] = []
+    for nome, alvos in por_banco.items():
+        if not alvos:
+            continue
+        pecas_db = shards.get(nome)
+        ids = list(alvos)
+        pecas_db.execute(
+            insert(PecaRemovida),
+            [
+                {"peca_id": peca_id, "cliente_id": cliente_id, "data_criacao": data_criacao}
+                for peca_id, (cliente_id, data_criacao) in alvos.items()
+            ],
+        )
+        forget_many(ids, pecas_db)
+        removidas.extend(
+            pecas_db.execute(
+                delete(Peca)
+                .where(Peca.id.in_(ids))
+                .returning(Peca.id, Peca.cliente_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+        )
+
+    if len(removidas) <= BULK_NOTIFY_LIMIT:
+        for peca_id, cliente_id in removidas:
+            notify_peca_change(shards.db, "removida", peca_id, cliente_id)
+    elif removidas:
+        notify_reload(shards.db, [cliente_id for _, cliente_id in removidas])
+    for peca_id, _ in removidas:
+        status_por_id[peca_id] = "removida"
+
+    shards.commit()
+    for peca_id, status_peca in status_por_id.items():
+        if status_peca == "removida":
+            audit_log.record(user, "peca", peca_id, "remocao")
+    return _bulk_response(ordem, status_por_id)
+
+
+@router.get("/sync", response_model=PecaSyncResponse, dependencies=[Depends(get_current_user)])
+def sync_pecas(
+    cursor: str = Query("0", description="Cursor devolvido pela chamada anterior ('0' na primeira)"),
+    cliente: Optional[str] = Query(None),
+    limite: int = Query(500, ge=1, le=2000),
+    db: Session = Depends(get_db),
+) -> PecaSyncResponse:
+    """Peças created or updated and ids removed since ``cursor``, without proofs.
+
+    Only transactions older than the snapshot xmin are returned, so a change
+    committed after a later one is still picked up on the next call. With
+    shards every database keeps its own position (``versao`` is a transaction
+    id of that database) and they are read in turn until the page is full.
+    """
+    router = get_shard_router()
+    posicoes = _parse_sync_cursor(cursor)
+    cliente_id = _get_cliente_by_nome(cliente, db).id if cliente else None
+
+    itens: List[PecaOut] = []
+    removidas: List[PecaRemovidaOut] = []
+    proximas: Dict[str, Tuple[int, int, int]] = {}
+    tem_mais = False
+    for nome in router.names():
+        posicao = posicoes.get(nome, _parse_cursor("0"))
+        restante = limite - len(itens) - len(removidas)
+        if restante <= 0:
+            proximas[nome], tem_mais = posicao, True
+            continue
+        if nome == PRINCIPAL:
+            pagina = _sync_changes(db, posicao, cliente_id, restante)
+        else:
+            with router.session(nome) as shard_db:
+                pagina = _sync_changes(shard_db, posicao, cliente_id, restante)
+        itens.extend(pagina[0])
+        removidas.extend(pagina[1])
+        proximas[nome] = pagina[2]
+        tem_mais = tem_mais or pagina[3]
+
+    if router.enabled:
+        proxima = ";".join(f"{nome}={_format_cursor(posicao)}" for nome, posicao in proximas.items())
+    else:
+        proxima = _format_cursor(proximas[PRINCIPAL])
+    return PecaSyncResponse(itens=itens, removidas=removidas, cursor=proxima, temMais=tem_mais)
+
+
+def _sync_changes(
+    db: Session, posicao: Tuple[int, int, int], cliente_id: Optional[int], limite: int
+) -> Tuple[List[PecaOut], List[PecaRemovidaOut], Tuple[int, int, int], bool]:
+    """One database's changes after ``posicao``: pieces, tombstones, the next position and whether more remain."""
+    horizonte = db.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")).scalar_one()
+
     query = (
         db.query(Peca)
-        .join(Peca.cliente)
-        .join(Peca.secretaria)
-        .join(Peca.tipo_peca)
         .options(
+            defer(Peca.comprovacao_base64),
             joinedload(Peca.cliente),
             joinedload(Peca.secretaria),
             joinedload(Peca.tipo_peca),
         )
+        .filter(_after_cursor(Peca.versao, Peca.id, _SYNC_PECA, posicao))
+        .filter(Peca.versao < horizonte)
     )
-
-    if cliente:
-        query = query.filter(func.lower(Cliente.nome) == func.lower(_normalize_name(cliente)))
-    if secretaria:
-        query = query.filter(
-            func.lower(Secretaria.nome) == func.lower(_normalize_name(secretaria))
+    removidas_query = (
+        db.query(PecaRemovida)
+        .filter(_after_cursor(PecaRemovida.versao, PecaRemovida.peca_id, _SYNC_REMOVIDA, posicao))
+        .filter(PecaRemovida.versao < horizonte)
+    )
+    if cliente_id is not None:
+        query = query.filter(Peca.cliente_id == cliente_id)
+        removidas_query = removidas_query.filter(PecaRemovida.cliente_id == cliente_id)
+    else:
+        # Tombstones of pieces that only moved to another cliente do not apply here.
+        removidas_query = removidas_query.filter(
+            ~db.query(Peca.id).filter(Peca.id == PecaRemovida.peca_id).exists()
         )
-    if tipoPeca:
-        query = query.filter(func.lower(TipoPeca.nome) == func.lower(_normalize_name(tipoPeca)))
-    if dataInicio:
-        query = query.filter(Peca.data_criacao >= dataInicio)
-    if dataFim:
-        query = query.filter(Peca.data_criacao <= dataFim)
 
-    if page and pageSize:
-        query = query.limit(pageSize).offset((page - 1) * pageSize)
+    pecas = query.order_by(Peca.versao, Peca.id).limit(limite + 1).all()
+    removidas = (
+        removidas_query.order_by(PecaRemovida.versao, PecaRemovida.peca_id).limit(limite + 1).all()
+    )
+
+    alteracoes = sorted(
+        [((peca.versao, peca.id, _SYNC_PECA), peca) for peca in pecas]
+        + [((removida.versao, removida.peca_id, _SYNC_REMOVIDA), removida) for removida in removidas],
+        key=lambda item: item[0],
+    )
+    tem_mais = len(alteracoes) > limite
+    alteracoes = alteracoes[:limite]
+    proxima = alteracoes[-1][0] if tem_mais else (horizonte, 0, _SYNC_PECA)
+
+    return (
+        [_serialize_peca(item) for _, item in alteracoes if isinstance(item, Peca)],
+        [
+            PecaRemovidaOut(id=item.peca_id, clienteId=item.cliente_id)
+            for _, item in alteracoes
+            if isinstance(item, PecaRemovida)
+        ],
+        proxima,
+        tem_mais,
+    )
+
+
+def _resolve_cliente_id(nome: Optional[str]) -> Optional[int]:
+    if not nome:
+        return None
+    db = SessionLocal()
+    try:
+        return _get_cliente_by_nome(nome, db).id
+    finally:
+        db.close()
+
+
+@router.post("/eventos/ticket", response_model=EventosTicket)
+def ticket_eventos(user: Usuario = Depends(get_current_user)) -> EventosTicket:
+    """Short-lived ticket for ``GET /eventos?ticket=...``; request a new one before reconnecting."""
+    ticket, expira_em = create_stream_ticket(user.username)
+    return EventosTicket(ticket=ticket, expiraEm=expira_em)
+
+
+@router.get("/eventos", dependencies=[Depends(get_stream_user)])
+async def stream_eventos(request: Request, cliente: Optional[str] = Query(None)) -> StreamingResponse:
+    """Server-sent events with compact deltas of created, updated and removed peças.
 
-    pecas = query.order_by(Peca.data_criacao.desc(), Peca.id.desc()).all()
-    return [_serialize_peca(peca, include_comprovacao=False) for peca in pecas]
+    Each message carries the id and only the changed fields (never the proof).
+    ``acao: recarregar`` means events were lost and the client should refetch.
+    """
+    subscriber = broker.subscribe(await run_in_threadpool(_resolve_cliente_id, cliente))
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                event_id = f"id: {message['seq']}\n" if "seq" in message else ""
+                data = json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+                yield f"{event_id}event: peca\ndata: {data}\n\n"
+        finally:
+            broker.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get(
@@ -154,34 +857,85 @@ def list_pecas(
     response_model=PecaOut,
     dependencies=[Depends(get_current_user)],
 )
-def get_peca(peca_id: int, db: Session = Depends(get_db)) -> PecaOut:
-    peca = (
-        db.query(Peca)
-        .options(joinedload(Peca.cliente), joinedload(Peca.secretaria), joinedload(Peca.tipo_peca))
-        .filter(Peca.id == peca_id)
-        .first()
-    )
-    if not peca:
+def get_peca(peca_id: int, db: Session = Depends(get_read_db)) -> PecaOut:
+    def buscar(session: Session) -> Optional[PecaOut]:
+        peca = (
+            session.query(Peca)
+            .options(joinedload(Peca.cliente), joinedload(Peca.secretaria), joinedload(Peca.tipo_peca))
+            .filter(Peca.id == peca_id)
+            .first()
+        )
+        return _serialize_peca(peca, include_comprovacao=True, db=session) if peca else None
+
+    item = next((item for item in get_shard_router().scatter(db, buscar) if item is not None), None)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Peça não encontrada.")
+    return item
+
+
+@router.get("/{peca_id}/comprovacao", dependencies=[Depends(get_current_user)])
+def download_comprovacao(peca_id: int, db: Session = Depends(get_db)) -> Response:
+    def buscar(session: Session) -> Optional[Tuple[Optional[str]]]:
+        peca = session.get(Peca, peca_id)
+        return (resolve_comprovacao(peca, session),) if peca else None
+
+    encontrada = next((item for item in get_shard_router().scatter(db, buscar) if item is not None), None)
+    if encontrada is None:
         raise HTTPException(status_code=404, detail="Peça não encontrada.")
-    return _serialize_peca(peca, include_comprovacao=True)
+    (value,) = encontrada
+    if not value:
+        raise HTTPException(status_code=404, detail="Comprovação não encontrada.")
+    header, sep, payload = value.partition(",")
+    media_type = header[5:].split(";")[0] if sep and header.startswith("data:") else "application/octet-stream"
+    return Response(
+        content=base64.b64decode(payload if sep else value),
+        media_type=media_type,
+        headers={"Cache-Control": "private, max-age=3600"},
+    )
 
 
 @router.put(
     "/{peca_id}",
     response_model=PecaOut,
-    dependencies=[Depends(require_permission("podeEditar"))],
 )
-def update_peca(peca_id: int, payload: PecaUpdate, db: Session = Depends(get_db)) -> PecaOut:
-    peca = (
-        db.query(Peca)
-        .options(joinedload(Peca.cliente), joinedload(Peca.secretaria), joinedload(Peca.tipo_peca))
+def update_peca(
+    peca_id: int,
+    payload: PecaUpdate,
+    comprovacao: ComprovacaoModo = Query("meta"),
+    db: Session = Depends(get_db),
+    shards: ShardSessions = Depends(get_shard_sessions),
+    user: Usuario = Depends(require_permission("podeEditar")),
+) -> PecaOut:
+    # Re-encode before locking the row: this is the slow part of an update.
+    proof = _proof_from_payload(payload, user)
+    normalized = normalize_proof(proof) if proof is not None else None
+    pecas_db = _peca_db(peca_id, shards)
+    atual = (
+        pecas_db.query(
+            Peca.cliente_id,
+            Peca.data_criacao,
+            Peca.nome_peca,
+            Peca.data_veiculacao,
+            Peca.observacao,
+            Cliente.nome.label("cliente"),
+            Secretaria.nome.label("secretaria"),
+            TipoPeca.nome.label("tipo_peca"),
+        )
+        .join(Peca.cliente)
+        .join(Peca.secretaria)
+        .join(Peca.tipo_peca)
         .filter(Peca.id == peca_id)
+        .with_for_update(of=Peca)
         .first()
     )
-    if not peca:
+    if not atual:
         raise HTTPException(status_code=404, detail="Peça não encontrada.")
 
-    cliente_obj = peca.cliente
+    # Only the changed columns are written; the proof is never read back.
+    values: Dict[str, Any] = {}
+    campos: Dict[str, Any] = {}
+    cliente_id, cliente_nome = atual.cliente_id, atual.cliente
+    secretaria_nome, tipo_nome = atual.secretaria, atual.tipo_peca
     if payload.cliente:
         if payload.secretaria is None:
             raise HTTPException(
@@ -189,42 +943,104 @@ def update_peca(peca_id: int, payload: PecaUpdate, db: Session = Depends(get_db)
                 detail="Ao alterar o cliente é necessário informar a nova secretaria correspondente.",
             )
         cliente_obj = _get_cliente_by_nome(payload.cliente, db)
-        peca.cliente_id = cliente_obj.id
+        if shards.for_cliente(cliente_obj.id) is not pecas_db:
+            raise HTTPException(
+                status_code=400,
+                detail="O novo cliente fica em outro banco (shard); cadastre a peça novamente nele.",
+            )
+        if cliente_obj.id != atual.cliente_id:
+            # Clients syncing only the old cliente must see the piece leave.
+            pecas_db.add(PecaRemovida(peca_id=peca_id, cliente_id=atual.cliente_id, data_criacao=atual.data_criacao))
+        cliente_id, cliente_nome = cliente_obj.id, cliente_obj.nome
+        values["cliente_id"] = cliente_id
+        campos["cliente"] = cliente_nome
 
     if payload.secretaria:
-        secretaria_obj = _get_secretaria(payload.secretaria, cliente_obj.id, db)
-        peca.secretaria_id = secretaria_obj.id
+        secretaria_obj = _get_secretaria(payload.secretaria, cliente_id, db)
+        secretaria_nome = secretaria_obj.nome
+        values["secretaria_id"] = secretaria_obj.id
+        campos["secretaria"] = secretaria_nome
 
     if payload.tipoPeca:
         tipo_obj = _get_tipo_by_nome(payload.tipoPeca, db)
-        peca.tipo_peca_id = tipo_obj.id
+        tipo_nome = tipo_obj.nome
+        values["tipo_peca_id"] = tipo_obj.id
+        campos["tipoPeca"] = tipo_nome
+
+    for campo, coluna in (
+        ("nomePeca", "nome_peca"),
+        ("dataCriacao", "data_criacao"),
+        ("dataVeiculacao", "data_veiculacao"),
+        ("observacao", "observacao"),
+    ):
+        valor = getattr(payload, campo)
+        if valor is not None:
+            values[coluna] = valor
+            campos[campo] = valor
+    if normalized is not None:
+        forget(peca_id, pecas_db)
+        values["comprovacao_base64"] = normalized.value
+        campos["hasComprovacao"] = True
 
-    if payload.nomePeca is not None:
-        peca.nome_peca = payload.nomePeca
-    if payload.dataCriacao is not None:
-        peca.data_criacao = payload.dataCriacao
-    if payload.dataVeiculacao is not None:
-        peca.data_veiculacao = payload.dataVeiculacao
-    if payload.observacao is not None:
-        peca.observacao = payload.observacao
-    if payload.comprovacao is not None:
-        peca.comprovacao_base64 = payload.comprovacao
+    if values:
+        row = pecas_db.execute(
+            update(Peca)
+            .where(Peca.id == peca_id)
+            .values(**values)
+            .returning(*_WRITE_RETURNING)
+            .execution_options(synchronize_session=False)
+        ).one()
+    else:
+        row = pecas_db.execute(select(*_WRITE_RETURNING).where(Peca.id == peca_id)).one()
 
-    db.add(peca)
-    db.commit()
-    db.refresh(peca)
-    return _serialize_peca(peca, include_comprovacao=True)
+    if normalized is not None and normalized.original:
+        keep_original(peca_id, normalized.original, pecas_db)
+
+    notify_peca_change(db, "atualizada", peca_id, cliente_id, campos, atual.cliente_id)
+    item = _written_peca_out(
+        row,
+        cliente_nome,
+        secretaria_nome,
+        tipo_nome,
+        comprovacao,
+        pecas_db,
+        comprovacao=normalized.value if normalized is not None else None,
+    )
+    shards.commit()
+    if payload.uploadId:
+        upload_store.discard(payload.uploadId)
+    antes = {
+        "cliente": atual.cliente,
+        "secretaria": atual.secretaria,
+        "tipoPeca": atual.tipo_peca,
+        "nomePeca": atual.nome_peca,
+        "dataCriacao": atual.data_criacao,
+        "dataVeiculacao": atual.data_veiculacao,
+        "observacao": atual.observacao,
+    }
+    audit_log.record(user, "peca", peca_id, "atualizacao", diff(antes, campos))
+    return item
 
 
 @router.delete(
     "/{peca_id}",
     status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(require_permission("podeDeletar"))],
 )
-def delete_peca(peca_id: int, db: Session = Depends(get_db)) -> Response:
-    peca = db.get(Peca, peca_id)
+def delete_peca(
+    peca_id: int,
+    db: Session = Depends(get_db),
+    shards: ShardSessions = Depends(get_shard_sessions),
+    user: Usuario = Depends(require_permission("podeDeletar")),
+) -> None:
+    pecas_db = _peca_db(peca_id, shards)
+    peca = pecas_db.get(Peca, peca_id)
     if not peca:
         raise HTTPException(status_code=404, detail="Peça não encontrada.")
-    db.delete(peca)
-    db.commit()
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
+    # Also drops the original kept for a normalized proof, archived or not.
+    forget(peca.id, pecas_db)
+    notify_peca_change(db, "removida", peca.id, peca.cliente_id)
+    pecas_db.add(PecaRemovida(peca_id=peca.id, cliente_id=peca.cliente_id, data_criacao=peca.data_criacao))
+    removida = {"nomePeca": peca.nome_peca, "dataCriacao": peca.data_criacao}
+    pecas_db.delete(peca)
+    shards.commit()
+    audit_log.record(user, "peca", peca_id, "remocao", diff(removida, dict.fromkeys(removida)))
@@ -1,93 +1,255 @@
 """Geração de relatórios de peças."""
 
+import heapq
+import itertools
 from datetime import date
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Query as OrmQuery
+from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_read_db, get_shard_router
+from app.core.profiling import timed
+from app.core.query_guard import capped_count, reject_over_budget, row_budget
+from app.core.report_cache import data_version, report_cache, report_key
 from app.core.security import require_permission
-from app.models import Cliente, Peca, Secretaria, TipoPeca
-from app.schemas import RelatorioInfo, RelatorioLinha, RelatorioResponse, RelatorioStats
+from app.core.stats import DIMENSOES, count_by_period, count_by_windows, merge_results
+from app.models import Cliente, Peca, Secretaria, TipoPeca, Usuario
+from app.schemas import (
+    ComparativoLinha,
+    ComparativoPeriodo,
+    ComparativoResponse,
+    ComparativoVariacao,
+    EstatisticaLinha,
+    EstatisticasResponse,
+    RelatorioInfo,
+    RelatorioLinha,
+    RelatorioResponse,
+    RelatorioStats,
+)
 
 router = APIRouter(prefix="/api/relatorios", tags=["Relatórios"])
 
 
-@router.get(
-    "/pecas",
-    response_model=RelatorioResponse,
-    dependencies=[Depends(require_permission("podeRelatorio"))],
-)
+@router.get("/pecas", response_model=RelatorioResponse)
 def relatorio_pecas(
     cliente: Optional[str] = Query(None),
     secretaria: Optional[str] = Query(None),
     dataInicio: date = Query(..., description="Data inicial obrigatória"),
     dataFim: date = Query(..., description="Data final obrigatória"),
-    db: Session = Depends(get_db),
-) -> RelatorioResponse:
+    user: Usuario = Depends(require_permission("podeRelatorio")),
+    db: Session = Depends(get_read_db),
+) -> Response:
     if dataInicio > dataFim:
         raise HTTPException(status_code=400, detail="A data inicial não pode ser maior que a final.")
 
+    info = RelatorioInfo(cliente=cliente, secretaria=secretaria, dataInicio=dataInicio, dataFim=dataFim)
+    router = get_shard_router()
+    # One (count, max versao) pair per database holding pieces.
+    versao = tuple(itertools.chain.from_iterable(router.scatter(db, lambda s: data_version(s, dataInicio, dataFim))))
+    chave = report_key(cliente, secretaria, dataInicio, dataFim, versao)
+    corpo = report_cache.get(chave)
+    if corpo is not None:
+        return _report_response(info, corpo, "HIT")
+
+    orcamento = row_budget(user, "maxLinhasRelatorio")
+    # The versions count every piece of the period, an upper bound; filtered requests are counted only above it.
+    total = sum(versao[::2])
+    if orcamento is not None and total > orcamento:
+        if cliente or secretaria:
+
+            def contar(session: Session) -> int:
+                query = _report_query(session.query(Peca.id), cliente, secretaria, dataInicio, dataFim)
+                return capped_count(session, query, orcamento)
+
+            total = sum(router.scatter(db, contar))
+        reject_over_budget(total, orcamento, "Reduza o período ou filtre por cliente ou secretaria.")
+
+    def ler(session: Session) -> List[Any]:
+        # Only the grouped columns: the proofs are never loaded.
+        query = session.query(
+            Secretaria.nome.label("secretaria"),
+            TipoPeca.nome.label("tipo_peca"),
+            Peca.nome_peca,
+            Peca.data_criacao,
+            Peca.data_veiculacao,
+            Peca.data_cadastro,
+            Peca.id,
+        )
+        query = _report_query(query, cliente, secretaria, dataInicio, dataFim)
+        return query.order_by(Peca.data_cadastro.asc(), Peca.id.asc()).all()
+
+    pecas = list(heapq.merge(*router.scatter(db, ler), key=lambda peca: (peca.data_cadastro, peca.id)))
+
+    total_pecas = len(pecas)
+    secretarias_unicas = len({peca.secretaria for peca in pecas})
+
+    linhas: List[Dict[str, Any]] = []
+    linhas_index: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+
+    with timed("agrupamento"):
+        for peca in pecas:
+            key = (peca.secretaria, peca.tipo_peca, peca.nome_peca)
+            if key not in linhas_index:
+                entry: Dict[str, Any] = {
+                    "secretaria": peca.secretaria,
+                    "tipoPeca": peca.tipo_peca,
+                    "nomePeca": peca.nome_peca,
+                    "dataCriacao": peca.data_criacao,
+                    "dataVeiculacao": peca.data_veiculacao,
+                    "quantidade": 0,
+                }
+                linhas_index[key] = entry
+                linhas.append(entry)
+
+            entry = linhas_index[key]
+            if peca.data_criacao < entry["dataCriacao"]:
+                entry["dataCriacao"] = peca.data_criacao
+            if entry["dataVeiculacao"] is None and peca.data_veiculacao is not None:
+                entry["dataVeiculacao"] = peca.data_veiculacao
+            entry["quantidade"] = int(entry["quantidade"]) + 1
+
+    relatorio = RelatorioResponse(
+        info=info,
+        stats=RelatorioStats(totalPecas=total_pecas, totalSecretarias=secretarias_unicas),
+        linhas=[RelatorioLinha(**linha) for linha in linhas],
+    )
+
+    # Cached without "info", which echoes the filters exactly as this caller typed them.
+    corpo = relatorio.model_dump_json(exclude={"info"}).encode("utf-8")
+    report_cache.put(chave, corpo)
+    return _report_response(info, corpo, "MISS")
+
+
+def _report_query(
+    query: OrmQuery, cliente: Optional[str], secretaria: Optional[str], dataInicio: date, dataFim: date
+) -> OrmQuery:
     query = (
-        db.query(Peca)
+        query.select_from(Peca)
         .join(Peca.cliente)
         .join(Peca.secretaria)
         .join(Peca.tipo_peca)
-        .options(
-            joinedload(Peca.cliente),
-            joinedload(Peca.secretaria),
-            joinedload(Peca.tipo_peca),
-        )
         .filter(Peca.data_criacao >= dataInicio)
         .filter(Peca.data_criacao <= dataFim)
-        .order_by(Peca.data_cadastro.asc(), Peca.id.asc())
     )
-
     if cliente:
         query = query.filter(func.lower(Cliente.nome) == func.lower(cliente.strip()))
     if secretaria:
         query = query.filter(func.lower(Secretaria.nome) == func.lower(secretaria.strip()))
+    return query
 
-    pecas = query.all()
 
-    total_pecas = len(pecas)
-    secretarias_unicas = len({peca.secretaria.nome for peca in pecas})
+def _report_response(info: RelatorioInfo, corpo: bytes, cache: str) -> Response:
+    conteudo = b'{"info":' + info.model_dump_json().encode("utf-8") + b"," + corpo[1:]
+    return Response(content=conteudo, media_type="application/json", headers={"X-Cache": cache})
 
-    linhas: List[Dict[str, Any]] = []
-    linhas_index: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
 
-    for peca in pecas:
-        key = (peca.secretaria.nome, peca.tipo_peca.nome, peca.nome_peca)
-        if key not in linhas_index:
-            entry: Dict[str, Any] = {
-                "secretaria": peca.secretaria.nome,
-                "tipoPeca": peca.tipo_peca.nome,
-                "nomePeca": peca.nome_peca,
-                "dataCriacao": peca.data_criacao,
-                "dataVeiculacao": peca.data_veiculacao,
-                "quantidade": 0,
-            }
-            linhas_index[key] = entry
-            linhas.append(entry)
-
-        entry = linhas_index[key]
-        if peca.data_criacao < entry["dataCriacao"]:
-            entry["dataCriacao"] = peca.data_criacao
-        if entry["dataVeiculacao"] is None and peca.data_veiculacao is not None:
-            entry["dataVeiculacao"] = peca.data_veiculacao
-        entry["quantidade"] = int(entry["quantidade"]) + 1
+MAX_PERIODOS = 6
 
-    relatorio = RelatorioResponse(
-        info=RelatorioInfo(
-            cliente=cliente,
-            secretaria=secretaria,
-            dataInicio=dataInicio,
-            dataFim=dataFim,
-        ),
-        stats=RelatorioStats(totalPecas=total_pecas, totalSecretarias=secretarias_unicas),
-        linhas=[RelatorioLinha(**linha) for linha in linhas],
+
+def _dimensoes(agrupar: str) -> List[str]:
+    dimensoes = [dimensao.strip() for dimensao in agrupar.split(",") if dimensao.strip()]
+    invalidas = [dimensao for dimensao in dimensoes if dimensao not in DIMENSOES]
+    if invalidas:
+        raise HTTPException(status_code=400, detail=f"Dimensão inválida: {', '.join(invalidas)}.")
+    return dimensoes
+
+
+def _periodo(valor: str) -> Tuple[date, date]:
+    try:
+        inicio, fim = (date.fromisoformat(parte.strip()) for parte in valor.split(":"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Período inválido: '{valor}' (use AAAA-MM-DD:AAAA-MM-DD).")
+    if inicio > fim:
+        raise HTTPException(status_code=400, detail=f"Período '{valor}': a data inicial não pode ser maior que a final.")
+    return inicio, fim
+
+
+def _variacoes(quantidades: List[int]) -> List[ComparativoVariacao]:
+    """Change of the first period against each of the others."""
+    base = quantidades[0]
+    return [
+        ComparativoVariacao(
+            delta=base - outra,
+            percentual=round((base - outra) * 100 / outra, 1) if outra else None,
+        )
+        for outra in quantidades[1:]
+    ]
+
+
+@router.get(
+    "/comparativo",
+    response_model=ComparativoResponse,
+    dependencies=[Depends(require_permission("podeRelatorio"))],
+)
+def comparativo_pecas(
+    periodo: List[str] = Query(
+        ...,
+        description="Períodos AAAA-MM-DD:AAAA-MM-DD; o primeiro é comparado com cada um dos demais",
+    ),
+    agrupar: str = Query("secretaria,tipoPeca", description="Dimensões separadas por vírgula: cliente, secretaria, tipoPeca"),
+    cliente: Optional[str] = Query(None),
+    secretaria: Optional[str] = Query(None),
+    tipoPeca: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
+) -> ComparativoResponse:
+    if not 2 <= len(periodo) <= MAX_PERIODOS:
+        raise HTTPException(status_code=400, detail=f"Informe de 2 a {MAX_PERIODOS} períodos.")
+    janelas = [_periodo(valor) for valor in periodo]
+    dimensoes = _dimensoes(agrupar)
+
+    fonte, linhas = merge_results(
+        get_shard_router().scatter(
+            db, lambda session: count_by_windows(session, janelas, dimensoes, cliente, secretaria, tipoPeca)
+        )
+    )
+    linhas = [linha for linha in linhas if any(linha["quantidades"])]
+    totais = [sum(linha["quantidades"][indice] for linha in linhas) for indice in range(len(janelas))]
+    return ComparativoResponse(
+        dimensoes=dimensoes,
+        fonte=fonte,
+        periodos=[
+            ComparativoPeriodo(dataInicio=inicio, dataFim=fim, total=total)
+            for (inicio, fim), total in zip(janelas, totais)
+        ],
+        variacoes=_variacoes(totais),
+        linhas=[ComparativoLinha(**linha, variacoes=_variacoes(linha["quantidades"])) for linha in linhas],
     )
 
-    return relatorio
+
+@router.get(
+    "/estatisticas",
+    response_model=EstatisticasResponse,
+    dependencies=[Depends(require_permission("podeRelatorio"))],
+)
+def estatisticas_pecas(
+    granularidade: Literal["dia", "semana", "mes"] = Query("mes"),
+    agrupar: str = Query("cliente", description="Dimensões separadas por vírgula: cliente, secretaria, tipoPeca"),
+    cliente: Optional[str] = Query(None),
+    secretaria: Optional[str] = Query(None),
+    tipoPeca: Optional[str] = Query(None),
+    dataInicio: Optional[date] = Query(None),
+    dataFim: Optional[date] = Query(None),
+    db: Session = Depends(get_read_db),
+) -> EstatisticasResponse:
+    if dataInicio and dataFim and dataInicio > dataFim:
+        raise HTTPException(status_code=400, detail="A data inicial não pode ser maior que a final.")
+    dimensoes = _dimensoes(agrupar)
+
+    fonte, linhas = merge_results(
+        get_shard_router().scatter(
+            db,
+            lambda session: count_by_period(
+                session, granularidade, dimensoes, dataInicio, dataFim, cliente, secretaria, tipoPeca
+            ),
+        )
+    )
+    return EstatisticasResponse(
+        granularidade=granularidade,
+        dimensoes=dimensoes,
+        fonte=fonte,
+        total=sum(linha["quantidade"] for linha in linhas),
+        linhas=[EstatisticaLinha(**linha) for linha in linhas],
+    )
@@ -2,13 +2,15 @@
 
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.audit import audit_log, diff
+from app.core.database import get_db, get_read_db
 from app.core.security import get_current_user, require_permission
-from app.models import Cliente, Secretaria
+from app.core.sharding import has_pecas, replicate_catalogue
+from app.models import Cliente, Peca, Secretaria, Usuario
 from app.schemas import SecretariaCreate, SecretariaOut
 
 router = APIRouter(prefix="/api", tags=["Secretarias"])
@@ -35,7 +37,7 @@ def ensure_cliente_exists(cliente_id: int, db: Session) -> None:
     response_model=List[SecretariaOut],
     dependencies=[Depends(get_current_user)],
 )
-def list_secretarias(cliente_id: int, db: Session = Depends(get_db)) -> List[SecretariaOut]:
+def list_secretarias(cliente_id: int, db: Session = Depends(get_read_db)) -> List[SecretariaOut]:
     ensure_cliente_exists(cliente_id, db)
     secretarias = (
         db.query(Secretaria)
@@ -50,9 +52,12 @@ def list_secretarias(cliente_id: int, db: Session = Depends(get_db)) -> List[Sec
     "/secretarias",
     response_model=SecretariaOut,
     status_code=status.HTTP_201_CREATED,
-    dependencies=[Depends(require_permission("podeConfig"))],
 )
-def create_secretaria(payload: SecretariaCreate, db: Session = Depends(get_db)) -> SecretariaOut:
+def create_secretaria(
+    payload: SecretariaCreate,
+    db: Session = Depends(get_db),
+    user: Usuario = Depends(require_permission("podeConfig")),
+) -> SecretariaOut:
     ensure_cliente_exists(payload.clienteId, db)
     secretaria = Secretaria(cliente_id=payload.clienteId, nome=payload.nome)
     db.add(secretaria)
@@ -62,25 +67,37 @@ def create_secretaria(payload: SecretariaCreate, db: Session = Depends(get_db))
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=400, detail="Secretaria já existe para este cliente.")
+    audit_log.record(
+        user, "secretaria", secretaria.id, "criacao", diff({}, {"nome": secretaria.nome, "clienteId": secretaria.cliente_id})
+    )
+    replicate_catalogue()
     return serialize_secretaria(secretaria)
 
 
 @router.delete(
     "/secretarias/{secretaria_id}",
     status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(require_permission("podeConfig"))],
 )
-def delete_secretaria(secretaria_id: int, db: Session = Depends(get_db)) -> Response:
+def delete_secretaria(
+    secretaria_id: int,
+    db: Session = Depends(get_db),
+    user: Usuario = Depends(require_permission("podeConfig")),
+) -> None:
     secretaria = db.get(Secretaria, secretaria_id)
     if not secretaria:
         raise HTTPException(status_code=404, detail="Secretaria não encontrada.")
+    antes = {"nome": secretaria.nome, "clienteId": secretaria.cliente_id}
+    conflito = HTTPException(
+        status_code=409,
+        detail="Não é possível excluir a secretaria pois existem peças vinculadas.",
+    )
+    if has_pecas(db, Peca.secretaria_id, secretaria_id):
+        raise conflito
     db.delete(secretaria)
     try:
         db.commit()
     except IntegrityError:
         db.rollback()
-        raise HTTPException(
-            status_code=409,
-            detail="Não é possível excluir a secretaria pois existem peças vinculadas.",
-        )
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
+        raise conflito
+    audit_log.record(user, "secretaria", secretaria_id, "remocao", diff(antes, dict.fromkeys(antes)))
+    replicate_catalogue()
@@ -2,13 +2,15 @@
 
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.audit import audit_log, diff
+from app.core.database import get_db, get_read_db
 from app.core.security import get_current_user, require_permission
-from app.models import TipoPeca
+from app.core.sharding import has_pecas, replicate_catalogue
+from app.models import Peca, TipoPeca, Usuario
 from app.schemas import TipoPecaCreate, TipoPecaOut
 
 router = APIRouter(prefix="/api/tipos-peca", tags=["Tipos de Peça"])
@@ -24,7 +26,7 @@ def serialize_tipo(tipo: TipoPeca) -> TipoPecaOut:
 
 
 @router.get("", response_model=List[TipoPecaOut], dependencies=[Depends(get_current_user)])
-def list_tipos(db: Session = Depends(get_db)) -> List[TipoPecaOut]:
+def list_tipos(db: Session = Depends(get_read_db)) -> List[TipoPecaOut]:
     tipos = db.query(TipoPeca).order_by(TipoPeca.nome).all()
     return [serialize_tipo(tipo) for tipo in tipos]
 
@@ -33,9 +35,12 @@ def list_tipos(db: Session = Depends(get_db)) -> List[TipoPecaOut]:
     "",
     response_model=TipoPecaOut,
     status_code=status.HTTP_201_CREATED,
-    dependencies=[Depends(require_permission("podeConfig"))],
 )
-def create_tipo(payload: TipoPecaCreate, db: Session = Depends(get_db)) -> TipoPecaOut:
+def create_tipo(
+    payload: TipoPecaCreate,
+    db: Session = Depends(get_db),
+    user: Usuario = Depends(require_permission("podeConfig")),
+) -> TipoPecaOut:
     tipo = TipoPeca(nome=payload.nome)
     db.add(tipo)
     try:
@@ -44,18 +49,30 @@ def create_tipo(payload: TipoPecaCreate, db: Session = Depends(get_db)) -> TipoP
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=400, detail="Tipo de peça já existe.")
+    audit_log.record(user, "tipo_peca", tipo.id, "criacao", diff({}, {"nome": tipo.nome}))
+    replicate_catalogue()
     return serialize_tipo(tipo)
 
 
 @router.delete(
     "/{tipo_id}",
     status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(require_permission("podeConfig"))],
 )
-def delete_tipo(tipo_id: int, db: Session = Depends(get_db)) -> Response:
+def delete_tipo(
+    tipo_id: int,
+    db: Session = Depends(get_db),
+    user: Usuario = Depends(require_permission("podeConfig")),
+) -> None:
     tipo = db.get(TipoPeca, tipo_id)
     if not tipo:
         raise HTTPException(status_code=404, detail="Tipo de peça não encontrado.")
+    antes = {"nome": tipo.nome}
+    if has_pecas(db, Peca.tipo_peca_id, tipo_id):
+        raise HTTPException(
+            status_code=409,
+            detail="Não é possível excluir o tipo de peça pois existem peças vinculadas.",
+        )
     db.delete(tipo)
     db.commit()
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
+    audit_log.record(user, "tipo_peca", tipo_id, "remocao", diff(antes, dict.fromkeys(antes)))
+    replicate_catalogue()
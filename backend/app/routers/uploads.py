@@ -0,0 +1,99 @@
+"""Resumable proof upload routes.
+
+Flow: ``POST /api/uploads`` with the total size, then ``PUT`` each chunk with
+``Content-Range: bytes início-fim/total``; after a dropped connection
+``GET /api/uploads/{id}`` returns the offset to resume from. ``concluir``
+checks the SHA-256 and the file type, and the returned ``id`` is sent as
+``uploadId`` when creating or updating a peça.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import ROLE_PERMISSIONS, get_current_user
+from app.core.uploads import parse_content_range, upload_store
+from app.models import Usuario
+from app.schemas import UploadComplete, UploadCreate, UploadOut
+
+router = APIRouter(prefix="/api/uploads", tags=["Uploads"])
+
+
+def _uploader(user: Usuario = Depends(get_current_user)) -> Usuario:
+    # Uploads only feed peça writes, so either write permission is enough.
+    role_perms = ROLE_PERMISSIONS.get(user.role, {})
+    if not (role_perms.get("podeInserir") or role_perms.get("podeEditar")):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permissão insuficiente.")
+    return user
+
+
+def _chunk_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Cada trecho pode ter no máximo {settings.upload_chunk_max_kb} KB.",
+    )
+
+
+async def _read_chunk(request: Request, limit: int) -> bytes:
+    """The request body, read incrementally and abandoned once it passes ``limit`` bytes.
+
+    A chunked request carries no Content-Length, so the size is only known while reading.
+    """
+    data = bytearray()
+    async for part in request.stream():
+        data += part
+        if len(data) > limit:
+            raise _chunk_too_large()
+    return bytes(data)
+
+
+def _out(response: Response, state: dict) -> UploadOut:
+    response.headers["Upload-Offset"] = str(state["offset"])
+    return UploadOut(**state)
+
+
+@router.post("", response_model=UploadOut, status_code=status.HTTP_201_CREATED)
+def create_upload(payload: UploadCreate, response: Response, user: Usuario = Depends(_uploader)) -> UploadOut:
+    return _out(response, upload_store.create(payload.tamanho, user.username))
+
+
+@router.get("/{upload_id}", response_model=UploadOut)
+def get_upload(upload_id: str, response: Response, user: Usuario = Depends(_uploader)) -> UploadOut:
+    return _out(response, upload_store.status(upload_id, user.username))
+
+
+@router.put("/{upload_id}", response_model=UploadOut)
+async def put_chunk(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    user: Usuario = Depends(_uploader),
+) -> UploadOut:
+    limit = settings.upload_chunk_max_kb * 1024
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > limit:
+        raise _chunk_too_large()
+    state = await run_in_threadpool(upload_store.status, upload_id, user.username)
+    start, length = parse_content_range(request.headers.get("content-range"), state["tamanho"])
+    data = await _read_chunk(request, limit)
+    if len(data) != length:
+        raise HTTPException(status_code=400, detail="O corpo não corresponde ao Content-Range.")
+    state = await run_in_threadpool(upload_store.append, upload_id, user.username, start, data)
+    return _out(response, state)
+
+
+@router.post("/{upload_id}/concluir", response_model=UploadOut)
+def complete_upload(
+    upload_id: str,
+    payload: UploadComplete,
+    response: Response,
+    user: Usuario = Depends(_uploader),
+) -> UploadOut:
+    return _out(response, upload_store.complete(upload_id, user.username, payload.sha256))
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+def cancel_upload(upload_id: str, user: Usuario = Depends(_uploader)) -> Response:
+    upload_store.status(upload_id, user.username)
+    upload_store.discard(upload_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -2,7 +2,7 @@
 
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
@@ -68,7 +68,7 @@ def delete_usuario(
     usuario_id: int,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user),
-) -> Response:
+) -> None:
     if usuario_id == 1:
         raise HTTPException(status_code=400, detail="Não é permitido deletar o administrador padrão.")
     if usuario_id == current_user.id:
@@ -79,4 +79,3 @@ def delete_usuario(
         raise HTTPException(status_code=404, detail="Usuário não encontrado.")
     db.delete(usuario)
     db.commit()
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
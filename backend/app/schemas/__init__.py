@@ -1,10 +1,41 @@
 """Pydantic schemas for API payloads."""
 
+from .auditoria import AuditoriaOut
+from .catalogo import CatalogoCliente, CatalogoResponse, CatalogoSecretaria, CatalogoTipoPeca
 from .clientes import ClienteBase, ClienteCreate, ClienteOut, ClienteUpdate
 from .secretarias import SecretariaBase, SecretariaCreate, SecretariaOut, SecretariaUpdate
 from .tipos_peca import TipoPecaBase, TipoPecaCreate, TipoPecaOut, TipoPecaUpdate
-from .pecas import PecaBase, PecaCreate, PecaOut, PecaUpdate
-from .relatorios import RelatorioInfo, RelatorioLinha, RelatorioResponse, RelatorioStats
+from .pecas import (
+    ComprovacaoMeta,
+    EventosTicket,
+    PecaBase,
+    PecaBatchRequest,
+    PecaBatchResponse,
+    PecaBulkDelete,
+    PecaBulkResponse,
+    PecaBulkResultado,
+    PecaBulkUpdate,
+    PecaCreate,
+    PecaFiltro,
+    PecaOut,
+    PecaPatch,
+    PecaRemovidaOut,
+    PecaSyncResponse,
+    PecaUpdate,
+)
+from .relatorios import (
+    ComparativoLinha,
+    ComparativoPeriodo,
+    ComparativoResponse,
+    ComparativoVariacao,
+    EstatisticaLinha,
+    EstatisticasResponse,
+    RelatorioInfo,
+    RelatorioLinha,
+    RelatorioResponse,
+    RelatorioStats,
+)
+from .uploads import UploadComplete, UploadCreate, UploadOut
 from .usuarios import (
     TokenResponse,
     UsuarioAuthOut,
@@ -32,6 +63,18 @@ __all__ = [
     "PecaCreate",
     "PecaUpdate",
     "PecaOut",
+    "ComprovacaoMeta",
+    "EventosTicket",
+    "PecaBatchRequest",
+    "PecaBatchResponse",
+    "PecaFiltro",
+    "PecaPatch",
+    "PecaBulkUpdate",
+    "PecaBulkDelete",
+    "PecaBulkResultado",
+    "PecaBulkResponse",
+    "PecaRemovidaOut",
+    "PecaSyncResponse",
     "UsuarioBase",
     "UsuarioCreate",
     "UsuarioLogin",
@@ -43,4 +86,18 @@ __all__ = [
     "RelatorioStats",
     "RelatorioLinha",
     "RelatorioResponse",
+    "EstatisticaLinha",
+    "EstatisticasResponse",
+    "ComparativoPeriodo",
+    "ComparativoVariacao",
+    "ComparativoLinha",
+    "ComparativoResponse",
+    "UploadCreate",
+    "UploadComplete",
+    "UploadOut",
+    "CatalogoSecretaria",
+    "CatalogoCliente",
+    "CatalogoTipoPeca",
+    "CatalogoResponse",
+    "AuditoriaOut",
 ]
@@ -0,0 +1,19 @@
+"""Schemas for the audit trail."""
+
+from datetime import datetime
+from typing import Any, Dict, Literal, Optional
+
+from pydantic import BaseModel
+
+EntidadeAuditada = Literal["peca", "cliente", "secretaria", "tipo_peca"]
+
+
+class AuditoriaOut(BaseModel):
+    id: int
+    entidade: EntidadeAuditada
+    entidadeId: int
+    acao: Literal["criacao", "atualizacao", "remocao"]
+    usuarioId: Optional[int] = None
+    usuario: str
+    alteracoes: Optional[Dict[str, Any]] = None
+    registradoEm: datetime
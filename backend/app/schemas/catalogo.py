@@ -0,0 +1,32 @@
+"""Schemas for the reference catalogue loaded when the UI starts."""
+
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+from .usuarios import UsuarioAuthOut
+
+
+class CatalogoSecretaria(BaseModel):
+    id: int
+    nome: str
+
+
+class CatalogoCliente(BaseModel):
+    id: int
+    nome: str
+    secretarias: List[CatalogoSecretaria]
+
+
+class CatalogoTipoPeca(BaseModel):
+    id: int
+    nome: str
+
+
+class CatalogoResponse(BaseModel):
+    versao: str
+    usuario: UsuarioAuthOut
+    permissoes: Dict[str, bool]
+    limites: Dict[str, int]
+    clientes: List[CatalogoCliente]
+    tiposPeca: List[CatalogoTipoPeca]
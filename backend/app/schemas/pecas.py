@@ -1,32 +1,24 @@
 """Schemas for Peca entities."""
 
-import base64
 from datetime import date, datetime
+from typing import Annotated, Dict, List, Literal
 
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
-MAX_COMPROVATION_BYTES = 5 * 1024 * 1024  # 5MB
-
-
-def _validate_comprovacao(value: str) -> str:
-    if not value:
-        raise ValueError("Comprovação é obrigatória.")
+from app.core.images import inspect_proof
 
-    payload = value
-    if value.startswith("data:"):
-        header, _, data_part = value.partition(",")
-        if not header.lower().startswith("data:image/"):
-            raise ValueError("A comprovação deve ser uma imagem (data URL).")
-        payload = data_part
+MAX_COMPROVATION_BYTES = 5 * 1024 * 1024  # 5MB
+MAX_BATCH_IDS = 100
+# Full proofs are up to 5MB each; keep a "completa" response in the tens of MB.
+MAX_BATCH_IDS_COMPLETA = 10
+MAX_BULK_IDS = 1000
 
-    try:
-        decoded = base64.b64decode(payload, validate=True)
-    except (ValueError, base64.binascii.Error) as exc:  # pragma: no cover - depends on user input
-        raise ValueError("Comprovação deve ser um base64 válido.") from exc
+ComprovacaoModo = Literal["nenhuma", "meta", "completa"]
 
-    if len(decoded) > MAX_COMPROVATION_BYTES:
-        raise ValueError("Comprovação deve ter no máximo 5MB.")
 
+def _validate_comprovacao(value: str) -> str:
+    # The validated string is stored as-is; no decoded copy outlives the check.
+    inspect_proof(value, MAX_COMPROVATION_BYTES)
     return value
 
 
@@ -41,11 +33,29 @@ class PecaBase(BaseModel):
     comprovacao: str
 
 
+def _one_proof_source(comprovacao: str | None, upload_id: str | None) -> None:
+    if comprovacao is not None and upload_id is not None:
+        raise ValueError("Informe a comprovação ou o uploadId, não ambos.")
+
+
 class PecaCreate(PecaBase):
-    @validator("comprovacao")
-    def comprovacao_is_valid(cls, value: str) -> str:  # noqa: N805 - Pydantic validator signature
+    comprovacao: str | None = None
+    uploadId: str | None = None
+
+    @field_validator("comprovacao")
+    @classmethod
+    def comprovacao_is_valid(cls, value: str | None) -> str | None:
+        if value is None:
+            return value
         return _validate_comprovacao(value)
 
+    @model_validator(mode="after")
+    def has_proof(self) -> "PecaCreate":
+        if self.comprovacao is None and self.uploadId is None:
+            raise ValueError("Informe a comprovação ou o uploadId de um upload concluído.")
+        _one_proof_source(self.comprovacao, self.uploadId)
+        return self
+
 
 class PecaUpdate(BaseModel):
     cliente: str | None = None
@@ -56,19 +66,114 @@ class PecaUpdate(BaseModel):
     dataVeiculacao: date | None = None
     observacao: str | None = None
     comprovacao: str | None = None
+    uploadId: str | None = None
 
-    @validator("comprovacao")
-    def comprovacao_is_valid(cls, value: str | None) -> str | None:  # noqa: N805 - Pydantic validator signature
+    @field_validator("comprovacao")
+    @classmethod
+    def comprovacao_is_valid(cls, value: str | None) -> str | None:
         if value is None:
             return value
         return _validate_comprovacao(value)
 
+    @model_validator(mode="after")
+    def one_proof_source(self) -> "PecaUpdate":
+        _one_proof_source(self.comprovacao, self.uploadId)
+        return self
+
+
+class ComprovacaoMeta(BaseModel):
+    mimeType: str | None = None
+    tamanhoBytes: int
+    arquivada: bool = False
+
 
 class PecaOut(PecaBase):
     id: int
     dataCadastro: datetime
     comprovacao: str | None = None
     hasComprovacao: bool = True
+    comprovacaoMeta: ComprovacaoMeta | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PecaRemovidaOut(BaseModel):
+    id: int
+    clienteId: int
+
+
+class PecaSyncResponse(BaseModel):
+    itens: List[PecaOut]
+    removidas: List[PecaRemovidaOut]
+    cursor: str
+    temMais: bool
+
+
+class EventosTicket(BaseModel):
+    ticket: str
+    expiraEm: datetime
+
+
+class PecaBatchRequest(BaseModel):
+    ids: Annotated[List[int], Field(min_length=1, max_length=MAX_BATCH_IDS)]
+    comprovacao: ComprovacaoModo = "meta"
+
+
+class PecaBatchResponse(BaseModel):
+    itens: List[PecaOut]
+    naoEncontradas: List[int]
+
+
+class PecaFiltro(BaseModel):
+    cliente: str | None = None
+    secretaria: str | None = None
+    tipoPeca: str | None = None
+    dataInicio: date | None = None
+    dataFim: date | None = None
+
+    @model_validator(mode="after")
+    def has_criteria(self) -> "PecaFiltro":
+        if all(getattr(self, campo) is None for campo in type(self).model_fields):
+            raise ValueError("Informe ao menos um critério no filtro.")
+        return self
+
+
+class PecaPatch(BaseModel):
+    cliente: str | None = None
+    secretaria: str | None = None
+    tipoPeca: str | None = None
+    nomePeca: str | None = None
+    dataCriacao: date | None = None
+    dataVeiculacao: date | None = None
+    observacao: str | None = None
+
+
+class PecaBulkSelecao(BaseModel):
+    ids: Annotated[List[int], Field(max_length=MAX_BULK_IDS)] | None = None
+    filtro: PecaFiltro | None = None
+
+    @model_validator(mode="after")
+    def ids_or_filtro(self) -> "PecaBulkSelecao":
+        if (self.ids is None) == (self.filtro is None):
+            raise ValueError("Informe 'ids' ou 'filtro' (apenas um deles).")
+        return self
+
+
+class PecaBulkUpdate(PecaBulkSelecao):
+    alteracoes: PecaPatch
+
+
+class PecaBulkDelete(PecaBulkSelecao):
+    pass
+
+
+class PecaBulkResultado(BaseModel):
+    id: int
+    status: Literal[
+        "atualizada", "removida", "nao_encontrada", "secretaria_inexistente", "cliente_em_outro_shard"
+    ]
+
 
-    class Config:
-        orm_mode = True
+class PecaBulkResponse(BaseModel):
+    resultados: List[PecaBulkResultado]
+    totais: Dict[str, int]
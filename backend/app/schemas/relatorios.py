@@ -1,9 +1,9 @@
 """Schemas para respostas de relatórios."""
 
 from datetime import date
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class RelatorioInfo(BaseModel):
@@ -32,5 +32,47 @@ class RelatorioResponse(BaseModel):
     stats: RelatorioStats
     linhas: List[RelatorioLinha]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class EstatisticaLinha(BaseModel):
+    periodo: date
+    cliente: Optional[str] = None
+    secretaria: Optional[str] = None
+    tipoPeca: Optional[str] = None
+    quantidade: int
+
+
+class EstatisticasResponse(BaseModel):
+    granularidade: Literal["dia", "semana", "mes"]
+    dimensoes: List[str]
+    fonte: Literal["resumo", "pecas"]
+    total: int
+    linhas: List[EstatisticaLinha]
+
+
+class ComparativoPeriodo(BaseModel):
+    dataInicio: date
+    dataFim: date
+    total: int
+
+
+class ComparativoVariacao(BaseModel):
+    delta: int
+    percentual: Optional[float] = None
+
+
+class ComparativoLinha(BaseModel):
+    cliente: Optional[str] = None
+    secretaria: Optional[str] = None
+    tipoPeca: Optional[str] = None
+    quantidades: List[int]
+    variacoes: List[ComparativoVariacao]
+
+
+class ComparativoResponse(BaseModel):
+    dimensoes: List[str]
+    fonte: Literal["resumo", "pecas"]
+    periodos: List[ComparativoPeriodo]
+    variacoes: List[ComparativoVariacao]
+    linhas: List[ComparativoLinha]
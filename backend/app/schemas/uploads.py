@@ -0,0 +1,25 @@
+"""Schemas for resumable proof uploads."""
+
+from datetime import datetime
+
+from pydantic import BaseModel, conint, constr
+
+from .pecas import MAX_COMPROVATION_BYTES
+
+
+class UploadCreate(BaseModel):
+    tamanho: conint(gt=0, le=MAX_COMPROVATION_BYTES)
+
+
+class UploadComplete(BaseModel):
+    sha256: constr(pattern=r"^[0-9a-fA-F]{64}$")
+
+
+class UploadOut(BaseModel):
+    id: str
+    tamanho: int
+    offset: int
+    concluido: bool
+    mimeType: str | None = None
+    sha256: str | None = None
+    expiraEm: datetime
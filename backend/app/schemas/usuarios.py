@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Literal
 
-from pydantic import BaseModel, constr
+from pydantic import BaseModel, ConfigDict, constr
 
 RoleLiteral = Literal["master", "social_media", "financeiro"]
 
@@ -31,8 +31,7 @@ class UsuarioOut(UsuarioBase):
     createdAt: datetime
     updatedAt: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UsuarioAuthOut(BaseModel):
@@ -41,8 +40,7 @@ class UsuarioAuthOut(BaseModel):
     nome: str
     role: RoleLiteral
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UsuarioLogin(BaseModel):
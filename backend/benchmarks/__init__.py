@@ -0,0 +1,7 @@
+"""Synthetic data generation and load-testing tools for the backend.
+
+Run from the ``backend`` directory, for example::
+
+    python -m benchmarks.seed --pecas 200000
+    python -m benchmarks.loadtest --base-url http://localhost:8000 --out results.json
+"""
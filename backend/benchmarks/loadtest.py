@@ -0,0 +1,296 @@
+"""Drive the main API flows at a fixed concurrency and record latency, throughput and RSS.
+
+Start the server with ``RATE_LIMIT_ENABLED=false`` so the limiter does not skew results.
+"""
+
+import argparse
+import base64
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+FLOWS = ("login", "list", "detail", "create", "report")
+
+PROOF = "data:image/png;base64," + base64.b64encode(b"\x89PNG\r\n\x1a\n" + os.urandom(32 * 1024)).decode("ascii")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--usuario", default="bench")
+    parser.add_argument("--senha", default="bench")
+    parser.add_argument("--flows", default=",".join(FLOWS), help=f"Comma separated subset of {FLOWS}.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per flow.")
+    parser.add_argument("--server-pid", type=int, help="Sample RSS of this process and its children.")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="Previous results file to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression.")
+    return parser.parse_args()
+
+
+class Client:
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.token: Optional[str] = None
+
+    def request(self, method: str, path: str, body: Any = None, params: Optional[Dict[str, Any]] = None) -> Any:
+        url = self.base_url + path
+        if params:
+            url += "?" + urllib.parse.urlencode({key: value for key, value in params.items() if value is not None})
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(url, data=data, method=method)
+        if data is not None:
+            request.add_header("Content-Type", "application/json")
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        with urllib.request.urlopen(request, timeout=60) as response:
+            payload = response.read()
+        return json.loads(payload) if payload else None
+
+    def login(self, usuario: str, senha: str) -> Dict[str, Any]:
+        data = self.request("POST", "/auth/login", {"username": usuario, "password": senha})
+        self.token = data["access_token"]
+        return data
+
+
+class Context:
+    """Reference data discovered once and shared by every flow."""
+
+    def __init__(self, client: Client, usuario: str, senha: str) -> None:
+        self.usuario = usuario
+        self.senha = senha
+        self.token = client.token
+        self.clientes = [cliente["nome"] for cliente in client.request("GET", "/api/clientes")]
+        sample = client.request("GET", "/api/pecas", params={"page": 1, "pageSize": 200})
+        if not sample:
+            raise SystemExit("Nenhuma peça encontrada; rode `python -m benchmarks.seed` antes.")
+        self.pecas = sample
+        self.peca_ids = [peca["id"] for peca in sample]
+
+
+def _flow_login(client: Client, ctx: Context, rng: random.Random) -> None:
+    Client(client.base_url).login(ctx.usuario, ctx.senha)
+
+
+def _flow_list(client: Client, ctx: Context, rng: random.Random) -> None:
+    fim = date.today() - timedelta(days=rng.randrange(365))
+    client.request(
+        "GET",
+        "/api/pecas",
+        params={
+            "cliente": rng.choice(ctx.clientes),
+            "dataInicio": (fim - timedelta(days=30)).isoformat(),
+            "dataFim": fim.isoformat(),
+            "page": 1,
+            "pageSize": 50,
+        },
+    )
+
+
+def _flow_detail(client: Client, ctx: Context, rng: random.Random) -> None:
+    client.request("GET", f"/api/pecas/{rng.choice(ctx.peca_ids)}")
+
+
+def _flow_create(client: Client, ctx: Context, rng: random.Random) -> None:
+    base = rng.choice(ctx.pecas)
+    client.request(
+        "POST",
+        "/api/pecas",
+        {
+            "cliente": base["cliente"],
+            "secretaria": base["secretaria"],
+            "tipoPeca": base["tipoPeca"],
+            "nomePeca": "bench-create",
+            "dataCriacao": date.today().isoformat(),
+            "observacao": "",
+            "comprovacao": PROOF,
+        },
+    )
+
+
+def _flow_report(client: Client, ctx: Context, rng: random.Random) -> None:
+    fim = date.today() - timedelta(days=rng.randrange(365))
+    client.request(
+        "GET",
+        "/api/relatorios/pecas",
+        params={
+            "cliente": rng.choice(ctx.clientes),
+            "dataInicio": (fim - timedelta(days=30)).isoformat(),
+            "dataFim": fim.isoformat(),
+        },
+    )
+
+
+FLOW_FUNCTIONS: Dict[str, Callable[[Client, Context, random.Random], None]] = {
+    "login": _flow_login,
+    "list": _flow_list,
+    "detail": _flow_detail,
+    "create": _flow_create,
+    "report": _flow_report,
+}
+
+
+class RssSampler(threading.Thread):
+    """Track the peak resident set of a process tree via /proc (Linux only)."""
+
+    def __init__(self, pid: int, interval: float = 0.2) -> None:
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak_bytes = 0
+        self._halt = threading.Event()
+
+    def _tree(self) -> List[int]:
+        pids = [self.pid]
+        try:
+            with open(f"/proc/{self.pid}/task/{self.pid}/children") as handle:
+                pids.extend(int(child) for child in handle.read().split())
+        except OSError:
+            pass
+        return pids
+
+    @staticmethod
+    def _rss(pid: int) -> int:
+        try:
+            with open(f"/proc/{pid}/status") as handle:
+                for line in handle:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        return 0
+
+    def run(self) -> None:
+        while not self._halt.is_set():
+            self.peak_bytes = max(self.peak_bytes, sum(self._rss(pid) for pid in self._tree()))
+            self._halt.wait(self.interval)
+
+    def stop(self) -> int:
+        self._halt.set()
+        self.join()
+        return self.peak_bytes
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_flow(name: str, args: argparse.Namespace, ctx: Context) -> Dict[str, Any]:
+    flow = FLOW_FUNCTIONS[name]
+    deadline = time.perf_counter() + args.duration
+    latencies: List[List[float]] = [[] for _ in range(args.concurrency)]
+    errors = [0] * args.concurrency
+
+    def worker(index: int) -> None:
+        client = Client(args.base_url)
+        client.token = ctx.token
+        rng = random.Random(index)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                flow(client, ctx, rng)
+            except (urllib.error.URLError, OSError, ValueError):
+                errors[index] += 1
+                continue
+            latencies[index].append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(worker, range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    samples = [value for chunk in latencies for value in chunk]
+    return {
+        "requests": len(samples),
+        "errors": sum(errors),
+        "throughputRps": round(len(samples) / elapsed, 2),
+        "p50Ms": round(percentile(samples, 50), 2),
+        "p95Ms": round(percentile(samples, 95), 2),
+        "p99Ms": round(percentile(samples, 99), 2),
+        "meanMs": round(statistics.fmean(samples), 2) if samples else 0.0,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return human readable regressions of p95 latency or throughput beyond ``tolerance``."""
+    regressions = []
+    for name, current in results["flows"].items():
+        previous = baseline.get("flows", {}).get(name)
+        if not previous:
+            continue
+        if previous["p95Ms"] and current["p95Ms"] > previous["p95Ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95Ms']}ms -> {current['p95Ms']}ms")
+        if previous["throughputRps"] and current["throughputRps"] < previous["throughputRps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {previous['throughputRps']} -> {current['throughputRps']} req/s"
+            )
+    previous_rss = baseline.get("peakRssBytes")
+    if previous_rss and results.get("peakRssBytes", 0) > previous_rss * (1 + tolerance):
+        regressions.append(f"peak RSS {previous_rss} -> {results['peakRssBytes']} bytes")
+    return regressions
+
+
+def main() -> None:
+    args = parse_args()
+    names = [name.strip() for name in args.flows.split(",") if name.strip()]
+    unknown = set(names) - set(FLOWS)
+    if unknown:
+        raise SystemExit(f"Fluxos desconhecidos: {', '.join(sorted(unknown))}")
+
+    client = Client(args.base_url)
+    client.login(args.usuario, args.senha)
+    ctx = Context(client, args.usuario, args.senha)
+
+    sampler = RssSampler(args.server_pid) if args.server_pid else None
+    if sampler:
+        sampler.start()
+
+    flows = {}
+    for name in names:
+        print(f"-> {name} ({args.concurrency} conexões, {args.duration:.0f}s)", flush=True)
+        flows[name] = run_flow(name, args, ctx)
+        print(f"   {json.dumps(flows[name])}")
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": platform.node(),
+        "cpuCount": os.cpu_count(),
+        "concurrency": args.concurrency,
+        "durationPerFlow": args.duration,
+        "flows": flows,
+        "peakRssBytes": sampler.stop() if sampler else None,
+    }
+    with open(args.out, "w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2)
+    print(f"Resultados gravados em {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Regressões em relação ao baseline:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("Sem regressões em relação ao baseline.")
+
+
+if __name__ == "__main__":
+    main()
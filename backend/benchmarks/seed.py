@@ -0,0 +1,153 @@
+"""Seed a database with a realistic distribution of clientes, secretarias, tipos and peças."""
+
+import argparse
+import base64
+import random
+import time
+from datetime import date, timedelta
+from typing import List
+
+from sqlalchemy import insert, select, text
+
+from app.core.database import SessionLocal
+from app.core.security import hash_password
+from app.models import Cliente, Peca, Secretaria, TipoPeca, Usuario
+
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+SECRETARIAS = [
+    "Saúde",
+    "Educação",
+    "Governo",
+    "Infraestrutura",
+    "Cultura",
+    "Turismo",
+    "Assistência Social",
+    "Meio Ambiente",
+    "Esporte",
+    "Finanças",
+    "Segurança",
+    "Transportes",
+]
+
+TIPOS = ["Post", "Story", "Reels", "Vídeo", "Banner", "Outdoor", "Nota", "Spot de rádio", "Card", "Panfleto"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clientes", type=int, default=20)
+    parser.add_argument("--secretarias-por-cliente", type=int, default=8)
+    parser.add_argument("--tipos", type=int, default=len(TIPOS))
+    parser.add_argument("--pecas", type=int, default=200_000)
+    parser.add_argument("--anos", type=int, default=3, help="Spread data_criacao over this many years.")
+    parser.add_argument("--proof-kb-median", type=float, default=24.0)
+    parser.add_argument("--proof-kb-max", type=float, default=5 * 1024.0)
+    parser.add_argument("--proof-pool", type=int, default=64, help="Distinct proof payloads to reuse.")
+    parser.add_argument("--batch", type=int, default=2000)
+    parser.add_argument("--usuario", default="bench")
+    parser.add_argument("--senha", default="bench")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="TRUNCATE pecas, secretarias, clientes and tipos_peca before seeding.",
+    )
+    return parser.parse_args()
+
+
+def build_proof_pool(rng: random.Random, size: int, median_kb: float, max_kb: float) -> List[str]:
+    """Return data URLs whose sizes follow a log-normal distribution (few huge, many small)."""
+    pool = []
+    for _ in range(size):
+        kb = min(max_kb, max(1.0, rng.lognormvariate(0, 1.0) * median_kb))
+        raw = PNG_MAGIC + rng.randbytes(int(kb * 1024) - len(PNG_MAGIC))
+        pool.append("data:image/png;base64," + base64.b64encode(raw).decode("ascii"))
+    return pool
+
+
+def zipf_weights(count: int, exponent: float = 1.1) -> List[float]:
+    """A handful of large clients own most of the pieces."""
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def main() -> None:
+    args = parse_args()
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        if args.reset:
+            db.execute(text("TRUNCATE pecas, secretarias, clientes, tipos_peca RESTART IDENTITY CASCADE"))
+            db.commit()
+
+        if not db.execute(select(Usuario.id).where(Usuario.username == args.usuario)).first():
+            db.add(
+                Usuario(
+                    username=args.usuario,
+                    nome="Usuário de benchmark",
+                    password_hash=hash_password(args.senha),
+                    role="master",
+                    is_active=True,
+                )
+            )
+
+        clientes = [Cliente(nome=f"Bench Cliente {index:03d}") for index in range(1, args.clientes + 1)]
+        tipos = [
+            TipoPeca(nome=TIPOS[index] if index < len(TIPOS) else f"Tipo {index + 1}")
+            for index in range(args.tipos)
+        ]
+        db.add_all(clientes + tipos)
+        db.flush()
+
+        secretarias_por_cliente = {}
+        for cliente in clientes:
+            nomes = rng.sample(SECRETARIAS, min(args.secretarias_por_cliente, len(SECRETARIAS)))
+            secretarias = [Secretaria(cliente_id=cliente.id, nome=nome) for nome in nomes]
+            db.add_all(secretarias)
+            secretarias_por_cliente[cliente.id] = secretarias
+        db.flush()
+        db.commit()
+
+        secretaria_ids = {
+            cliente_id: [secretaria.id for secretaria in secretarias]
+            for cliente_id, secretarias in secretarias_por_cliente.items()
+        }
+        cliente_ids = [cliente.id for cliente in clientes]
+        cliente_weights = zipf_weights(len(cliente_ids))
+        tipo_ids = [tipo.id for tipo in tipos]
+        proofs = build_proof_pool(rng, args.proof_pool, args.proof_kb_median, args.proof_kb_max)
+        inicio = date.today() - timedelta(days=365 * args.anos)
+        dias = 365 * args.anos
+
+        inserted = 0
+        while inserted < args.pecas:
+            rows = []
+            for _ in range(min(args.batch, args.pecas - inserted)):
+                cliente_id = rng.choices(cliente_ids, weights=cliente_weights)[0]
+                criacao = inicio + timedelta(days=rng.randrange(dias))
+                veiculacao = criacao + timedelta(days=rng.randrange(15)) if rng.random() < 0.8 else None
+                rows.append(
+                    {
+                        "cliente_id": cliente_id,
+                        "secretaria_id": rng.choice(secretaria_ids[cliente_id]),
+                        "tipo_peca_id": rng.choice(tipo_ids),
+                        "nome_peca": f"Campanha {rng.randrange(1, 400)}",
+                        "data_criacao": criacao,
+                        "data_veiculacao": veiculacao,
+                        "observacao": "" if rng.random() < 0.7 else "Observação gerada pelo benchmark.",
+                        "comprovacao_base64": rng.choice(proofs),
+                    }
+                )
+            db.execute(insert(Peca), rows)
+            db.commit()
+            inserted += len(rows)
+            print(f"\r{inserted}/{args.pecas} peças", end="", flush=True)
+        print()
+    finally:
+        db.close()
+
+    print(f"Seed concluído em {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Measure cold-start cost: ``python -X importtime`` totals and time to first request.
+
+Run from ``backend/``::
+
+    python -m benchmarks.startup --top 15
+    python -m benchmarks.startup --budget 1.0 --out startup.json
+
+The first request is ``GET /health``; it does not need the database.
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, List, Tuple
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main", help="Module imported for the import-time profile.")
+    parser.add_argument("--app", default="app.main:app", help="ASGI app started for time-to-first-request.")
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level packages to list.")
+    parser.add_argument("--runs", type=int, default=3, help="Server starts to measure; the worst one is checked against the budget.")
+    parser.add_argument("--budget", type=float, default=1.0, help="Cold start budget in seconds.")
+    parser.add_argument("--out", help="Write the results as JSON to this file.")
+    return parser.parse_args()
+
+
+def import_profile(module: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """Return total import seconds and cumulative seconds per top-level package."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    packages: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        total_us += int(self_us)
+        if len(name) - len(name.lstrip()) == 1:
+            # Unindented entries carry the cumulative cost of their whole subtree.
+            top = name.strip().split(".")[0]
+            packages[top] = packages.get(top, 0) + int(cumulative_us)
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    return total_us / 1e6, [(name, us / 1e6) for name, us in ranked]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_request(app: str, timeout: float = 30.0) -> float:
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited with code {server.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise TimeoutError(f"No response from {app} within {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main() -> int:
+    args = parse_args()
+    import_seconds, packages = import_profile(args.module)
+    first_request = [time_to_first_request(args.app) for _ in range(args.runs)]
+    results: Dict[str, Any] = {
+        "import_seconds": round(import_seconds, 4),
+        "slowest_packages": [{"package": name, "seconds": round(seconds, 4)} for name, seconds in packages[: args.top]],
+        "first_request_seconds": [round(value, 4) for value in first_request],
+        "budget_seconds": args.budget,
+    }
+
+    print(f"Import of {args.module}: {import_seconds * 1000:.0f} ms")
+    for name, seconds in packages[: args.top]:
+        print(f"  {name:<24} {seconds * 1000:>8.1f} ms")
+    best, worst = min(first_request), max(first_request)
+    print(f"Time to first request ({args.runs} runs): best {best * 1000:.0f} ms, worst {worst * 1000:.0f} ms")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+    if worst > args.budget:
+        print(f"Over budget: {worst:.2f}s > {args.budget:.2f}s")
+        return 1
+    print(f"Within budget ({args.budget:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
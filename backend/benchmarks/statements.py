@@ -0,0 +1,106 @@
+"""Per-call CPU of the hot lookups: ORM ``Query`` rebuilt per call vs cached statements.
+
+Needs a seeded database (``python -m benchmarks.seed``). Run from ``backend/``::
+
+    python -m benchmarks.statements --iterations 2000
+
+CPU is measured with ``time.process_time`` in this process only, so database
+time is excluded and the difference is what the ORM layer saves per request.
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, defer, joinedload
+
+from app.core.database import SessionLocal
+from app.core.security import _USER_BY_USERNAME
+from app.models import Cliente, Peca, Usuario
+from app.routers.pecas import _CLIENTE_POR_NOME, _list_statement
+
+PAGE_SIZE = 50
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=1000, help="Calls per variant.")
+    parser.add_argument("--out", help="Write the results as JSON to this file.")
+    return parser.parse_args()
+
+
+def cpu_per_call(fn: Callable[[], Any], iterations: int) -> float:
+    fn()  # warm the compiled cache and the connection
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - started) / iterations
+
+
+def legacy_list(db: Session, cliente: str) -> List[Peca]:
+    return (
+        db.query(Peca)
+        .join(Peca.cliente)
+        .join(Peca.secretaria)
+        .join(Peca.tipo_peca)
+        .options(
+            defer(Peca.comprovacao_base64),
+            joinedload(Peca.cliente),
+            joinedload(Peca.secretaria),
+            joinedload(Peca.tipo_peca),
+        )
+        .filter(func.lower(Cliente.nome) == func.lower(cliente))
+        .limit(PAGE_SIZE)
+        .offset(0)
+        .order_by(Peca.data_criacao.desc(), Peca.id.desc())
+        .all()
+    )
+
+
+def main() -> int:
+    args = parse_args()
+    with SessionLocal() as db:
+        username = db.execute(select(Usuario.username).limit(1)).scalar()
+        cliente = db.execute(select(Cliente.nome).limit(1)).scalar()
+        if username is None or cliente is None:
+            print("Database has no usuarios or clientes; run benchmarks.seed first.")
+            return 1
+
+        variants = {
+            "usuario": (
+                lambda: db.query(Usuario).filter(Usuario.username == username).first(),
+                lambda: db.execute(_USER_BY_USERNAME, {"username": username}).scalars().first(),
+            ),
+            # The secretaria and tipo lookups have the same shape as this one.
+            "cliente": (
+                lambda: db.query(Cliente).filter(func.lower(Cliente.nome) == func.lower(cliente)).first(),
+                lambda: db.execute(_CLIENTE_POR_NOME, {"nome": cliente}).scalars().first(),
+            ),
+            "listagem": (
+                lambda: legacy_list(db, cliente),
+                lambda: db.execute(
+                    _list_statement(cliente, None, None, None, None, PAGE_SIZE, 0)
+                ).scalars().all(),
+            ),
+        }
+
+        results: Dict[str, Dict[str, float]] = {}
+        print(f"{'consulta':<10} {'Query (us)':>12} {'cache (us)':>12} {'economia':>9}")
+        for name, (legacy, cached) in variants.items():
+            antes = cpu_per_call(legacy, args.iterations) * 1e6
+            depois = cpu_per_call(cached, args.iterations) * 1e6
+            economia = (antes - depois) / antes if antes else 0.0
+            results[name] = {"query_us": round(antes, 1), "cached_us": round(depois, 1), "saving": round(economia, 3)}
+            print(f"{name:<10} {antes:>12.1f} {depois:>12.1f} {economia:>8.0%}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""Gunicorn settings for the production profile (uvicorn workers)."""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('APP_PORT', '8000')}"
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", "0")) or multiprocessing.cpu_count() * 2 + 1
+
+# Import the app (settings, models, routers) once in the master and fork it.
+preload_app = True
+
+# SIGTERM stops accepting connections and lets in-flight requests finish.
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = 5
+
+# Recycle workers periodically to bound memory growth from large proofs.
+max_requests = int(os.getenv("MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "200"))
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    """Drop pooled connections inherited from the master; each worker opens its own."""
+    from app.core.database import dispose_engines
+
+    dispose_engines()
@@ -0,0 +1,72 @@
+-- Converte `pecas` em tabela particionada por intervalo mensal de `data_criacao`.
+--
+-- Execute em janela de manutenção (a cópia bloqueia escritas em `pecas`):
+--   psql "$DATABASE_URL" -f sql/001_pecas_particionamento.sql
+-- Depois verifique a poda de partições com:
+--   python -m app.core.partitions verificar --inicio 2025-01-01 --fim 2025-01-31
+
+BEGIN;
+
+LOCK TABLE pecas IN ACCESS EXCLUSIVE MODE;
+
+ALTER TABLE pecas RENAME TO pecas_legado;
+ALTER INDEX IF EXISTS pecas_pkey RENAME TO pecas_legado_pkey;
+ALTER INDEX IF EXISTS ix_pecas_id RENAME TO ix_pecas_legado_id;
+
+-- A chave primária precisa incluir a chave de particionamento.
+CREATE TABLE pecas (
+    id INTEGER NOT NULL DEFAULT nextval('pecas_id_seq'),
+    cliente_id INTEGER NOT NULL REFERENCES clientes (id) ON DELETE RESTRICT,
+    secretaria_id INTEGER NOT NULL REFERENCES secretarias (id) ON DELETE RESTRICT,
+    tipo_peca_id INTEGER NOT NULL REFERENCES tipos_peca (id) ON DELETE RESTRICT,
+    nome_peca VARCHAR(255) NOT NULL,
+    data_criacao DATE NOT NULL,
+    data_veiculacao DATE,
+    observacao TEXT,
+    comprovacao_base64 TEXT NOT NULL,
+    data_cadastro TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, data_criacao)
+) PARTITION BY RANGE (data_criacao);
+
+CREATE INDEX ix_pecas_id ON pecas (id);
+CREATE INDEX ix_pecas_cliente_data ON pecas (cliente_id, data_criacao);
+CREATE INDEX ix_pecas_secretaria_data ON pecas (secretaria_id, data_criacao);
+
+-- Datas fora das partições mensais (muito antigas ou futuras) caem aqui.
+CREATE TABLE pecas_padrao PARTITION OF pecas DEFAULT;
+
+DO $$
+DECLARE
+    inicio DATE := date_trunc('month', COALESCE((SELECT min(data_criacao) FROM pecas_legado), current_date));
+    limite DATE := date_trunc('month', current_date) + INTERVAL '3 months';
+BEGIN
+    WHILE inicio <= limite LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF pecas FOR VALUES FROM (%L) TO (%L)',
+            'pecas_p' || to_char(inicio, 'YYYY_MM'),
+            inicio,
+            (inicio + INTERVAL '1 month')::date
+        );
+        inicio := (inicio + INTERVAL '1 month')::date;
+    END LOOP;
+END $$;
+
+INSERT INTO pecas (
+    id, cliente_id, secretaria_id, tipo_peca_id, nome_peca, data_criacao, data_veiculacao,
+    observacao, comprovacao_base64, data_cadastro, updated_at
+)
+SELECT
+    id, cliente_id, secretaria_id, tipo_peca_id, nome_peca, data_criacao, data_veiculacao,
+    observacao, comprovacao_base64, data_cadastro, updated_at
+FROM pecas_legado;
+
+ALTER SEQUENCE pecas_id_seq OWNED BY pecas.id;
+ALTER TABLE pecas_legado ALTER COLUMN id DROP DEFAULT;
+
+COMMIT;
+
+ANALYZE pecas;
+
+-- Após validar a aplicação contra a nova tabela:
+-- DROP TABLE pecas_legado;
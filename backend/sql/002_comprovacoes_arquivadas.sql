@@ -0,0 +1,11 @@
+-- Índice das comprovações movidas para o arquivo frio (ver app/core/archive.py).
+
+CREATE TABLE IF NOT EXISTS comprovacoes_arquivadas (
+    peca_id INTEGER PRIMARY KEY,
+    segmento VARCHAR(64) NOT NULL,
+    posicao BIGINT NOT NULL,
+    tamanho INTEGER NOT NULL,
+    tamanho_original INTEGER NOT NULL,
+    codec VARCHAR(16) NOT NULL,
+    arquivada_em TIMESTAMPTZ NOT NULL DEFAULT now()
+);
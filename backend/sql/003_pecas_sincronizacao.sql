@@ -0,0 +1,21 @@
+-- Cursor de alterações para sincronização incremental (GET /api/pecas/sync).
+-- Requer PostgreSQL 13+ (pg_current_xact_id). A coluna nova reescreve `pecas`.
+
+BEGIN;
+
+ALTER TABLE pecas
+    ADD COLUMN IF NOT EXISTS versao BIGINT NOT NULL DEFAULT (pg_current_xact_id()::text::bigint);
+CREATE INDEX IF NOT EXISTS ix_pecas_versao ON pecas (versao, id);
+
+CREATE TABLE IF NOT EXISTS pecas_removidas (
+    id SERIAL PRIMARY KEY,
+    peca_id INTEGER NOT NULL,
+    cliente_id INTEGER NOT NULL,
+    data_criacao DATE NOT NULL,
+    versao BIGINT NOT NULL DEFAULT (pg_current_xact_id()::text::bigint),
+    removida_em TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS ix_pecas_removidas_peca_id ON pecas_removidas (peca_id);
+CREATE INDEX IF NOT EXISTS ix_pecas_removidas_versao ON pecas_removidas (versao, peca_id);
+
+COMMIT;
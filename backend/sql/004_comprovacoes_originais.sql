@@ -0,0 +1,12 @@
+-- Uploads originais guardados quando a comprovação é normalizada na entrada
+-- (IMAGE_KEEP_ORIGINAL=true, ver app/core/normalization.py).
+
+CREATE TABLE IF NOT EXISTS comprovacoes_originais (
+    peca_id INTEGER PRIMARY KEY,
+    segmento VARCHAR(64) NOT NULL,
+    posicao BIGINT NOT NULL,
+    tamanho INTEGER NOT NULL,
+    tamanho_original INTEGER NOT NULL,
+    codec VARCHAR(16) NOT NULL,
+    guardada_em TIMESTAMPTZ NOT NULL DEFAULT now()
+);
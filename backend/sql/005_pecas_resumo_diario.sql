@@ -0,0 +1,58 @@
+-- Resumo diário de peças (GET /api/relatorios/estatisticas), mantido por trigger.
+-- Para refazer do zero: python -m app.core.stats reconstruir
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS pecas_resumo_diario (
+    dia DATE NOT NULL,
+    cliente_id INTEGER NOT NULL,
+    secretaria_id INTEGER NOT NULL,
+    tipo_peca_id INTEGER NOT NULL,
+    quantidade INTEGER NOT NULL,
+    PRIMARY KEY (dia, cliente_id, secretaria_id, tipo_peca_id)
+);
+CREATE INDEX IF NOT EXISTS ix_pecas_resumo_diario_cliente ON pecas_resumo_diario (cliente_id, dia);
+
+CREATE OR REPLACE FUNCTION pecas_resumo_diario_ajustar() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE pecas_resumo_diario
+        SET quantidade = quantidade - 1
+        WHERE dia = OLD.data_criacao
+          AND cliente_id = OLD.cliente_id
+          AND secretaria_id = OLD.secretaria_id
+          AND tipo_peca_id = OLD.tipo_peca_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO pecas_resumo_diario (dia, cliente_id, secretaria_id, tipo_peca_id, quantidade)
+        VALUES (NEW.data_criacao, NEW.cliente_id, NEW.secretaria_id, NEW.tipo_peca_id, 1)
+        ON CONFLICT (dia, cliente_id, secretaria_id, tipo_peca_id)
+        DO UPDATE SET quantidade = pecas_resumo_diario.quantidade + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Bloqueia escritas enquanto o resumo é preenchido e o trigger criado.
+LOCK TABLE pecas IN SHARE MODE;
+
+TRUNCATE pecas_resumo_diario;
+INSERT INTO pecas_resumo_diario (dia, cliente_id, secretaria_id, tipo_peca_id, quantidade)
+SELECT data_criacao, cliente_id, secretaria_id, tipo_peca_id, count(*)
+FROM pecas
+GROUP BY data_criacao, cliente_id, secretaria_id, tipo_peca_id;
+
+DROP TRIGGER IF EXISTS pecas_resumo_diario_insert_delete ON pecas;
+CREATE TRIGGER pecas_resumo_diario_insert_delete
+    AFTER INSERT OR DELETE ON pecas
+    FOR EACH ROW EXECUTE FUNCTION pecas_resumo_diario_ajustar();
+
+DROP TRIGGER IF EXISTS pecas_resumo_diario_update ON pecas;
+CREATE TRIGGER pecas_resumo_diario_update
+    AFTER UPDATE OF data_criacao, cliente_id, secretaria_id, tipo_peca_id ON pecas
+    FOR EACH ROW
+    WHEN ((OLD.data_criacao, OLD.cliente_id, OLD.secretaria_id, OLD.tipo_peca_id)
+          IS DISTINCT FROM (NEW.data_criacao, NEW.cliente_id, NEW.secretaria_id, NEW.tipo_peca_id))
+    EXECUTE FUNCTION pecas_resumo_diario_ajustar();
+
+COMMIT;
@@ -0,0 +1,4 @@
+-- Versão dos dados por período para o cache de relatórios (app/core/report_cache.py):
+-- count(*) e max(versao) num intervalo de data_criacao com index-only scan.
+
+CREATE INDEX IF NOT EXISTS ix_pecas_data_versao ON pecas (data_criacao, versao);
@@ -0,0 +1,16 @@
+-- Trilha de auditoria de peças e do catálogo (clientes, secretarias, tipos).
+-- Gravada em lotes por app/core/audit.py; nunca contém a imagem da comprovação.
+
+CREATE TABLE IF NOT EXISTS auditoria (
+    id BIGSERIAL PRIMARY KEY,
+    entidade VARCHAR(32) NOT NULL,
+    entidade_id INTEGER NOT NULL,
+    acao VARCHAR(16) NOT NULL,
+    usuario_id INTEGER,
+    usuario VARCHAR(150) NOT NULL,
+    alteracoes JSONB,
+    registrado_em TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_auditoria_entidade ON auditoria (entidade, entidade_id, registrado_em);
+CREATE INDEX IF NOT EXISTS ix_auditoria_registrado_em ON auditoria (registrado_em);
@@ -0,0 +1,8 @@
+-- Medição de inchaço para o monitor de manutenção (app/core/maintenance.py):
+-- espaço livre de tabelas/TOAST (pgstattuple_approx) e densidade de índices (pgstatindex).
+-- Opcional; sem a extensão o monitor usa só as estatísticas de tuplas mortas.
+
+CREATE EXTENSION IF NOT EXISTS pgstattuple;
+
+-- Quando o usuário da aplicação não for superusuário, conceda a leitura das estatísticas:
+-- GRANT pg_stat_scan_tables TO <usuario_da_aplicacao>;
@@ -0,0 +1,12 @@
+-- Última execução do monitor de manutenção (app/core/maintenance.py) por banco,
+-- gravada no banco principal. Os workers só iniciam a execução agendada de um banco
+-- depois de reservá-la aqui, então ela acontece uma vez por intervalo, e todos
+-- servem o mesmo relatório.
+
+CREATE TABLE IF NOT EXISTS manutencao_execucoes (
+    banco VARCHAR(64) PRIMARY KEY,
+    iniciada_em TIMESTAMPTZ NOT NULL,
+    medido_em TIMESTAMPTZ,
+    relatorio JSONB,
+    resultado JSONB
+);
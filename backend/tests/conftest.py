@@ -0,0 +1,66 @@
+"""Integration tests against scratch Postgres databases.
+
+``TEST_DATABASE_URL`` (and, for the sharding tests, ``TEST_SHARD_URL``) name
+databases with the full schema (``Base.metadata.create_all`` plus ``sql/``);
+their catalogue and pieces are wiped. Tests whose URL is missing are skipped::
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost/t_principal \\
+    TEST_SHARD_URL=postgresql://postgres@localhost/t_shard python -m pytest tests
+"""
+
+import base64
+import io
+import os
+
+import pytest
+
+PRINCIPAL_URL = os.getenv("TEST_DATABASE_URL")
+SHARD_URL = os.getenv("TEST_SHARD_URL")
+CLIENTE_NO_SHARD = 900001
+
+# Read by app.core.config at import time, so set before any test module imports the app.
+if PRINCIPAL_URL:
+    os.environ.update(
+        {
+            "DATABASE_URL": PRINCIPAL_URL,
+            "DATABASE_REPLICA_URLS": "",
+            "DATABASE_SHARDS": f"s={SHARD_URL}" if SHARD_URL else "",
+            "SHARD_CLIENTES": f"{CLIENTE_NO_SHARD}=s" if SHARD_URL else "",
+            "AUTH_DISABLED": "true",
+            "RATE_LIMIT_ENABLED": "false",
+            "AUDIT_ENABLED": "false",
+        }
+    )
+
+_LIMPAR = (
+    "TRUNCATE pecas, pecas_removidas, comprovacoes_arquivadas, comprovacoes_originais,"
+    " pecas_resumo_diario, secretarias, clientes, tipos_peca, manutencao_execucoes CASCADE"
+)
+
+
+@pytest.fixture(scope="module")
+def bancos():
+    """Every configured database, emptied before and after the module."""
+    if not PRINCIPAL_URL:
+        pytest.skip("TEST_DATABASE_URL não configurado")
+    from sqlalchemy import text
+
+    from app.core.database import get_shard_router
+
+    engines = get_shard_router().all_engines()
+    for engine in engines.values():
+        with engine.begin() as conn:
+            conn.execute(text(_LIMPAR))
+    yield engines
+    for engine in engines.values():
+        with engine.begin() as conn:
+            conn.execute(text(_LIMPAR))
+
+
+@pytest.fixture(scope="session")
+def comprovacao() -> str:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), (10, 120, 200)).save(buffer, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
@@ -0,0 +1,30 @@
+"""Catalogue ETag; see ``conftest.py``."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+
+
+@pytest.fixture(scope="module")
+def client(bancos) -> TestClient:
+    return TestClient(create_app())
+
+
+def test_etag_follows_catalogue_changes(client: TestClient) -> None:
+    cliente = client.post("/api/clientes", json={"nome": "Catálogo"}).json()
+    primeira = client.get("/api/catalogo")
+    etag = primeira.headers["ETag"]
+    assert primeira.json()["versao"] == etag.strip('"')
+    assert client.get("/api/catalogo", headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.post("/api/tipos-peca", json={"nome": "Banner"}).status_code == 201
+    com_tipo = client.get("/api/catalogo", headers={"If-None-Match": etag})
+    assert com_tipo.status_code == 200
+    assert [tipo["nome"] for tipo in com_tipo.json()["tiposPeca"]] == ["Banner"]
+
+    etag = com_tipo.headers["ETag"]
+    assert client.delete(f"/api/clientes/{cliente['id']}").status_code == 204
+    removido = client.get("/api/catalogo", headers={"If-None-Match": etag})
+    assert removido.status_code == 200
+    assert removido.json()["clientes"] == []
@@ -0,0 +1,49 @@
+"""Read-your-writes marker (``X-Ultima-Escrita``) on write responses; see ``conftest.py``."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import WRITE_MARKER_HEADER
+from app.main import create_app
+
+
+@pytest.fixture(scope="module")
+def client(bancos) -> TestClient:
+    return TestClient(create_app())
+
+
+def _criar_peca(client: TestClient, comprovacao: str) -> dict:
+    cliente = client.post("/api/clientes", json={"nome": "Marcador"}).json()
+    client.post("/api/secretarias", json={"nome": "Obras", "clienteId": cliente["id"]})
+    client.post("/api/tipos-peca", json={"nome": "Faixa"})
+    response = client.post(
+        "/api/pecas",
+        json={
+            "cliente": "Marcador",
+            "secretaria": "Obras",
+            "tipoPeca": "Faixa",
+            "nomePeca": "Peça",
+            "dataCriacao": "2024-05-01",
+            "comprovacao": comprovacao,
+        },
+    )
+    assert response.status_code == 201, response.text
+    assert WRITE_MARKER_HEADER in response.headers
+    return response.json()
+
+
+def test_deletes_carry_the_write_marker(client: TestClient, comprovacao: str) -> None:
+    peca = _criar_peca(client, comprovacao)
+
+    response = client.delete(f"/api/pecas/{peca['id']}")
+    assert response.status_code == 204
+    assert float(response.headers[WRITE_MARKER_HEADER]) > 0
+
+    tipo = client.get("/api/tipos-peca").json()[0]
+    response = client.delete(f"/api/tipos-peca/{tipo['id']}")
+    assert response.status_code == 204
+    assert WRITE_MARKER_HEADER in response.headers
+
+
+def test_reads_do_not_carry_the_marker(client: TestClient) -> None:
+    assert WRITE_MARKER_HEADER not in client.get("/api/pecas").headers
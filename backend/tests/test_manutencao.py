@@ -0,0 +1,39 @@
+"""Scheduled maintenance against the scratch databases; see ``conftest.py``."""
+
+from sqlalchemy import text
+
+from app.core.maintenance import MaintenanceScheduler, maintenance_scheduler
+from app.core.partitions import PARTITION_NAME, is_partitioned, list_partitions
+
+
+def test_scheduled_run_creates_the_partitions_due(bancos) -> None:
+    for engine in bancos.values():
+        with engine.begin() as conn:
+            if is_partitioned(conn):
+                futura = max(row["nome"] for row in list_partitions(conn) if PARTITION_NAME.match(row["nome"]))
+                conn.execute(text(f'DROP TABLE "{futura}"'))
+
+    resultados = maintenance_scheduler.run_now()
+
+    for resultado in resultados:
+        assert "erro" not in resultado, resultado
+        engine = bancos[resultado["banco"]]
+        with engine.connect() as conn:
+            if is_partitioned(conn):
+                assert len(resultado["particoesCriadas"]) == 1
+                assert resultado["particoesCriadas"][0] in {row["nome"] for row in list_partitions(conn)}
+
+
+def test_workers_share_one_scheduled_run_and_its_report(bancos) -> None:
+    with bancos["principal"].begin() as conn:
+        conn.execute(text("DELETE FROM manutencao_execucoes"))
+    primeiro = MaintenanceScheduler(interval_seconds=3600)
+    segundo = MaintenanceScheduler(interval_seconds=3600)
+
+    assert [resultado["banco"] for resultado in primeiro.run_now(agendada=True)] == list(bancos)
+    # Another worker waking within the interval finds every database claimed.
+    assert segundo.run_now(agendada=True) == []
+    assert segundo.recent() == []
+    assert [report["banco"] for report in segundo.last_reports()] == list(bancos)
+    # A manual run is not subject to the schedule.
+    assert len(segundo.run_now()) == len(bancos)
@@ -0,0 +1,38 @@
+"""Who may profile a request; see ``conftest.py``."""
+
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.profiling import _wants_profile
+from app.core.security import create_access_token
+
+
+@pytest.fixture
+def usuarios(bancos, monkeypatch):
+    monkeypatch.setattr(settings, "auth_disabled", False)
+    with bancos["principal"].begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO usuarios (username, nome, password_hash, role, is_active) VALUES"
+                " ('perfil_master', 'Master', '-', 'master', true),"
+                " ('perfil_rebaixado', 'Rebaixado', '-', 'financeiro', true),"
+                " ('perfil_inativo', 'Inativo', '-', 'master', false)"
+            )
+        )
+    yield
+    with bancos["principal"].begin() as conn:
+        conn.execute(text("DELETE FROM usuarios WHERE username LIKE 'perfil_%'"))
+
+
+def _scope(username: str) -> dict:
+    # Every token claims "master"; only the database decides.
+    token = create_access_token({"sub": username, "role": "master"})
+    return {"headers": [(b"authorization", f"Bearer {token}".encode())]}
+
+
+def test_profiling_follows_the_role_in_the_database(usuarios) -> None:
+    assert _wants_profile(_scope("perfil_master"))
+    assert not _wants_profile(_scope("perfil_rebaixado"))
+    assert not _wants_profile(_scope("perfil_inativo"))
+    assert not _wants_profile(_scope("perfil_inexistente"))
@@ -0,0 +1,130 @@
+"""Pieces split across two real Postgres databases (``DATABASE_SHARDS``); see ``conftest.py``."""
+
+import pytest
+
+from .conftest import CLIENTE_NO_SHARD, PRINCIPAL_URL, SHARD_URL
+
+if not (PRINCIPAL_URL and SHARD_URL):
+    pytest.skip("TEST_DATABASE_URL e TEST_SHARD_URL não configurados", allow_module_level=True)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.core.database import get_engine  # noqa: E402
+from app.core.sharding import align_sequences, replicate_catalogue  # noqa: E402
+from app.main import create_app  # noqa: E402
+
+
+def _pecas(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT count(*) FROM pecas")).scalar_one()
+
+
+@pytest.fixture(scope="module")
+def client(bancos):
+    with get_engine().begin() as conn:
+        conn.execute(
+            text("INSERT INTO clientes (id, nome) VALUES (:id, 'Remoto')"),
+            {"id": CLIENTE_NO_SHARD},
+        )
+    replicate_catalogue()
+    align_sequences()
+
+    client = TestClient(create_app())
+    local = client.post("/api/clientes", json={"nome": "Local"}).json()
+    for cliente_id in (local["id"], CLIENTE_NO_SHARD):
+        assert client.post("/api/secretarias", json={"nome": "Saúde", "clienteId": cliente_id}).status_code == 201
+    assert client.post("/api/tipos-peca", json={"nome": "Cartaz"}).status_code == 201
+    return client
+
+
+@pytest.fixture
+def criar(client: TestClient, comprovacao: str):
+    def criar(cliente: str, nome: str, data: str) -> dict:
+        response = client.post(
+            "/api/pecas",
+            json={
+                "cliente": cliente,
+                "secretaria": "Saúde",
+                "tipoPeca": "Cartaz",
+                "nomePeca": nome,
+                "dataCriacao": data,
+                "comprovacao": comprovacao,
+            },
+        )
+        assert response.status_code == 201, response.text
+        return response.json()
+
+    return criar
+
+
+def test_pieces_are_routed_and_merged(client: TestClient, bancos, criar) -> None:
+    local = criar("Local", "Local", "2024-03-01")
+    remota = criar("Remoto", "Remota", "2024-03-02")
+
+    assert _pecas(bancos["principal"]) == 1
+    assert _pecas(bancos["s"]) == 1
+    assert local["id"] != remota["id"]
+
+    listadas = client.get("/api/pecas").json()
+    assert [peca["id"] for peca in listadas] == [remota["id"], local["id"]]
+    assert client.get(f"/api/pecas/{remota['id']}").json()["nomePeca"] == "Remota"
+
+    resposta = client.put(f"/api/pecas/{remota['id']}", json={"nomePeca": "Remota 2"})
+    assert resposta.status_code == 200, resposta.text
+    with bancos["s"].connect() as conn:
+        assert conn.execute(text("SELECT nome_peca FROM pecas")).scalar_one() == "Remota 2"
+
+
+def test_batch_bulk_and_sync_span_shards(client: TestClient, bancos, criar) -> None:
+    local = criar("Local", "Lote local", "2024-04-01")
+    remota = criar("Remoto", "Lote remota", "2024-04-02")
+    ids = [remota["id"], local["id"], 0]
+
+    batch = client.get("/api/pecas:batch", params={"ids": ",".join(map(str, ids))}).json()
+    assert [item["id"] for item in batch["itens"]] == ids[:2]
+    assert batch["naoEncontradas"] == [0]
+
+    sync = client.get("/api/pecas/sync", params={"limite": 1}).json()
+    vistas = [item["id"] for item in sync["itens"]]
+    while sync["temMais"]:
+        sync = client.get("/api/pecas/sync", params={"cursor": sync["cursor"], "limite": 1}).json()
+        vistas += [item["id"] for item in sync["itens"]]
+    assert {local["id"], remota["id"]} <= set(vistas)
+    assert set(dict(parte.split("=") for parte in sync["cursor"].split(";"))) == {"principal", "s"}
+
+    resposta = client.post(
+        "/api/pecas:bulk-update", json={"ids": ids[:2], "alteracoes": {"observacao": "em lote"}}
+    ).json()
+    assert resposta["totais"] == {"atualizada": 2}
+    resposta = client.post(
+        "/api/pecas:bulk-update",
+        json={"ids": ids[:2], "alteracoes": {"cliente": "Local", "secretaria": "Saúde"}},
+    ).json()
+    assert {item["id"]: item["status"] for item in resposta["resultados"]}[remota["id"]] == "cliente_em_outro_shard"
+    with bancos["s"].connect() as conn:
+        assert conn.execute(
+            text("SELECT observacao FROM pecas WHERE id = :id"), {"id": remota["id"]}
+        ).scalar_one() == "em lote"
+
+    no_shard = _pecas(bancos["s"])
+    resposta = client.post("/api/pecas:bulk-delete", json={"ids": ids}).json()
+    assert resposta["totais"] == {"removida": 2, "nao_encontrada": 1}
+    assert _pecas(bancos["s"]) == no_shard - 1
+
+    sync = client.get("/api/pecas/sync", params={"cursor": sync["cursor"]}).json()
+    assert {item["id"] for item in sync["removidas"]} == {local["id"], remota["id"]}
+
+
+def test_catalogue_delete_sees_pieces_on_shards(client: TestClient) -> None:
+    secretarias = client.get(f"/api/clientes/{CLIENTE_NO_SHARD}/secretarias").json()
+    # The primary has no piece of this cliente; only the shard does.
+    assert client.delete(f"/api/secretarias/{secretarias[0]['id']}").status_code == 409
+    assert client.delete(f"/api/clientes/{CLIENTE_NO_SHARD}").status_code == 409
+    tipos = client.get("/api/tipos-peca").json()
+    assert client.delete(f"/api/tipos-peca/{tipos[0]['id']}").status_code == 409
+
+    for peca in client.get("/api/pecas").json():
+        if peca["cliente"] == "Remoto":
+            assert client.delete(f"/api/pecas/{peca['id']}").status_code == 204
+    assert client.delete(f"/api/clientes/{CLIENTE_NO_SHARD}").status_code == 204